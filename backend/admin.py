@@ -1,5 +1,88 @@
 from django.contrib import admin
-from .models import User, Event
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import User, Event, DeletedEventPayment, EventDeletion, EventMembership, ProfilingRule, RequestProfile
+from .profiling import profile_summary
 
 admin.site.register(User)
-admin.site.register(Event)
+
+
+class EventMembershipInline(admin.TabularInline):
+    model = EventMembership
+    fields = ("user", "role", "joined_at")
+    readonly_fields = ("joined_at",)
+    raw_id_fields = ("user",)
+    extra = 0
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    inlines = [EventMembershipInline]
+
+
+@admin.register(EventDeletion)
+class EventDeletionAdmin(admin.ModelAdmin):
+    list_display = ("event_id", "title", "stage", "rows_deleted", "files_deleted", "requested_at", "finished_at")
+    readonly_fields = [field.name for field in EventDeletion._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DeletedEventPayment)
+class DeletedEventPaymentAdmin(admin.ModelAdmin):
+    list_display = ("transaction_id", "amount", "user", "payment_date", "refunded_at")
+    list_filter = ("refunded_at",)
+    search_fields = ("transaction_id",)
+    raw_id_fields = ("deletion", "user")
+    readonly_fields = [field.name for field in DeletedEventPayment._meta.fields if field.name != "refunded_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    list_display = ("view_name", "sample_rate", "enabled", "expires_at", "created_at")
+    list_editable = ("sample_rate", "enabled", "expires_at")
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "view_name", "method", "path", "status_code", "duration_ms", "download")
+    list_filter = ("view_name", "method", "status_code")
+    search_fields = ("path",)
+    date_hierarchy = "created_at"
+    fields = ("view_name", "method", "path", "status_code", "duration_ms", "created_at", "download", "summary")
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="backend_requestprofile_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        filename = f"{profile.view_name}-{profile.created_at:%Y%m%dT%H%M%S}.prof"
+        return FileResponse(profile.file.open("rb"), as_attachment=True, filename=filename)
+
+    @admin.display(description="pstats file")
+    def download(self, obj):
+        url = reverse("admin:backend_requestprofile_download", args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    @admin.display(description="Top functions by cumulative time")
+    def summary(self, obj):
+        try:
+            return format_html("<pre>{}</pre>", profile_summary(obj))
+        except (OSError, ValueError, EOFError) as e:
+            return f"Could not read the profile: {e}"
@@ -0,0 +1,173 @@
+from itertools import chain
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import IntegerField, Value
+from django.db.models.functions import Coalesce
+
+from . import metrics
+from .grading import get_answer_key
+from .models import UserQuestionAnswer
+
+# Analytics are dropped by the signals in signals.py whenever a response is
+# stored or the quiz changes, so the timeout only bounds memory use
+ANALYTICS_TIMEOUT = 60 * 60
+
+# Rows pulled from the database cursor per round trip while filling the arrays
+FETCH_SIZE = 10_000
+
+SCORE_BINS = np.arange(0, 101, 10)
+
+# Column order of the raw SELECT: model columns first, then the annotation
+ANSWER_DTYPE = np.dtype([
+    ("response", np.int64),
+    ("question", np.int64),
+    ("correct", np.int8),
+    ("option", np.int64),
+])
+
+
+def analytics_cache_key(quiz_id):
+    return f"quiz:{quiz_id}:analytics"
+
+
+def invalidate_quiz_analytics(quiz_id):
+    cache.delete(analytics_cache_key(quiz_id))
+
+
+def get_quiz_analytics(quiz_id):
+    """Return the cached item analytics of a quiz, computing them on a miss."""
+    key = analytics_cache_key(quiz_id)
+    analytics = cache.get(key)
+    metrics.cache_lookup("quiz_analytics", analytics is not None)
+    if analytics is None:
+        analytics = compute_quiz_analytics(quiz_id)
+        cache.set(key, analytics, ANALYTICS_TIMEOUT)
+    return analytics
+
+
+def load_answer_rows(quiz_id):
+    """
+    Load every answer of every completed response to a quiz with one query,
+    straight from the cursor into a structured array.
+    """
+    queryset = UserQuestionAnswer.objects.filter(
+        quiz_response__quiz_id=quiz_id,
+        quiz_response__completed_at__isnull=False,
+    ).annotate(
+        option=Coalesce("selected_option_id", Value(-1), output_field=IntegerField()),
+    ).values_list("quiz_response_id", "question_id", "is_correct", "option")
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        chunks = iter(lambda: cursor.fetchmany(FETCH_SIZE), [])
+        return np.fromiter(chain.from_iterable(chunks), dtype=ANSWER_DTYPE)
+
+
+def point_biserial(correct, totals):
+    """
+    Correlation between each item (0/1 column of `correct`) and the total
+    score, computed for all items at once. Items everyone got right or wrong
+    have no variance and yield NaN.
+    """
+    item_std = correct.std(axis=0)
+    total_std = totals.std()
+    covariance = (
+        (correct - correct.mean(axis=0)) * (totals - totals.mean())[:, None]
+    ).mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return covariance / (item_std * total_std)
+
+
+def compute_quiz_analytics(quiz_id):
+    """
+    Compute per-question difficulty (p-value), point-biserial discrimination,
+    option selection frequencies with the mean score of each option's
+    choosers, and the score histogram of all completed responses.
+    """
+    answer_key = get_answer_key(quiz_id)
+    question_ids = np.array(sorted(answer_key), dtype=np.int64)
+    option_ids = np.array(
+        sorted(chain.from_iterable(options for options, _ in answer_key.values())),
+        dtype=np.int64,
+    )
+
+    rows = load_answer_rows(quiz_id)
+    # Answers to questions removed since the response was stored are ignored
+    rows = rows[np.isin(rows["question"], question_ids)]
+
+    response_ids, response_index = np.unique(rows["response"], return_inverse=True)
+    question_index = np.searchsorted(question_ids, rows["question"])
+    n_responses, n_questions = len(response_ids), len(question_ids)
+
+    # Response x question matrix of correct answers; unanswered cells stay 0
+    correct = np.zeros((n_responses, n_questions), dtype=np.float64)
+    correct[response_index, question_index] = rows["correct"]
+    totals = correct.sum(axis=1)
+
+    if n_responses:
+        p_values = correct.mean(axis=0)
+        discrimination = point_biserial(correct, totals)
+    else:
+        p_values = np.full(n_questions, np.nan)
+        discrimination = np.full(n_questions, np.nan)
+
+    # Option selection counts and the summed total score of their choosers
+    answered = rows["option"] >= 0
+    answered &= np.isin(rows["option"], option_ids)
+    option_index = np.searchsorted(option_ids, rows["option"][answered])
+    option_counts = np.bincount(option_index, minlength=len(option_ids))
+    option_score_sums = np.bincount(
+        option_index,
+        weights=totals[response_index[answered]],
+        minlength=len(option_ids),
+    )
+    answered_per_question = np.bincount(
+        question_index[answered], minlength=n_questions
+    )
+
+    percentages = totals / n_questions * 100 if n_questions else totals
+    histogram, _ = np.histogram(percentages, bins=SCORE_BINS)
+
+    option_position = {option_id: i for i, option_id in enumerate(option_ids.tolist())}
+    questions = []
+    for i, question_id in enumerate(question_ids.tolist()):
+        options, correct_options = answer_key[question_id]
+        option_stats = []
+        for option_id in sorted(options):
+            j = option_position[option_id]
+            count = int(option_counts[j])
+            option_stats.append({
+                "option": option_id,
+                "is_correct": option_id in correct_options,
+                "count": count,
+                "frequency": _rounded(count / answered_per_question[i])
+                if answered_per_question[i] else None,
+                "mean_total_score": _rounded(option_score_sums[j] / count)
+                if count else None,
+            })
+        questions.append({
+            "question": question_id,
+            "p_value": _rounded(p_values[i]),
+            "discrimination": _rounded(discrimination[i]),
+            "answered": int(answered_per_question[i]),
+            "options": option_stats,
+        })
+
+    return {
+        "quiz": quiz_id,
+        "responses": n_responses,
+        "questions": questions,
+        "mean_score": _rounded(percentages.mean()) if n_responses else None,
+        "score_histogram": [
+            {"from": int(low), "to": int(high), "count": int(count)}
+            for low, high, count in zip(SCORE_BINS[:-1], SCORE_BINS[1:], histogram)
+        ],
+    }
+
+
+def _rounded(value, digits=4):
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
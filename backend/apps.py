@@ -8,4 +8,5 @@ class BackendConfig(AppConfig):
     name = "backend"
 
     def ready(self):
+        import backend.checks  # Registers the system checks
         import backend.signals  # Ensure signals are registered when app loads
@@ -0,0 +1,162 @@
+"""
+Bulk enrollment of known users as attendees of an event.
+
+Organizers send a list of emails (a CSV with an "email" column, or JSON).
+Emails are resolved to existing users IMPORT_CHUNK_SIZE at a time with one
+IN query, matching emails regardless of case. Each chunk adds the attendee
+rows, free tickets and unviewed notifications with bulk_create. Every row
+gets a status in the report; unknown emails are reported, not invited.
+"""
+
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .conditional import bump_event_version
+from .dashboard import invalidate_event_dashboards
+from .models import EventMembership, EventNotification, Ticket, User
+from .rollups import add_to_rollup
+from .streaming import iter_text_lines
+
+IMPORT_CHUNK_SIZE = 500
+MAX_ROWS = 20_000
+
+ENROLLED = "enrolled"
+ALREADY_ATTENDING = "already_attending"
+UNKNOWN_USER = "unknown_user"
+INVALID_EMAIL = "invalid_email"
+DUPLICATE = "duplicate"
+STATUSES = (ENROLLED, ALREADY_ATTENDING, UNKNOWN_USER, INVALID_EMAIL, DUPLICATE)
+
+
+class AttendeeImportError(Exception):
+    """Raised when the uploaded list cannot be read at all; nothing is stored."""
+
+
+def parse_csv_emails(stream):
+    """Yield (row number, email) from a CSV upload with an "email" column."""
+    reader = csv.DictReader(iter_text_lines(stream))
+    fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    if "email" not in fieldnames:
+        raise AttendeeImportError('The CSV needs an "email" column.')
+    column = (reader.fieldnames or [])[fieldnames.index("email")]
+    for row in reader:
+        yield reader.line_num, row.get(column) or ""
+
+
+def parse_json_emails(data):
+    """
+    Yield (row number, email) from a JSON list of emails or of objects with
+    an "email" key, optionally wrapped as {"emails": [...]}.
+    """
+    if isinstance(data, dict):
+        data = data.get("emails")
+    if not isinstance(data, list):
+        raise AttendeeImportError('Send a JSON list of emails or {"emails": [...]}.')
+    for row_number, row in enumerate(data, start=1):
+        if isinstance(row, dict):
+            row = row.get("email")
+        yield row_number, row if isinstance(row, str) else ""
+
+
+def normalize_email(email):
+    return User.objects.normalize_email(email.strip())
+
+
+def import_attendees(event, rows):
+    """
+    Enroll the users of (row number, email) pairs as attendees of an event.
+    Returns {"counts": {status: n}, "results": [{"row", "email", "status"}]}.
+    Raises AttendeeImportError when there are more than MAX_ROWS rows.
+    """
+    results = []
+    seen = set()
+    chunk = []
+
+    with transaction.atomic():
+        for row_number, email in rows:
+            if len(results) >= MAX_ROWS:
+                raise AttendeeImportError(f"At most {MAX_ROWS} rows can be imported at once.")
+            result = {"row": row_number, "email": email.strip(), "status": None}
+            results.append(result)
+            email = normalize_email(email)
+            try:
+                validate_email(email)
+            except ValidationError:
+                result["status"] = INVALID_EMAIL
+                continue
+            if email.lower() in seen:
+                result["status"] = DUPLICATE
+                continue
+            seen.add(email.lower())
+            chunk.append((email, result))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _enroll_chunk(event, chunk)
+                chunk = []
+        if chunk:
+            _enroll_chunk(event, chunk)
+
+        # bulk_create sends no signals, so refresh what they would have
+        transaction.on_commit(lambda: bump_event_version(event.id))
+        invalidate_event_dashboards(event.id)
+
+    counts = dict.fromkeys(STATUSES, 0)
+    for result in results:
+        counts[result["status"]] += 1
+    return {"counts": counts, "results": results}
+
+
+def _enroll_chunk(event, chunk):
+    wanted = {email.lower(): email for email, _ in chunk}
+    user_ids = {}
+    matches = User.objects.annotate(email_lower=Lower("email")).filter(email_lower__in=wanted)
+    for email, user_id in matches.values_list("email", "id"):
+        # Emails are only unique as typed, so an exact match wins over another casing
+        if email.lower() not in user_ids or email == wanted[email.lower()]:
+            user_ids[email.lower()] = user_id
+    attending = set(
+        EventMembership.objects.filter(event=event, role=EventMembership.ATTENDEE, user_id__in=user_ids.values())
+        .values_list("user_id", flat=True)
+    )
+    with_ticket = set(
+        Ticket.objects.filter(event=event, user_id__in=user_ids.values()).values_list("user_id", flat=True)
+    )
+
+    new_user_ids = []
+    for email, result in chunk:
+        user_id = user_ids.get(email.lower())
+        if user_id is None:
+            result["status"] = UNKNOWN_USER
+        elif user_id in attending:
+            result["status"] = ALREADY_ATTENDING
+        else:
+            result["status"] = ENROLLED
+            new_user_ids.append(user_id)
+    if not new_user_ids:
+        return
+
+    # The import transaction is IMMEDIATE, so no other writer can add tickets or
+    # memberships between the lookups above and these inserts. Tickets have no
+    # unique (user, event) constraint, since every paid checkout attempt creates
+    # a pending ticket, so the with_ticket check is what prevents duplicates.
+    EventMembership.objects.bulk_create(
+        [EventMembership(event=event, user_id=user_id, role=EventMembership.ATTENDEE) for user_id in new_user_ids],
+        ignore_conflicts=True,
+    )
+    tickets = [
+        Ticket(event=event, user_id=user_id, is_paid=True)
+        for user_id in new_user_ids if user_id not in with_ticket
+    ]
+    Ticket.objects.bulk_create(tickets)
+    EventNotification.objects.bulk_create(
+        [EventNotification(event=event, user_id=user_id, is_viewed=False) for user_id in new_user_ids],
+        ignore_conflicts=True,
+    )
+    if tickets:
+        # Free tickets count as paid on registration, like free checkouts; without
+        # ignore_conflicts every ticket in the list was inserted. Users enrolled
+        # over a pending ticket are counted if that ticket is ever paid.
+        add_to_rollup(event.id, tickets[0].purchase_date, registrations=len(tickets), paid_tickets=len(tickets))
@@ -0,0 +1,66 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks run against a scratch copy of the schema so they never touch
+db.sqlite3 and can freely seed and write data.
+"""
+
+from contextlib import contextmanager
+import os
+import statistics
+import tempfile
+import time
+
+from django.db import connection
+
+
+@contextmanager
+def throwaway_database(verbosity=0):
+    """Create a freshly migrated scratch database and drop it afterwards."""
+    old_name = connection.settings_dict["NAME"]
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test_settings.get("NAME")
+
+    if connection.vendor == "sqlite":
+        # Use a file rather than the shared in-memory database so that
+        # benchmark threads get real, independent connections
+        fd, path = tempfile.mkstemp(prefix="sees-bench-", suffix=".sqlite3")
+        os.close(fd)
+        test_settings["NAME"] = path
+
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings["NAME"] = old_test_name
+        if connection.vendor == "sqlite":
+            # WAL mode leaves these next to the database file
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+@contextmanager
+def timed(results, label):
+    """Record the wall time of the block, in seconds, into results[label]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[label] = time.perf_counter() - start
+
+
+def summarize_latencies(latencies):
+    """Return p50/p95/max of a list of per-call durations in milliseconds."""
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(latencies)
+    p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
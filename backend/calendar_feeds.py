@@ -0,0 +1,120 @@
+"""
+ICS calendar feeds of a user's events and of single events.
+
+Calendar apps cannot send API tokens, so feed URLs carry a signed token of
+the user instead. Feeds are streamed event by event, and their ETag and
+Last-Modified come from one aggregate over the feed's events (count, ids and
+the latest Event.updated_at), so polls of an unchanged feed get a 304
+without reading the events themselves.
+"""
+
+import hashlib
+
+from django.core import signing
+from django.db.models import Count, Max, Sum
+
+from .models import Event, User
+
+TOKEN_SALT = "backend.calendar_feeds"
+PRODID = "-//SEES//Event Calendar//EN"
+CHUNK_SIZE = 500
+# RFC 5545 lines are folded at 75 octets
+LINE_LIMIT = 75
+
+
+def feed_token(user_id):
+    return signing.Signer(salt=TOKEN_SALT).sign(str(user_id))
+
+
+def user_for_token(token):
+    """Return the active user a feed token was made for, or None."""
+    try:
+        user_id = signing.Signer(salt=TOKEN_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+def user_feed_events(user_id):
+    """Events the user organizes, speaks at or attends."""
+    return Event.objects.for_member(user_id)
+
+
+def feed_version(events):
+    """
+    Return (etag, last_modified) of a feed, or (None, None) when it is empty.
+    The count and id sum change when an event joins or leaves the feed, which
+    does not touch updated_at.
+    """
+    version = events.aggregate(count=Count("id"), ids=Sum("id"), last_modified=Max("updated_at"))
+    if not version["count"]:
+        return None, None
+    key = f"{version['count']}:{version['ids']}:{version['last_modified'].isoformat()}"
+    return hashlib.md5(key.encode()).hexdigest(), version["last_modified"]
+
+
+def escape_text(value):
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line into chunks of at most 75 octets, without splitting characters."""
+    encoded = line.encode()
+    if len(encoded) <= LINE_LIMIT:
+        return line + "\r\n"
+    parts = []
+    start = 0
+    limit = LINE_LIMIT
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Back off to the start of a UTF-8 character
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = LINE_LIMIT - 1  # Continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(moment):
+    return moment.strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(event, domain):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event['id']}@{domain}",
+        f"DTSTAMP:{format_utc(event['updated_at'])}",
+        f"LAST-MODIFIED:{format_utc(event['updated_at'])}",
+        f"DTSTART:{format_utc(event['date'])}",
+        f"SUMMARY:{escape_text(event['title'])}",
+    ]
+    if event["description"]:
+        lines.append(f"DESCRIPTION:{escape_text(event['description'])}")
+    location = event["location"] or event["virtual_location"]
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    if event["virtual_location"]:
+        lines.append(f"URL:{event['virtual_location']}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def render_calendar(events, name, domain):
+    """Stream an ICS calendar of the events, reading them in chunks."""
+    yield "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ))
+    rows = events.order_by("date", "id").values(
+        "id", "title", "description", "date", "location", "virtual_location", "updated_at"
+    )
+    for event in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield render_event(event, domain)
+    yield fold("END:VCALENDAR")
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Backends whose entries only one process can see
+PER_PROCESS_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cached answer keys and version markers are invalidated by the process
+    that wrote, so a deployment with several workers needs a shared cache.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [Error(
+        f"The default cache ({backend}) is per process, so invalidations never reach the other workers.",
+        hint="Set CACHE_BACKEND and CACHE_LOCATION to a shared cache such as Redis or Memcached.",
+        id="backend.E001",
+    )]
+
+
+@register(deploy=True)
+def check_metrics_token(app_configs, **kwargs):
+    if getattr(settings, "METRICS_TOKEN", None):
+        return []
+    return [Warning(
+        "METRICS_TOKEN is not set, so /metrics answers 403 outside DEBUG.",
+        hint="Set METRICS_TOKEN and have the scraper send it as a bearer token.",
+        id="backend.W001",
+    )]
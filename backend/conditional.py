@@ -0,0 +1,78 @@
+"""
+ETags for conditional requests on event and quiz details.
+
+An event's ETag combines its updated_at with a version marker that signals
+bump whenever its embedded rows (quizzes, questions, options, materials,
+organizers, speakers) change, so it is known before anything is serialized.
+Representation ETags append the per-user parts of a body to that state, and
+If-Match only compares the state, so an organizer's own unread flag never
+fails an update.
+
+The version markers live in the default cache and are bumped by the process
+that wrote, so every worker must share that cache (see backend.checks);
+with a per-process cache the other workers would keep answering 304, and
+If-Match would fail between workers.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.utils.http import parse_etags
+
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def event_version_key(event_id):
+    return f"event:{event_id}:version"
+
+
+def event_version(event_id):
+    """Return the version marker of an event's embedded rows, starting from the current time."""
+    return cache.get_or_set(
+        event_version_key(event_id), lambda: time.time_ns() // 1000, VERSION_TIMEOUT
+    )
+
+
+def bump_event_version(event_id):
+    try:
+        cache.incr(event_version_key(event_id))
+    except ValueError:
+        # No marker cached, the next read starts a fresh one
+        pass
+
+
+def event_state_tag(event_id, updated_at):
+    return f"e{event_id}.{updated_at.timestamp():.6f}.{event_version(event_id)}"
+
+
+def representation_etag(state_tag, *variant):
+    return '"' + "-".join([state_tag, *map(str, variant)]) + '"'
+
+
+def quiz_etag(quiz_id, version, role):
+    return representation_etag(f"q{quiz_id}.{version}", role)
+
+
+def none_match_fails(request, etag):
+    """True when If-None-Match lists the ETag, i.e. the client's copy is current."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # Weak comparison
+    return etags == ["*"] or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in etags]
+
+
+def match_fails(request, state_tag):
+    """True when If-Match is sent and no listed ETag has the current state."""
+    header = request.headers.get("If-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return False
+    # Strong comparison of the state part
+    return not any(
+        not tag.startswith("W/") and tag.strip('"').split("-")[0] == state_tag
+        for tag in etags
+    )
@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from . import metrics
+from .models import Event, EventMembership, Quiz, Ticket
+
+CENTS = Decimal("0.01")
+
+# Ticket sales without a payment (free events) are not signalled, so keep the
+# cached dashboards short-lived; payments drop them right away
+DASHBOARD_TIMEOUT = 60
+
+
+def dashboard_cache_key(user_id):
+    return f"organizer:{user_id}:dashboard"
+
+
+def invalidate_event_dashboards(event_id):
+    """Drop the cached dashboards of every organizer of an event."""
+    def invalidate():
+        organizer_ids = EventMembership.objects.filter(
+            event_id=event_id, role=EventMembership.ORGANIZER
+        ).values_list("user_id", flat=True)
+        cache.delete_many([dashboard_cache_key(user_id) for user_id in organizer_ids])
+
+    transaction.on_commit(invalidate)
+
+
+def get_organizer_dashboard(user_id):
+    """Return the cached dashboard of an organizer, computing it on a miss."""
+    key = dashboard_cache_key(user_id)
+    dashboard = cache.get(key)
+    metrics.cache_lookup("organizer_dashboard", dashboard is not None)
+    if dashboard is None:
+        dashboard = compute_organizer_dashboard(user_id)
+        cache.set(key, dashboard, DASHBOARD_TIMEOUT)
+    return dashboard
+
+
+def compute_organizer_dashboard(user_id):
+    """
+    Aggregate ticket sales, revenue, attendance and quiz completion for all
+    events organized by a user, with one grouped query per metric family.
+    """
+    event_ids = EventMembership.objects.filter(user_id=user_id, role=EventMembership.ORGANIZER).values("event_id")
+    events = list(
+        Event.objects.filter(id__in=event_ids).order_by("date").values("id", "title", "date")
+    )
+
+    tickets = {
+        row["event_id"]: row
+        for row in Ticket.objects.filter(event_id__in=event_ids)
+        .values("event_id")
+        .annotate(
+            sold=Count("id"),
+            paid=Count("id", filter=Q(is_paid=True)),
+            pending=Count("id", filter=Q(is_paid=False)),
+            revenue=Sum("payment__amount"),
+        )
+    }
+    attendees = dict(
+        EventMembership.objects.filter(event_id__in=event_ids, role=EventMembership.ATTENDEE)
+        .values("event_id")
+        .annotate(count=Count("id"))
+        .values_list("event_id", "count")
+    )
+    quizzes = {
+        row["event_id"]: row
+        for row in Quiz.objects.filter(event_id__in=event_ids)
+        .values("event_id")
+        .annotate(
+            quizzes=Count("id", distinct=True),
+            completed=Count("user_responses", filter=Q(user_responses__completed_at__isnull=False)),
+        )
+    }
+
+    rows = []
+    totals = {"tickets_sold": 0, "paid_tickets": 0, "pending_tickets": 0, "revenue": Decimal("0.00"), "attendees": 0}
+    for event in events:
+        ticket_row = tickets.get(event["id"], {})
+        quiz_row = quizzes.get(event["id"], {})
+        attendee_count = attendees.get(event["id"], 0)
+        quiz_count = quiz_row.get("quizzes", 0)
+        completed = quiz_row.get("completed", 0)
+        # SQLite sums decimals as floats
+        revenue = Decimal(ticket_row.get("revenue") or 0).quantize(CENTS)
+        # Share of the possible completions: every attendee taking every quiz
+        possible = quiz_count * attendee_count
+        row = {
+            "event_id": event["id"],
+            "title": event["title"],
+            "date": event["date"],
+            "tickets_sold": ticket_row.get("sold", 0),
+            "paid_tickets": ticket_row.get("paid", 0),
+            "pending_tickets": ticket_row.get("pending", 0),
+            "revenue": str(revenue),
+            "attendees": attendee_count,
+            "quizzes": quiz_count,
+            "quiz_completions": completed,
+            "quiz_completion_rate": round(completed / possible, 4) if possible else None,
+        }
+        rows.append(row)
+        for field in ("tickets_sold", "paid_tickets", "pending_tickets", "attendees"):
+            totals[field] += row[field]
+        totals["revenue"] += revenue
+
+    totals["revenue"] = str(totals["revenue"])
+    return {"events": rows, "totals": totals}
@@ -0,0 +1,55 @@
+"""
+Date-window queries over a user's events, for calendars and "next 7 days".
+
+The window is scanned with event_date_idx and each event in it is checked
+against EventMembership through its unique (event, role, user) index, so a
+query costs the events in the window, not the user's whole event history.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Event, EventMembership
+
+ROLES = tuple(EventMembership.ROLE_NAMES)
+EVENT_TYPES = tuple(value for value, _ in Event.EVENT_TYPES)
+
+MAX_WINDOW = timedelta(days=366)
+MAX_EVENTS = 500
+
+
+def calendar_events(user_id, start, end, roles=ROLES, event_types=None, limit=MAX_EVENTS):
+    """
+    Return the events of a user dated in [start, end) as compact dicts ordered
+    by date, each with the roles the user has in it.
+    """
+    memberships = {
+        f"is_{role}": Exists(EventMembership.objects.filter(event_id=OuterRef("pk"), role=role, user_id=user_id))
+        for role in ROLES
+    }
+    in_any_role = Q()
+    for role in roles:
+        in_any_role |= Q(**{f"is_{role}": True})
+
+    events = Event.objects.filter(date__gte=start, date__lt=end)
+    if event_types:
+        events = events.filter(event_type__in=event_types)
+    events = (
+        events.annotate(**memberships)
+        .filter(in_any_role)
+        .order_by("date", "id")
+        .values("id", "title", "date", "event_type", "location", *memberships)
+    )[:limit]
+
+    return [
+        {
+            "id": event["id"],
+            "title": event["title"],
+            "date": event["date"],
+            "event_type": event["event_type"],
+            "location": event["location"],
+            "roles": [role for role in ROLES if event[f"is_{role}"]],
+        }
+        for event in events
+    ]
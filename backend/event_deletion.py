@@ -0,0 +1,204 @@
+"""
+Event deletion in the background.
+
+Deleting a big event in the request made Django collect its whole cascade
+(tickets, payments, quiz responses and answers, ...) in Python, and the
+request timed out. request_event_deletion() now only sets deleted_at, which
+hides the event from Event.objects at once, and queues an EventDeletion.
+purge_event() then deletes the event's rows leaves first, PURGE_BATCH_SIZE
+rows per transaction so the SQLite write lock is only held briefly. It
+removes the material files once their rows are committed and saves its
+progress on the EventDeletion after every batch. Payments are copied to
+DeletedEventPayment before they are deleted, so they can still be refunded.
+
+The queue is drained by a daemon thread that starts after the deletion
+commits. `manage.py purge_deleted_events` also drains it, and it resumes
+purges interrupted by a restart.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import metrics
+from .dashboard import invalidate_event_dashboards
+from .models import (
+    DeletedEventPayment, Event, EventDeletion, EventLeaderboardEntry, EventMembership, EventNotification, EventSalesRollup,
+    Material, Payment, Question, QuestionOption, Quiz, Ticket, UserQuestionAnswer, UserQuizResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1_000
+# A purge whose worker has not saved progress for this long is taken over
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# The rows of an event, leaves first so that no batch leaves a dangling
+# foreign key; materials come last with their files
+PURGE_STEPS = [
+    ("quiz answers", UserQuestionAnswer, "quiz_response__quiz__event_id"),
+    ("quiz responses", UserQuizResponse, "quiz__event_id"),
+    ("question options", QuestionOption, "question__quiz__event_id"),
+    ("questions", Question, "quiz__event_id"),
+    ("quizzes", Quiz, "event_id"),
+    ("payments", Payment, "ticket__event_id"),
+    ("tickets", Ticket, "event_id"),
+    ("notifications", EventNotification, "event_id"),
+    ("leaderboard", EventLeaderboardEntry, "event_id"),
+    ("sales rollups", EventSalesRollup, "event_id"),
+    ("memberships", EventMembership, "event_id"),
+]
+
+_worker_lock = threading.Lock()
+
+
+def pending_deletions():
+    return EventDeletion.objects.filter(finished_at__isnull=True)
+
+
+metrics.register_gauge(
+    "event_deletions_pending", "Deleted events whose rows are still being purged.",
+    lambda: pending_deletions().count(),
+)
+
+
+def request_event_deletion(event, user):
+    """Hide an event and queue the purge of its rows. Returns the EventDeletion."""
+    with transaction.atomic():
+        Event.objects.filter(pk=event.pk).update(deleted_at=timezone.now())
+        deletion, _ = EventDeletion.objects.get_or_create(
+            event_id=event.pk, defaults={"title": event.title, "requested_by": user}
+        )
+        invalidate_event_dashboards(event.pk)
+        transaction.on_commit(start_worker)
+    logger.info(f"Queued deletion of event {event.pk}")
+    return deletion
+
+
+def claim(deletion):
+    """Take a queued purge unless another worker is running it. Returns True when taken."""
+    now = timezone.now()
+    return bool(
+        pending_deletions()
+        .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT), pk=deletion.pk)
+        .update(claimed_at=now)
+    )
+
+
+def _record(deletion, stage, rows=0, files=0):
+    EventDeletion.objects.filter(pk=deletion.pk).update(
+        stage=stage, claimed_at=timezone.now(),
+        rows_deleted=F("rows_deleted") + rows, files_deleted=F("files_deleted") + files,
+    )
+
+
+def _delete_rows(model, ids):
+    # A raw DELETE skips collecting the rows and their post_delete receivers,
+    # which would refresh caches of an event nobody can see anymore
+    model.objects.filter(pk__in=ids)._raw_delete(model.objects.db)
+
+
+def _keep_payments(deletion, ids):
+    payments = Payment.objects.filter(pk__in=ids).select_related("ticket")
+    kept = DeletedEventPayment.objects.bulk_create([
+        DeletedEventPayment(
+            deletion=deletion, user_id=payment.ticket.user_id, amount=payment.amount,
+            payment_date=payment.payment_date, payment_method=payment.payment_method,
+            transaction_id=payment.transaction_id,
+        )
+        for payment in payments
+    ])
+    for payment in kept:
+        logger.warning(
+            f"Payment {payment.transaction_id} of {payment.amount} for deleted event {deletion.event_id} needs a refund"
+        )
+
+
+def purge_event(deletion, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete the rows and material files of a deleted event, batch_size rows
+    per transaction. Yields (stage, rows) after every batch, so callers can
+    report or pace the purge.
+    """
+    event_id = deletion.event_id
+    for stage, model, lookup in PURGE_STEPS:
+        while True:
+            with transaction.atomic():
+                ids = list(model.objects.filter(**{lookup: event_id}).values_list("pk", flat=True)[:batch_size])
+                if model is Payment:
+                    _keep_payments(deletion, ids)
+                _delete_rows(model, ids)
+                _record(deletion, stage, rows=len(ids))
+            if not ids:
+                break
+            yield stage, len(ids)
+
+    storage = Material._meta.get_field("file").storage
+    while True:
+        with transaction.atomic():
+            materials = list(Material.objects.filter(event_id=event_id).values_list("pk", "file")[:batch_size])
+            names = {name for _, name in materials if name}
+            # Files can be shared with the materials of other events
+            names -= set(
+                Material.objects.filter(file__in=names).exclude(event_id=event_id).values_list("file", flat=True)
+            )
+            _delete_rows(Material, [pk for pk, _ in materials])
+            _record(deletion, "materials", rows=len(materials))
+            transaction.on_commit(lambda names=names: _delete_files(deletion, storage, names))
+        if not materials:
+            break
+        yield "materials", len(materials)
+
+    with transaction.atomic():
+        # Every child row is gone, so this is a single DELETE
+        Event.all_objects.filter(pk=event_id).delete()
+        _record(deletion, "done", rows=1)
+        EventDeletion.objects.filter(pk=deletion.pk).update(finished_at=timezone.now())
+    logger.info(f"Purged event {event_id}")
+    yield "done", 1
+
+
+def _delete_files(deletion, storage, names):
+    deleted = 0
+    for name in names:
+        try:
+            storage.delete(name)
+            deleted += 1
+        except OSError as e:
+            # Left for `manage.py sweep_materials`
+            logger.warning(f"Could not delete {name}: {e}")
+    if deleted:
+        EventDeletion.objects.filter(pk=deletion.pk).update(files_deleted=F("files_deleted") + deleted)
+
+
+def purge_pending(batch_size=PURGE_BATCH_SIZE):
+    """Purge every queued deletion no other worker is running. Returns how many were purged."""
+    purged = 0
+    for deletion in pending_deletions().order_by("requested_at"):
+        if claim(deletion):
+            for _ in purge_event(deletion, batch_size):
+                pass
+            purged += 1
+    return purged
+
+
+def start_worker():
+    """Drain the queue in a daemon thread, unless this process already runs one."""
+    if not _worker_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            while purge_pending():
+                pass
+        except Exception:
+            logger.exception("Purging deleted events failed; `manage.py purge_deleted_events` resumes it")
+        finally:
+            _worker_lock.release()
+            connection.close()
+
+    threading.Thread(target=run, name="event-deletion", daemon=True).start()
@@ -0,0 +1,100 @@
+"""
+Sparse fieldsets for the event endpoints.
+
+?fields=id,title,date,event_type keeps only those fields and ?expand=organizers
+embeds a relation in full (relations listed in ?fields= alone are ids).
+event_queryset() only prefetches what the fieldset will serialize, so a card
+view of the events costs one query per list instead of one per relation and
+event.
+"""
+
+from django.db.models import Exists, OuterRef, Prefetch
+
+from .models import Event, EventMembership, EventNotification, Material, Question, Quiz
+from .serializers import EventSerializer, UserSerializer
+
+EXPANDABLE = EventSerializer.EXPANDABLE
+ROLE_FIELDS = {
+    "organizers": EventMembership.ORGANIZER,
+    "speakers": EventMembership.SPEAKER,
+    "attendees": EventMembership.ATTENDEE,
+}
+
+
+def event_field_names():
+    return tuple(EventSerializer().fields)
+
+
+def parse_event_fieldset(params):
+    """
+    Return (fields, expand) from the query parameters: fields is None for
+    every field, expand the set of relations to embed. Raises ValueError
+    on unknown names.
+    """
+    fields = params.get("fields")
+    fields = None if fields is None else {name for name in fields.split(",") if name}
+    expand = params.get("expand")
+    if expand is None:
+        # Without a fieldset the full response keeps its embedded relations
+        expand = set(EXPANDABLE) if fields is None else set()
+    else:
+        expand = {name for name in expand.split(",") if name}
+
+    unknown = (fields or set()) - set(event_field_names())
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    if expand - set(EXPANDABLE):
+        raise ValueError(f"expand must be among {', '.join(EXPANDABLE)}.")
+    return fields, expand
+
+
+def fieldset_tag(fields, expand):
+    """A short, order-independent name of a fieldset, for ETags."""
+    if fields is None and expand == set(EXPANDABLE):
+        return "full"
+    return f"{','.join(sorted(fields or ['*']))};{','.join(sorted(expand))}"
+
+
+def event_queryset(queryset, user, fields, expand):
+    """Restrict the columns and prefetches of an event queryset to a fieldset."""
+    def requested(name):
+        return fields is None or name in fields or name in expand
+
+    if fields is not None:
+        columns = [
+            field.name for field in Event._meta.concrete_fields
+            if field.name in fields or field.attname in fields
+        ]
+        queryset = queryset.only("id", *columns)
+
+    # One membership prefetch serves every role, reading user columns only
+    # for the roles embedded in full
+    roles = [role for name, role in ROLE_FIELDS.items() if requested(name)]
+    if roles:
+        user_columns = ["user__id"]
+        if {"organizers", "speakers"} & expand:
+            user_columns += [f"user__{name}" for name in UserSerializer.Meta.fields if name != "id"]
+        memberships = (
+            EventMembership.objects.filter(role__in=roles)
+            .select_related("user")
+            .only("event_id", "role", "user_id", *user_columns)
+            .order_by("user_id")
+        )
+        queryset = queryset.prefetch_related(Prefetch("memberships", queryset=memberships))
+    if "quizzes" in expand:
+        queryset = queryset.prefetch_related(
+            Prefetch("quizzes", queryset=Quiz.objects.prefetch_related(
+                Prefetch("questions", queryset=Question.objects.prefetch_related("options"))
+            ))
+        )
+    elif requested("quizzes"):
+        queryset = queryset.prefetch_related(Prefetch("quizzes", queryset=Quiz.objects.only("id", "event_id")))
+    if requested("materials"):
+        materials = Material.objects.all() if "materials" in expand else Material.objects.only("id", "event_id")
+        queryset = queryset.prefetch_related(Prefetch("materials", queryset=materials))
+
+    if requested("has_unread_update"):
+        queryset = queryset.annotate(has_unread=Exists(
+            EventNotification.objects.filter(user=user, event=OuterRef("pk"), is_viewed=False)
+        ))
+    return queryset
@@ -0,0 +1,169 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from . import metrics
+from .leaderboard import record_quiz_score
+from .models import Question, UserQuizResponse, UserQuestionAnswer
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Answer keys only change when an organizer edits the quiz, and the signals in
+# signals.py drop the cached copy when that happens
+ANSWER_KEY_TIMEOUT = 60 * 60
+
+
+class GradingError(Exception):
+    """Raised when a submission cannot be graded against its quiz."""
+
+
+def answer_key_cache_key(quiz_id):
+    return f"quiz:{quiz_id}:answer_key"
+
+
+def build_answer_key(quiz_id):
+    """
+    Load the answer key of a quiz in a single query.
+
+    Returns a dict mapping question id -> (valid option ids, correct option ids).
+    """
+    answer_key = {}
+    rows = Question.objects.filter(quiz_id=quiz_id).values_list(
+        "id", "options__id", "options__is_correct"
+    )
+    for question_id, option_id, is_correct in rows:
+        options, correct = answer_key.setdefault(question_id, (set(), set()))
+        if option_id is None:
+            continue  # Question without options
+        options.add(option_id)
+        if is_correct:
+            correct.add(option_id)
+
+    return {
+        question_id: (frozenset(options), frozenset(correct))
+        for question_id, (options, correct) in answer_key.items()
+    }
+
+
+def get_answer_key(quiz_id):
+    """Return the cached answer key of a quiz, building it on a miss."""
+    key = answer_key_cache_key(quiz_id)
+    answer_key = cache.get(key)
+    metrics.cache_lookup("answer_key", answer_key is not None)
+    if answer_key is None:
+        answer_key = build_answer_key(quiz_id)
+        cache.set(key, answer_key, ANSWER_KEY_TIMEOUT)
+    return answer_key
+
+
+def invalidate_answer_key(quiz_id):
+    cache.delete(answer_key_cache_key(quiz_id))
+
+
+def normalize_answers(answers):
+    """
+    Accept either {"<question_id>": <option_id>} or
+    [{"question": <question_id>, "option": <option_id>}] and return a dict
+    of integer ids. Unanswered questions may use null as the option.
+    """
+    if isinstance(answers, dict):
+        items = answers.items()
+    elif isinstance(answers, list):
+        try:
+            items = [(answer["question"], answer.get("option")) for answer in answers]
+        except (TypeError, KeyError, AttributeError):
+            raise GradingError("Each answer needs a 'question' and an 'option'.")
+    else:
+        raise GradingError("Answers must be an object or a list.")
+
+    normalized = {}
+    for question_id, option_id in items:
+        try:
+            question_id = int(question_id)
+            option_id = int(option_id) if option_id is not None else None
+        except (TypeError, ValueError):
+            raise GradingError("Question and option ids must be integers.")
+        normalized[question_id] = option_id
+    return normalized
+
+
+def grade_answers(answer_key, answers):
+    """
+    Grade a full answer set against an answer key without touching the database.
+
+    Returns a list of (question_id, option_id, is_correct) tuples covering
+    every question of the quiz, and the number of correct answers.
+    """
+    unknown = set(answers) - set(answer_key)
+    if unknown:
+        raise GradingError(
+            f"Questions {sorted(unknown)} do not belong to this quiz."
+        )
+
+    graded = []
+    correct_count = 0
+    for question_id, (options, correct) in answer_key.items():
+        option_id = answers.get(question_id)
+        if option_id is not None and option_id not in options:
+            raise GradingError(
+                f"Option {option_id} is not a choice of question {question_id}."
+            )
+        is_correct = option_id in correct
+        if is_correct:
+            correct_count += 1
+        graded.append((question_id, option_id, is_correct))
+
+    return graded, correct_count
+
+
+def score_percentage(correct_count, total_questions):
+    if total_questions == 0:
+        return 0
+    return int((correct_count / total_questions) * 100)
+
+
+def submit_quiz_response(quiz, user, answers):
+    """
+    Grade and store a user's answers to a quiz.
+
+    The response, its score, all answer rows (through a single bulk_create)
+    and the user's leaderboard entry are written in one transaction.
+    """
+    answer_key = get_answer_key(quiz.id)
+    graded, correct_count = grade_answers(answer_key, normalize_answers(answers))
+    score = score_percentage(correct_count, len(answer_key))
+
+    # The database backend begins transactions IMMEDIATE, so the write lock
+    # is taken before the check and concurrent submissions run one at a time
+    with transaction.atomic():
+        if UserQuizResponse.objects.filter(
+            user=user, quiz=quiz, completed_at__isnull=False
+        ).exists():
+            raise GradingError("You have already submitted this quiz.")
+
+        response = UserQuizResponse.objects.create(
+            user=user,
+            quiz=quiz,
+            completed_at=timezone.now(),
+            score=score,
+        )
+        UserQuestionAnswer.objects.bulk_create(
+            [
+                UserQuestionAnswer(
+                    quiz_response=response,
+                    question_id=question_id,
+                    selected_option_id=option_id,
+                    is_correct=is_correct,
+                )
+                for question_id, option_id, is_correct in graded
+            ]
+        )
+        record_quiz_score(quiz.event_id, user.id, score)
+
+    logger.info(
+        f"Graded quiz {quiz.id} for user {user.id}: {correct_count}/{len(answer_key)}"
+    )
+    response.correct_count = correct_count
+    response.total_questions = len(answer_key)
+    response.graded_answers = graded
+    return response
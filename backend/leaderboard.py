@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import Rank
+
+from .models import EventLeaderboardEntry, UserQuizResponse
+
+
+def record_quiz_score(event_id, user_id, score_delta, completed_delta=1):
+    """
+    Apply a change of a user's quiz total to the materialized leaderboard of
+    an event, keeping every stored rank correct.
+
+    Ranks are competition ranks (1 + number of users with a strictly higher
+    total), so a change from `old` to `new` only moves the users whose total
+    lies between the two. That shift is a single range UPDATE on the
+    (event, total_score) index. Entries left without any completed quiz are
+    removed. Returns the entry, or None when the user has no entry.
+    """
+    with transaction.atomic():
+        entry = (
+            EventLeaderboardEntry.objects.select_for_update()
+            .filter(event_id=event_id, user_id=user_id)
+            .first()
+        )
+        others = EventLeaderboardEntry.objects.filter(event_id=event_id).exclude(
+            user_id=user_id
+        )
+
+        if entry is None:
+            if completed_delta <= 0:
+                # Nothing to take away, e.g. the event is being deleted
+                return None
+            new_score = score_delta
+            # A new entry passes everyone below its score
+            others.filter(total_score__lt=new_score).update(rank=F("rank") + 1)
+            entry = EventLeaderboardEntry(event_id=event_id, user_id=user_id)
+        else:
+            old_score = entry.total_score
+            new_score = old_score + score_delta
+
+            if entry.quizzes_completed + completed_delta <= 0:
+                # Users below the removed entry move up one place
+                others.filter(total_score__lt=old_score).update(rank=F("rank") - 1)
+                entry.delete()
+                return None
+
+            if new_score > old_score:
+                others.filter(
+                    total_score__gte=old_score, total_score__lt=new_score
+                ).update(rank=F("rank") + 1)
+            elif new_score < old_score:
+                others.filter(
+                    total_score__gte=new_score, total_score__lt=old_score
+                ).update(rank=F("rank") - 1)
+
+        entry.total_score = new_score
+        entry.quizzes_completed += completed_delta
+        entry.rank = 1 + others.filter(total_score__gt=new_score).count()
+        entry.save()
+        return entry
+
+
+def top_entries(event_id, limit=10):
+    """Return the first `limit` leaderboard entries of an event, best first."""
+    return (
+        EventLeaderboardEntry.objects.filter(event_id=event_id)
+        .select_related("user")
+        .order_by("rank", "user_id")[:limit]
+    )
+
+
+def entry_for(event_id, user_id):
+    return (
+        EventLeaderboardEntry.objects.filter(event_id=event_id, user_id=user_id)
+        .select_related("user")
+        .first()
+    )
+
+
+def compute_leaderboard_rows(event_ids=None):
+    """
+    Recompute leaderboard rows from the completed quiz responses, as
+    (event_id, user_id) -> (total_score, quizzes_completed, rank).
+    """
+    responses = UserQuizResponse.objects.filter(completed_at__isnull=False)
+    if event_ids is not None:
+        responses = responses.filter(quiz__event_id__in=event_ids)
+
+    rows = (
+        responses.values("quiz__event_id", "user_id")
+        .annotate(total=Sum("score"), completed=Count("id"))
+        .annotate(
+            position=Window(
+                expression=Rank(),
+                partition_by=[F("quiz__event_id")],
+                order_by=F("total").desc(),
+            )
+        )
+        .values_list("quiz__event_id", "user_id", "total", "completed", "position")
+    )
+    return {
+        (event_id, user_id): (total, completed, position)
+        for event_id, user_id, total, completed, position in rows
+    }
+
+
+def stored_leaderboard_rows(event_ids=None):
+    entries = EventLeaderboardEntry.objects.all()
+    if event_ids is not None:
+        entries = entries.filter(event_id__in=event_ids)
+    return {
+        (event_id, user_id): (total, completed, rank)
+        for event_id, user_id, total, completed, rank in entries.values_list(
+            "event_id", "user_id", "total_score", "quizzes_completed", "rank"
+        ).iterator(chunk_size=5_000)
+    }
+
+
+def leaderboard_differences(event_ids=None):
+    """Return the keys whose stored row differs from a fresh recomputation."""
+    expected = compute_leaderboard_rows(event_ids)
+    stored = stored_leaderboard_rows(event_ids)
+    return sorted(
+        key for key in expected.keys() | stored.keys()
+        if expected.get(key) != stored.get(key)
+    )
+
+
+def rebuild_leaderboards(event_ids=None, batch_size=5_000):
+    """Replace the stored leaderboard rows with a fresh recomputation."""
+    rows = compute_leaderboard_rows(event_ids)
+    with transaction.atomic():
+        entries = EventLeaderboardEntry.objects.all()
+        if event_ids is not None:
+            entries = entries.filter(event_id__in=event_ids)
+        entries.delete()
+        EventLeaderboardEntry.objects.bulk_create(
+            [
+                EventLeaderboardEntry(
+                    event_id=event_id,
+                    user_id=user_id,
+                    total_score=total,
+                    quizzes_completed=completed,
+                    rank=rank,
+                )
+                for (event_id, user_id), (total, completed, rank) in rows.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(rows)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.rollups import rebuild_rollups, rollup_differences
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly sales rollups from tickets and payments and verify them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event", type=int, action="append", dest="events",
+            help="Only backfill the rollups of this event (repeatable).",
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report rollups that differ from a recomputation, without writing.",
+        )
+
+    def handle(self, *args, **options):
+        event_ids = options["events"]
+
+        if not options["check"]:
+            count = rebuild_rollups(event_ids)
+            self.stdout.write(f"Rebuilt {count} sales rollups.")
+
+        differences = rollup_differences(event_ids)
+        if differences:
+            for event_id, bucket in differences[:20]:
+                self.stdout.write(f"  event {event_id}, hour {bucket:%Y-%m-%d %H:00} differs")
+            raise CommandError(f"{len(differences)} sales rollups are out of date.")
+
+        self.stdout.write(self.style.SUCCESS("Sales rollups match the tickets and payments."))
@@ -0,0 +1,112 @@
+import datetime
+import random
+import time
+import tracemalloc
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from django.utils import timezone
+
+from backend.benchmark import summarize_latencies, throwaway_database
+from backend.calendar_feeds import feed_token
+from backend.models import Event, EventMembership, User
+
+ROLE_WEIGHTS = {EventMembership.ATTENDEE: 8, EventMembership.SPEAKER: 1, EventMembership.ORGANIZER: 1}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the ICS feed of a user with thousands of events: full streamed "
+        "downloads against conditional requests answered with 304."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=5_000, help="Events of the feed's user.")
+        parser.add_argument("--other-events", type=int, default=20_000, help="Events of other users.")
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=343)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        with throwaway_database():
+            user = self.seed(options)
+            self.run(user, options["repeats"])
+
+    def run(self, user, repeats):
+        client = Client()
+        url = f"/api/calendar/{feed_token(user.id)}/events.ics"
+
+        # Memory is traced in a separate pass since tracing slows everything down
+        tracemalloc.start()
+        response = client.get(url)
+        for chunk in response.streaming_content:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        full, conditional = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as full_queries:
+                response = client.get(url)
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            full.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as conditional_queries:
+                not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            conditional.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f"full feed  {response.status_code}  {size / 2**20:.1f} MiB  "
+            f"{len(full_queries)} queries  peak {peak / 2**20:.1f} MiB  {summarize_latencies(full)}"
+        )
+        self.stdout.write(
+            f"unchanged  {not_modified.status_code}  {len(conditional_queries)} queries  "
+            f"{summarize_latencies(conditional)}"
+        )
+
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        password = make_password("benchmark")
+        user, other = User.objects.bulk_create([
+            User(email=f"calendar{i}@bench.local", first_name="Bench", last_name=str(i), password=password)
+            for i in range(2)
+        ])
+
+        now = timezone.now()
+        total = options["events"] + options["other_events"]
+        events = Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Calendar benchmark {i}",
+                    description="Talks, workshops and a closing panel.\nBring a laptop; coffee provided.",
+                    date=now + datetime.timedelta(hours=rng.randint(-24 * 365, 24 * 365)),
+                    location=f"Hall {i % 12}",
+                )
+                for i in range(total)
+            ],
+            batch_size=batch_size,
+        )
+
+        # Spread the user's events over the roles; the other events belong to
+        # someone else so that the feed queries have to skip them
+        roles = [role for role, weight in ROLE_WEIGHTS.items() for _ in range(weight)]
+        memberships = {role: [] for role in ROLE_WEIGHTS}
+        for i, event in enumerate(events):
+            role = rng.choice(roles)
+            memberships[role].append((event.id, user.id if i < options["events"] else other.id))
+        EventMembership.objects.bulk_create(
+            [
+                EventMembership(event_id=event_id, user_id=user_id, role=role)
+                for role, rows in memberships.items()
+                for event_id, user_id in rows
+            ],
+            batch_size=batch_size,
+        )
+        return user
@@ -0,0 +1,231 @@
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+import stripe
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+from rest_framework.test import APIClient
+
+from backend.benchmark import throwaway_database
+from backend.models import Event, EventMembership, Quiz, Ticket, User
+from backend.quiz_payloads import bump_quiz_version
+
+DEFAULT_BUDGETS = Path(__file__).resolve().parents[2] / "benchmark_budgets.json"
+
+# Fixed so that every run seeds exactly the same dataset
+SEED = 343
+ANCHOR_DATE = "2025-04-01"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed scratch databases at several scales, exercise the main API endpoints "
+        "and compare SQL query counts, latency and peak memory against committed budgets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="0.1,1", help="Comma-separated generate_data scales.")
+        parser.add_argument("--repeats", type=int, default=5)
+        parser.add_argument("--budgets", default=str(DEFAULT_BUDGETS))
+        parser.add_argument(
+            "--time-tolerance", type=float, default=None,
+            help="Also check latency against the budgets multiplied by this, e.g. 1 on the machine "
+                 "that recorded them. Latency depends on the machine, so it is not checked by default.",
+        )
+        parser.add_argument(
+            "--write-budgets", action="store_true",
+            help="Record the measurements as the new budgets instead of checking them.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        scales = [scale.strip() for scale in options["scales"].split(",") if scale.strip()]
+        budgets_path = Path(options["budgets"])
+        budgets = json.loads(budgets_path.read_text()) if budgets_path.exists() else {}
+
+        results = {}
+        for scale in scales:
+            self.stdout.write(f"Scale {scale}")
+            with throwaway_database(), tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root,
+                FRONTEND_URL="http://localhost:3000",
+                EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            ):
+                call_command(
+                    "generate_data", scale=float(scale), seed=SEED,
+                    anchor_date=ANCHOR_DATE, verbosity=0, stdout=open("/dev/null", "w"),
+                )
+                results[scale] = self.run_cases(options["repeats"])
+
+        if options["write_budgets"]:
+            budgets_path.write_text(json.dumps(self.as_budgets(results), indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote budgets to {budgets_path}"))
+            return
+
+        failures = self.check_budgets(results, budgets, options["time_tolerance"])
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(f"  {failure}"))
+            raise CommandError(f"{len(failures)} endpoint budgets not met.")
+        self.stdout.write(self.style.SUCCESS("All endpoints are within budget."))
+
+    def run_cases(self, repeats):
+        results = {}
+        for name, prepare in self.cases():
+            measurement = self.measure(prepare, repeats)
+            results[name] = measurement
+            self.stdout.write(
+                f"  {name:<18} {measurement['status']}  {measurement['queries']:>5} queries  "
+                f"{measurement['ms']:>9.2f}ms  {measurement['peak_kib']:>8.0f}KiB  "
+                f"payload {measurement['payload_kib']:>8.1f}KiB"
+            )
+        return results
+
+    def measure(self, prepare, repeats):
+        """Run a case `repeats` times plus one traced run for peak memory."""
+        timings = []
+        queries = status = None
+        for _ in range(repeats + 1):
+            request = prepare()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = request()
+                timings.append(time.perf_counter() - start)
+            queries, status = len(context), response.status_code
+
+        request = prepare()
+        tracemalloc.start()
+        try:
+            request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "status": status,
+            "queries": queries,
+            # The first run warms up imports and caches
+            "ms": round(statistics.median(timings[1:]) * 1000, 3),
+            "peak_kib": round(peak / 1024, 1),
+            "payload_kib": round(len(response.content) / 1024, 1),
+        }
+
+    def cases(self):
+        """Yield (name, prepare) pairs; prepare() returns the request to time."""
+        busiest_user = User.objects.annotate(events=Count("event_memberships")).order_by("-events", "id").first()
+        attendees = Count("memberships", filter=Q(memberships__role=EventMembership.ATTENDEE), distinct=True)
+        biggest_event = (
+            Event.objects.annotate(people=attendees, quiz_count=Count("quizzes", distinct=True))
+            .filter(quiz_count__gt=0)
+            .order_by("-people", "id")
+            .first()
+        )
+        organizer = biggest_event.organizers.order_by("id").first()
+        quiz = Quiz.objects.filter(event=biggest_event).annotate(n=Count("questions")).order_by("-n", "id").first()
+        paid_event = Event.objects.filter(ticket_price__gt=0).order_by("id").first()
+        outsider = User.objects.exclude(event_memberships__event=paid_event).order_by("id").first()
+
+        def client_for(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            return client
+
+        busy_client = client_for(busiest_user)
+        organizer_client = client_for(organizer)
+        outsider_client = client_for(outsider)
+
+        # Card views only need these fields
+        card = {"fields": "id,title,date,event_type"}
+        yield "events-list", lambda: (lambda: busy_client.get("/api/events/"))
+        yield "events-list-card", lambda: (lambda: busy_client.get("/api/events/", card))
+        yield "event-detail", lambda: (lambda: organizer_client.get(f"/api/events/{biggest_event.id}/"))
+        yield "event-detail-card", lambda: (lambda: organizer_client.get(f"/api/events/{biggest_event.id}/", card))
+
+        def quiz_detail():
+            bump_quiz_version(quiz.id)  # Time the cold path; warm reads are a cache hit
+            return lambda: organizer_client.get(f"/api/quizzes/{quiz.id}/")
+        yield "quiz-detail", quiz_detail
+
+        yield "user-search", lambda: (lambda: busy_client.get("/api/users/search/", {"search": "an"}))
+
+        def checkout():
+            session = stripe.checkout.Session.construct_from(
+                {"id": "cs_test_benchmark", "url": "https://checkout.stripe.test/cs_test_benchmark"}, "sk_test"
+            )
+
+            def request():
+                with mock.patch.object(stripe, "api_key", "sk_test_benchmark"), \
+                        mock.patch.object(stripe.checkout.Session, "create", return_value=session):
+                    return outsider_client.post(f"/api/events/{paid_event.id}/checkout/")
+            return request
+        yield "checkout", checkout
+
+        counter = iter(range(10**9))
+
+        def webhook():
+            ticket = Ticket.objects.create(user=outsider, event=paid_event, is_paid=False)
+            payload = stripe.Event.construct_from({
+                "type": "checkout.session.completed",
+                "data": {"object": {
+                    "amount_total": int(paid_event.ticket_price * 100),
+                    "payment_intent": f"pi_benchmark_{next(counter)}",
+                    "metadata": {
+                        "event_id": str(paid_event.id),
+                        "user_id": str(outsider.id),
+                        "ticket_id": str(ticket.id),
+                    },
+                }},
+            }, "sk_test")
+
+            def request():
+                with mock.patch.object(stripe.Webhook, "construct_event", return_value=payload):
+                    return APIClient().post("/webhook/stripe/", data=b"{}", content_type="application/json")
+            return request
+        yield "stripe-webhook", webhook
+
+    def as_budgets(self, results):
+        """Exact query counts, with headroom on the machine-dependent numbers."""
+        return {
+            scale: {
+                name: {
+                    "queries": measurement["queries"],
+                    "ms": round(max(measurement["ms"] * 3, 20), 1),
+                    "peak_kib": round(max(measurement["peak_kib"] * 2, 256)),
+                }
+                for name, measurement in endpoints.items()
+            }
+            for scale, endpoints in results.items()
+        }
+
+    def check_budgets(self, results, budgets, time_tolerance):
+        failures = []
+        for scale, endpoints in results.items():
+            for name, measurement in endpoints.items():
+                if measurement["status"] >= 400:
+                    failures.append(f"{name} @ {scale}: HTTP {measurement['status']}")
+                budget = budgets.get(scale, {}).get(name)
+                if budget is None:
+                    failures.append(f"{name} @ {scale}: no budget recorded")
+                    continue
+                # Query counts are exact, so a budget left above the measurement is stale
+                if measurement["queries"] != budget["queries"]:
+                    failures.append(
+                        f"{name} @ {scale}: {measurement['queries']} queries != budget {budget['queries']}"
+                    )
+                if time_tolerance is not None and measurement["ms"] > budget["ms"] * time_tolerance:
+                    failures.append(
+                        f"{name} @ {scale}: {measurement['ms']}ms > budget {budget['ms'] * time_tolerance}ms"
+                    )
+                if measurement["peak_kib"] > budget["peak_kib"]:
+                    failures.append(
+                        f"{name} @ {scale}: {measurement['peak_kib']}KiB > budget {budget['peak_kib']}KiB"
+                    )
+        return failures
@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from backend.benchmark import summarize_latencies, throwaway_database, timed
+from backend.grading import (
+    GradingError,
+    get_answer_key,
+    grade_answers,
+    invalidate_answer_key,
+    submit_quiz_response,
+)
+from backend.models import Event, EventMembership, Question, QuestionOption, Quiz, User
+
+
+class Command(BaseCommand):
+    help = "Benchmark quiz grading with many concurrent submissions on a scratch database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=1000)
+        parser.add_argument("--questions", type=int, default=20)
+        parser.add_argument("--options", type=int, default=4)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=343)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.run(options)
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        results = {}
+
+        with timed(results, "seed_s"):
+            quiz, users = self.seed(options)
+
+        answer_key = get_answer_key(quiz.id)
+        answer_sets = [
+            {
+                question_id: rng.choice(sorted(choices))
+                for question_id, (choices, _) in answer_key.items()
+            }
+            for _ in users
+        ]
+
+        # Grading alone, against the cached answer key
+        with timed(results, "grade_only_s"):
+            for answers in answer_sets:
+                grade_answers(answer_key, answers)
+
+        # Cold key: the first lookup pays for the single answer-key query
+        invalidate_answer_key(quiz.id)
+        start = time.perf_counter()
+        get_answer_key(quiz.id)
+        results["answer_key_build_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        latencies = []
+        failures = []
+
+        def submit(args):
+            user, answers = args
+            start = time.perf_counter()
+            try:
+                submit_quiz_response(quiz, user, answers)
+            except (GradingError, OperationalError) as e:
+                failures.append(str(e))
+            else:
+                latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        with timed(results, "submit_s"):
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                list(pool.map(submit, zip(users, answer_sets)))
+
+        submissions = len(users)
+        self.stdout.write(f"Submissions:            {submissions}")
+        self.stdout.write(f"Questions per quiz:     {len(answer_key)}")
+        self.stdout.write(f"Workers:                {options['workers']}")
+        self.stdout.write(f"Seeding:                {results['seed_s']:.2f}s")
+        self.stdout.write(f"Answer key build:       {results['answer_key_build_ms']}ms")
+        self.stdout.write(
+            f"Grading only:           {results['grade_only_s'] * 1000:.1f}ms "
+            f"({submissions / results['grade_only_s']:.0f}/s)"
+        )
+        self.stdout.write(
+            f"Grade + store:          {results['submit_s']:.2f}s "
+            f"({len(latencies) / results['submit_s']:.0f}/s)"
+        )
+        self.stdout.write(f"Per submission:         {summarize_latencies(latencies)}")
+        if failures:
+            self.stdout.write(self.style.WARNING(
+                f"Failed submissions:     {len(failures)} (first: {failures[0]})"
+            ))
+
+    def seed(self, options):
+        event = Event.objects.create(
+            title="Grading benchmark",
+            description="Benchmark event",
+            date=timezone.now(),
+            location="Benchmark hall",
+        )
+        quiz = Quiz.objects.create(event=event, title="Benchmark quiz", visible=True)
+
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, question_text=f"Question {i}", question_type="multiple_choice")
+            for i in range(options["questions"])
+        ])
+        QuestionOption.objects.bulk_create([
+            QuestionOption(question=question, option_text=f"Option {j}", is_correct=(j == 0))
+            for question in questions
+            for j in range(options["options"])
+        ])
+
+        # Hash once, every benchmark user shares the same password
+        password = make_password("benchmark")
+        users = User.objects.bulk_create([
+            User(
+                email=f"grader{i}@bench.local",
+                first_name="Bench",
+                last_name=str(i),
+                password=password,
+            )
+            for i in range(options["submissions"])
+        ])
+        EventMembership.objects.bulk_create([
+            EventMembership(event_id=event.id, user_id=user.id, role=EventMembership.ATTENDEE)
+            for user in users
+        ])
+        return quiz, users
@@ -0,0 +1,144 @@
+import random
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.analytics import compute_quiz_analytics, get_quiz_analytics, load_answer_rows
+from backend.benchmark import throwaway_database, timed
+from backend.grading import get_answer_key, grade_answers, score_percentage
+from backend.models import (
+    Event,
+    Question,
+    QuestionOption,
+    Quiz,
+    User,
+    UserQuestionAnswer,
+    UserQuizResponse,
+)
+
+
+class Command(BaseCommand):
+    help = "Time the quiz item analytics on a scratch database with many responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--responses", type=int, default=100_000)
+        parser.add_argument("--questions", type=int, default=20)
+        parser.add_argument("--options", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=343)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.run(options)
+
+    def run(self, options):
+        results = {}
+        with timed(results, "seed"):
+            quiz = self.seed(options)
+
+        with timed(results, "load"):
+            rows = load_answer_rows(quiz.id)
+        with timed(results, "load + compute"):
+            analytics = compute_quiz_analytics(quiz.id)
+        get_quiz_analytics(quiz.id)
+        with timed(results, "cached read"):
+            get_quiz_analytics(quiz.id)
+
+        self.stdout.write(f"Responses:        {analytics['responses']}")
+        self.stdout.write(f"Answer rows:      {len(rows)} ({rows.nbytes / 2**20:.1f} MiB)")
+        for label, seconds in results.items():
+            self.stdout.write(f"{label + ':':<18}{seconds * 1000:.1f}ms")
+        hardest = min(analytics["questions"], key=lambda q: q["p_value"] or 0)
+        self.stdout.write(
+            f"Hardest question: {hardest['question']} "
+            f"(p={hardest['p_value']}, r_pb={hardest['discrimination']})"
+        )
+
+    def seed(self, options):
+        """
+        Seed responses from a simple ability model so that the statistics are
+        not pure noise: stronger users pick the correct option more often.
+        """
+        rng = np.random.default_rng(options["seed"])
+        random.seed(options["seed"])
+        batch_size = options["batch_size"]
+        n = options["responses"]
+
+        event = Event.objects.create(
+            title="Analytics benchmark",
+            description="Benchmark event",
+            date=timezone.now(),
+            location="Benchmark hall",
+        )
+        quiz = Quiz.objects.create(event=event, title="Benchmark quiz", visible=True)
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, question_text=f"Question {i}", question_type="multiple_choice")
+            for i in range(options["questions"])
+        ])
+        QuestionOption.objects.bulk_create([
+            QuestionOption(question=question, option_text=f"Option {j}", is_correct=(j == 0))
+            for question in questions
+            for j in range(options["options"])
+        ])
+
+        answer_key = get_answer_key(quiz.id)
+        ordered_key = [
+            (question_id, sorted(choices), next(iter(correct)))
+            for question_id, (choices, correct) in sorted(answer_key.items())
+        ]
+        difficulty = rng.normal(0, 1, len(ordered_key))
+
+        password = make_password("benchmark")
+        now = timezone.now()
+        for start in range(0, n, batch_size):
+            size = min(batch_size, n - start)
+            users = User.objects.bulk_create([
+                User(
+                    email=f"analytics{start + i}@bench.local",
+                    first_name="Bench",
+                    last_name=str(start + i),
+                    password=password,
+                )
+                for i in range(size)
+            ])
+
+            ability = rng.normal(0, 1, size)
+            p_correct = 1 / (1 + np.exp(-(ability[:, None] - difficulty[None, :])))
+            is_right = rng.random((size, len(ordered_key))) < p_correct
+
+            responses = []
+            answer_sets = []
+            for i in range(size):
+                answers = {
+                    question_id: correct_id if is_right[i, j]
+                    else random.choice([c for c in choices if c != correct_id])
+                    for j, (question_id, choices, correct_id) in enumerate(ordered_key)
+                }
+                graded, correct_count = grade_answers(answer_key, answers)
+                answer_sets.append(graded)
+                responses.append(UserQuizResponse(
+                    user=users[i],
+                    quiz=quiz,
+                    completed_at=now,
+                    score=score_percentage(correct_count, len(answer_key)),
+                ))
+            responses = UserQuizResponse.objects.bulk_create(responses)
+
+            UserQuestionAnswer.objects.bulk_create(
+                [
+                    UserQuestionAnswer(
+                        quiz_response=response,
+                        question_id=question_id,
+                        selected_option_id=option_id,
+                        is_correct=is_correct,
+                    )
+                    for response, graded in zip(responses, answer_sets)
+                    for question_id, option_id, is_correct in graded
+                ],
+                batch_size=batch_size,
+            )
+            self.stdout.write(f"  seeded {start + size}/{n} responses", ending="\r")
+        self.stdout.write("")
+        return quiz
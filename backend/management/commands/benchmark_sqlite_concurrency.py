@@ -0,0 +1,153 @@
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.test.utils import override_settings
+
+from backend.benchmark import summarize_latencies, throwaway_database
+from backend.models import Event, EventMembership, EventNotification, Payment, Ticket, User
+
+# What django.db.backends.sqlite3 does out of the box: rollback journal,
+# FULL fsyncs, deferred transactions and no retries
+STOCK_OPTIONS = {
+    "pragmas": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+    },
+    "write_retries": 0,
+}
+TUNED_OPTIONS = {"transaction_mode": "IMMEDIATE"}
+
+# Relative frequency of each operation
+WORKLOAD = {"checkout": 3, "webhook": 2, "notify": 1, "read": 4}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress the SQLite backend with concurrent checkouts, webhooks, notification "
+        "fan-outs and reads, comparing stock settings with the tuned backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--scale", type=float, default=0.1, help="generate_data scale to seed.")
+        parser.add_argument("--seed", type=int, default=343)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite" or connection.settings_dict["ENGINE"] != "backend.sqlite":
+            raise CommandError('The default database must use the "backend.sqlite" engine.')
+
+        results = {}
+        for label, database_options in (("stock", STOCK_OPTIONS), ("tuned", TUNED_OPTIONS)):
+            results[label] = self.run(database_options, options)
+
+        for label, result in results.items():
+            self.stdout.write(
+                f"{label:<6} {result['ops_per_s']:>8.0f} ops/s  ok {result['ok']:>6}  "
+                f"locked {result['locked']:>5}  other errors {result['errors']:>3}  "
+                f"latency {summarize_latencies(result['latencies'])}"
+            )
+        if results["stock"]["ops_per_s"]:
+            gain = results["tuned"]["ops_per_s"] / results["stock"]["ops_per_s"]
+            self.stdout.write(self.style.SUCCESS(f"Throughput: {gain:.1f}x the stock settings"))
+
+    def run(self, database_options, options):
+        settings_dict = connection.settings_dict
+        old_options = settings_dict["OPTIONS"]
+        settings_dict["OPTIONS"] = {**old_options, **database_options}
+        connection.close()  # Reconnect with the options
+        try:
+            with throwaway_database(), tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(MEDIA_ROOT=media_root):
+                call_command(
+                    "generate_data", scale=options["scale"], seed=options["seed"],
+                    verbosity=0, stdout=open(os.devnull, "w"),
+                )
+                return self.stress(options)
+        finally:
+            settings_dict["OPTIONS"] = old_options
+            connection.close()
+
+    def stress(self, options):
+        user_ids = list(User.objects.values_list("id", flat=True))
+        events = list(Event.objects.values_list("id", "ticket_price"))
+        operations = [name for name, weight in WORKLOAD.items() for _ in range(weight)]
+
+        lock = threading.Lock()
+        totals = {"ok": 0, "locked": 0, "errors": 0, "latencies": []}
+        deadline = time.perf_counter() + options["seconds"]
+
+        def worker(number):
+            rng = random.Random(options["seed"] + number)
+            ok = locked = errors = 0
+            latencies = []
+            try:
+                while time.perf_counter() < deadline:
+                    operation = getattr(self, rng.choice(operations))
+                    start = time.perf_counter()
+                    try:
+                        operation(rng, rng.choice(user_ids), *rng.choice(events))
+                    except OperationalError:
+                        locked += 1
+                    except DatabaseError:
+                        errors += 1
+                    else:
+                        ok += 1
+                        latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+            with lock:
+                totals["ok"] += ok
+                totals["locked"] += locked
+                totals["errors"] += errors
+                totals["latencies"].extend(latencies)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["threads"])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        totals["ops_per_s"] = totals["ok"] / (time.perf_counter() - start)
+        return totals
+
+    # Each operation reads before it writes inside one transaction, the
+    # pattern that deadlocks deferred transactions
+
+    def checkout(self, rng, user_id, event_id, price):
+        with transaction.atomic():
+            if not Ticket.objects.filter(user_id=user_id, event_id=event_id).exists():
+                Ticket.objects.create(user_id=user_id, event_id=event_id, is_paid=not price)
+            EventMembership.objects.get_or_create(event_id=event_id, user_id=user_id, role=EventMembership.ATTENDEE)
+
+    def webhook(self, rng, user_id, event_id, price):
+        with transaction.atomic():
+            ticket = Ticket.objects.filter(event_id=event_id, is_paid=False).first()
+            if ticket is None:
+                ticket = Ticket.objects.create(user_id=user_id, event_id=event_id)
+            ticket.is_paid = True
+            ticket.save(update_fields=["is_paid"])
+            Payment.objects.create(
+                ticket=ticket, amount=price, payment_method="card",
+                transaction_id=f"pi_stress_{uuid.uuid4().hex}",
+            )
+
+    def notify(self, rng, user_id, event_id, price):
+        with transaction.atomic():
+            attendee_ids = EventMembership.objects.filter(
+                event_id=event_id, role=EventMembership.ATTENDEE
+            ).values_list("user_id", flat=True)
+            EventNotification.objects.filter(event_id=event_id, user_id__in=attendee_ids).update(is_viewed=False)
+
+    def read(self, rng, user_id, event_id, price):
+        list(Event.objects.for_member(user_id, EventMembership.ATTENDEE).order_by("date")[:20])
@@ -0,0 +1,383 @@
+from contextlib import contextmanager
+from datetime import datetime, time as datetime_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import math
+import multiprocessing
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from backend.grading import score_percentage
+from backend.leaderboard import rebuild_leaderboards
+from backend.rollups import rebuild_rollups
+from backend.models import (
+    Event,
+    EventMembership,
+    EventNotification,
+    Material,
+    Payment,
+    Question,
+    QuestionOption,
+    Quiz,
+    Ticket,
+    User,
+    UserQuestionAnswer,
+    UserQuizResponse,
+)
+
+# Rows per scale unit; everything else is drawn per event
+USERS_PER_SCALE = 1_000
+EVENTS_PER_SCALE = 100
+
+# Events generated (and committed) per unit of work
+EVENTS_PER_CHUNK = 50
+BATCH_SIZE = 2_000
+
+MATERIAL_FILE = "event_materials/generated/sample.pdf"
+
+FIRST_NAMES = [
+    "Sarah", "Michael", "Jennifer", "David", "Lisa", "Robert", "Emily", "James",
+    "Olivia", "Daniel", "Sophia", "Matthew", "Emma", "Andrew", "Chloe", "Ryan",
+    "Mia", "Kevin", "Grace", "Jason", "Nora", "Ethan", "Ava", "Lucas",
+]
+LAST_NAMES = [
+    "Johnson", "Smith", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore",
+    "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson",
+    "Garcia", "Martinez", "Robinson", "Clark", "Lewis", "Lee", "Walker", "Hall",
+]
+TOPICS = [
+    "Tech", "Marketing", "Data Science", "Leadership", "Design", "Cloud",
+    "Security", "Finance", "Startup", "AI", "Product", "Community",
+]
+FORMATS = ["Conference", "Workshop", "Summit", "Bootcamp", "Meetup", "Webinar", "Hackathon"]
+CITIES = ["Montreal, QC", "Toronto, ON", "San Francisco, CA", "New York, NY", "Austin, TX", "Seattle, WA"]
+PRICES = [Decimal("0.00"), Decimal("19.99"), Decimal("49.99"), Decimal("99.99"), Decimal("149.99"), Decimal("299.99")]
+
+# Models whose auto_now/auto_now_add timestamps are generated instead
+TIMESTAMPED_MODELS = [Event, EventNotification, Ticket, Payment, Quiz, Material, UserQuizResponse]
+
+
+@contextmanager
+def historical_timestamps():
+    """Let bulk_create keep generated timestamps instead of stamping now()."""
+    fields = [
+        field for model in TIMESTAMPED_MODELS for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def chunk_rng(seed, chunk_index):
+    """Each chunk draws from its own stream, whatever process generates it."""
+    return random.Random(f"{seed}:{chunk_index}")
+
+
+def generate_users(count, seed, password_hash):
+    rng = chunk_rng(seed, "users")
+    users = [
+        User(
+            email=f"gen{seed}-{i}@example.com",
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            phone=f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}" if rng.random() < 0.6 else None,
+            password=password_hash,
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+    # A known staff account for logging into the generated data
+    users[0].email = f"admin{seed}@example.com"
+    users[0].is_staff = users[0].is_superuser = True
+    return [user.id for user in User.objects.bulk_create(users, batch_size=BATCH_SIZE)]
+
+
+def attendee_count(rng, max_users):
+    """Heavy-tailed event sizes: most events are small, a few are huge."""
+    return min(max_users, int(rng.lognormvariate(math.log(20), 1.0)) + 1)
+
+
+def generate_event_chunk(chunk_index, seed, event_count, user_ids, anchor):
+    """Generate `event_count` events with all their related rows in one transaction."""
+    rng = chunk_rng(seed, chunk_index)
+    with historical_timestamps(), transaction.atomic():
+        events = []
+        for _ in range(event_count):
+            event_type = rng.choices(["in_person", "virtual", "hybrid"], weights=[5, 3, 2])[0]
+            city = rng.choice(CITIES)
+            date = anchor + timedelta(days=rng.uniform(-365, 180), hours=rng.randint(8, 19))
+            events.append(Event(
+                title=f"{rng.choice(TOPICS)} {rng.choice(FORMATS)} {date.year}",
+                description=f"A {rng.choice(TOPICS).lower()} event generated for load testing.",
+                date=date,
+                event_type=event_type,
+                location=f"Convention Center, {city}" if event_type != "virtual" else None,
+                virtual_location=f"https://zoom.us/j/{rng.randint(10**8, 10**9)}" if event_type != "in_person" else None,
+                ticket_price=rng.choices(PRICES, weights=[4, 2, 3, 2, 2, 1])[0],
+                updated_at=date - timedelta(days=rng.uniform(1, 60)),
+            ))
+        events = Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+
+        counts = {"events": len(events)}
+        organizers, speakers, attendees = [], [], []
+        notifications, tickets, pending_tickets = [], [], []
+        materials, quizzes = [], []
+
+        for event in events:
+            sample = rng.sample(user_ids, min(len(user_ids), attendee_count(rng, len(user_ids)) + 8))
+            event_organizers = sample[:rng.randint(1, 3)]
+            event_speakers = sample[3:3 + rng.randint(0, 5)]
+            event_attendees = sample[8:]
+            organizers += [(event.id, user_id) for user_id in event_organizers]
+            speakers += [(event.id, user_id) for user_id in event_speakers]
+            attendees += [(event.id, user_id) for user_id in event_attendees]
+
+            opened = event.date - timedelta(days=rng.randint(14, 120))
+            for user_id in event_attendees:
+                purchase_date = opened + (event.date - opened) * rng.random() ** 2
+                tickets.append(Ticket(user_id=user_id, event=event, is_paid=True, purchase_date=purchase_date))
+                if rng.random() < 0.3:
+                    notifications.append(EventNotification(
+                        user_id=user_id, event=event, is_viewed=rng.random() < 0.5, notified_at=event.updated_at,
+                    ))
+            # Abandoned checkouts leave unpaid tickets behind
+            if event.ticket_price > 0:
+                for user_id in rng.sample(user_ids, min(len(user_ids), len(event_attendees) // 10)):
+                    pending_tickets.append(Ticket(
+                        user_id=user_id, event=event, is_paid=False,
+                        purchase_date=opened + (event.date - opened) * rng.random(),
+                    ))
+
+            for i in range(rng.choices([0, 1, 2, 3, 4], weights=[2, 3, 3, 1, 1])[0]):
+                materials.append(Material(
+                    event=event, title=f"Session material {i + 1}", file=MATERIAL_FILE,
+                    visible=rng.random() < 0.8, uploaded_at=opened,
+                ))
+            for i in range(rng.choices([0, 1, 2, 3], weights=[3, 4, 2, 1])[0]):
+                quizzes.append(Quiz(event=event, title=f"Quiz {i + 1}", visible=rng.random() < 0.9, created_at=opened))
+
+        for field, role, rows in (
+            ("organizers", EventMembership.ORGANIZER, organizers),
+            ("speakers", EventMembership.SPEAKER, speakers),
+            ("attendees", EventMembership.ATTENDEE, attendees),
+        ):
+            EventMembership.objects.bulk_create(
+                [EventMembership(event_id=event_id, user_id=user_id, role=role) for event_id, user_id in rows],
+                batch_size=BATCH_SIZE,
+            )
+            counts[field] = len(rows)
+
+        EventNotification.objects.bulk_create(notifications, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        tickets = Ticket.objects.bulk_create(tickets + pending_tickets, batch_size=BATCH_SIZE)
+        Material.objects.bulk_create(materials, batch_size=BATCH_SIZE)
+        counts.update(notifications=len(notifications), tickets=len(tickets), materials=len(materials))
+
+        payments = [
+            Payment(
+                ticket=ticket,
+                amount=ticket.event.ticket_price,
+                payment_method=rng.choices(["credit_card", "paypal"], weights=[9, 1])[0],
+                transaction_id=f"gen_{seed}_{ticket.id}",
+                payment_date=ticket.purchase_date + timedelta(minutes=rng.randint(1, 30)),
+            )
+            for ticket in tickets if ticket.is_paid and ticket.event.ticket_price > 0
+        ]
+        Payment.objects.bulk_create(payments, batch_size=BATCH_SIZE)
+        counts["payments"] = len(payments)
+
+        counts.update(generate_quiz_rows(rng, quizzes, attendees))
+    return counts
+
+
+def generate_quiz_rows(rng, quizzes, attendees):
+    quizzes = Quiz.objects.bulk_create(quizzes, batch_size=BATCH_SIZE)
+
+    questions = []
+    for quiz in quizzes:
+        for i in range(rng.randint(3, 15)):
+            question_type = "true_false" if rng.random() < 0.3 else "multiple_choice"
+            questions.append(Question(quiz=quiz, question_text=f"Question {i + 1} of {quiz.title}", question_type=question_type))
+    questions = Question.objects.bulk_create(questions, batch_size=BATCH_SIZE)
+
+    options = []
+    for question in questions:
+        if question.question_type == "true_false":
+            correct = rng.randint(0, 1)
+            options += [
+                QuestionOption(question=question, option_text=text, is_correct=(i == correct))
+                for i, text in enumerate(["True", "False"])
+            ]
+        else:
+            correct = rng.randint(0, 3)
+            options += [
+                QuestionOption(question=question, option_text=f"Option {chr(65 + i)}", is_correct=(i == correct))
+                for i in range(4)
+            ]
+    options = QuestionOption.objects.bulk_create(options, batch_size=BATCH_SIZE)
+
+    # question -> (option ids, correct option id), per quiz
+    choices = {}
+    for option in options:
+        option_ids, correct_id = choices.get(option.question_id, ([], None))
+        option_ids.append(option.id)
+        choices[option.question_id] = (option_ids, option.id if option.is_correct else correct_id)
+    quiz_questions = {}
+    for question in questions:
+        quiz_questions.setdefault(question.quiz_id, []).append(question.id)
+
+    event_attendees = {}
+    for event_id, user_id in attendees:
+        event_attendees.setdefault(event_id, []).append(user_id)
+
+    responses, answer_sets = [], []
+    for quiz in quizzes:
+        question_ids = quiz_questions.get(quiz.id, [])
+        for user_id in event_attendees.get(quiz.event_id, []):
+            if rng.random() < 0.5:
+                continue
+            ability = rng.random()
+            graded = []
+            for question_id in question_ids:
+                option_ids, correct_id = choices[question_id]
+                option_id = correct_id if rng.random() < 0.35 + 0.6 * ability else rng.choice(option_ids)
+                graded.append((question_id, option_id, option_id == correct_id))
+            started_at = quiz.event.date + timedelta(minutes=rng.randint(0, 600))
+            responses.append(UserQuizResponse(
+                user_id=user_id,
+                quiz=quiz,
+                started_at=started_at,
+                completed_at=started_at + timedelta(minutes=rng.randint(2, 30)),
+                score=score_percentage(sum(is_correct for *_, is_correct in graded), len(question_ids)),
+            ))
+            answer_sets.append(graded)
+    responses = UserQuizResponse.objects.bulk_create(responses, batch_size=BATCH_SIZE)
+
+    answers = [
+        UserQuestionAnswer(quiz_response_id=response.id, question_id=question_id, selected_option_id=option_id, is_correct=is_correct)
+        for response, graded in zip(responses, answer_sets)
+        for question_id, option_id, is_correct in graded
+    ]
+    UserQuestionAnswer.objects.bulk_create(answers, batch_size=BATCH_SIZE)
+
+    return {
+        "quizzes": len(quizzes),
+        "questions": len(questions),
+        "options": len(options),
+        "responses": len(responses),
+        "answers": len(answers),
+    }
+
+
+def _run_chunk(args):
+    try:
+        return generate_event_chunk(*args)
+    finally:
+        connections.close_all()
+
+
+def _init_worker():
+    # SQLite serializes writers; give each process time to wait for the lock
+    for connection in connections.all():
+        if connection.vendor == "sqlite":
+            connection.settings_dict.setdefault("OPTIONS", {})["timeout"] = 300
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset covering every model, "
+        f"{USERS_PER_SCALE} users and {EVENTS_PER_SCALE} events per unit of --scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0)
+        parser.add_argument("--seed", type=int, default=343)
+        parser.add_argument(
+            "--anchor-date", default=None,
+            help="Date (YYYY-MM-DD) events are spread around; defaults to today. "
+                 "Pass it explicitly to reproduce a dataset on another day.",
+        )
+        parser.add_argument("--password", default="password123", help="Password of every generated user.")
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Processes generating events in parallel. The data only depends on "
+                 "--seed, but primary keys are only stable with a single worker.",
+        )
+        parser.add_argument("--flush", action="store_true", help="Empty the database first.")
+
+    def handle(self, *args, **options):
+        if options["scale"] <= 0:
+            raise CommandError("--scale must be positive.")
+
+        if options["flush"]:
+            call_command("flush", interactive=False, verbosity=0)
+
+        if options["anchor_date"]:
+            anchor_day = datetime.strptime(options["anchor_date"], "%Y-%m-%d").date()
+        else:
+            anchor_day = datetime.now(dt_timezone.utc).date()
+        anchor = datetime.combine(anchor_day, datetime_time(), tzinfo=dt_timezone.utc)
+
+        seed = options["seed"]
+        user_count = max(10, int(USERS_PER_SCALE * options["scale"]))
+        event_count = max(1, int(EVENTS_PER_SCALE * options["scale"]))
+        started = time.perf_counter()
+
+        if not default_storage.exists(MATERIAL_FILE):
+            default_storage.save(MATERIAL_FILE, ContentFile(b"Generated sample material."))
+
+        # One hash for everybody: hashing per user dominates seeding otherwise
+        password_hash = make_password(options["password"])
+        with transaction.atomic():
+            user_ids = generate_users(user_count, seed, password_hash)
+        self.stdout.write(f"Created {len(user_ids)} users ({time.perf_counter() - started:.1f}s)")
+
+        chunks = [
+            (index, seed, min(EVENTS_PER_CHUNK, event_count - start), user_ids, anchor)
+            for index, start in enumerate(range(0, event_count, EVENTS_PER_CHUNK))
+        ]
+        totals = {}
+        for counts in self.run_chunks(chunks, options["workers"]):
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+            self.stdout.write(
+                f"  {totals['events']}/{event_count} events ({time.perf_counter() - started:.1f}s)",
+                ending="\r",
+            )
+        self.stdout.write("")
+
+        rebuild_leaderboards()
+        rebuild_rollups()
+
+        elapsed = time.perf_counter() - started
+        rows = len(user_ids) + sum(totals.values())
+        for name, count in totals.items():
+            self.stdout.write(f"  {name:<14}{count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)."
+        ))
+
+    def run_chunks(self, chunks, workers):
+        if workers <= 1:
+            for chunk in chunks:
+                yield generate_event_chunk(*chunk)
+            return
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise CommandError("--workers needs a platform that supports fork().")
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(workers, initializer=_init_worker) as pool:
+            yield from pool.imap_unordered(_run_chunk, chunks)
@@ -0,0 +1,204 @@
+import statistics
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, migrations, models, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from backend.middleware import statement_template
+from backend.slow_queries import explain, filtered_columns, full_scans, partial_searches, read_log
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the queries captured in the slow-query log, point out full table "
+        "scans and propose composite indexes, timing each query before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=settings.SLOW_QUERY_LOG, help="Slow-query log to read.")
+        parser.add_argument("--repeats", type=int, default=5, help="Timed replays per query.")
+        parser.add_argument(
+            "--write-migration", action="store_true",
+            help="Write a backend migration adding the proposed indexes.",
+        )
+
+    def handle(self, *args, **options):
+        if not Path(options["log"]).exists():
+            raise CommandError(f"No slow-query log at {options['log']}.")
+
+        queries = self.load_queries(options["log"])
+        if not queries:
+            self.stdout.write("No SELECT statements in the log.")
+            return
+
+        self.table_models = {
+            model._meta.db_table: model for model in apps.get_models(include_auto_created=True)
+        }
+        proposals = {}
+        for query in queries:
+            query["plan"] = explain(connection, query["sql"], query["params"])
+            query["scans"] = full_scans(query["plan"])
+            query["proposals"] = []
+            candidates = [(table, []) for table in query["scans"]] + partial_searches(query["plan"])
+            for table, used_columns in candidates:
+                proposal = self.propose(query, table, used_columns)
+                if proposal:
+                    query["proposals"].append(proposal)
+                    proposals[proposal] = None
+
+        for query in queries:
+            query["before"] = self.time_query(query, options["repeats"])
+        if proposals:
+            self.measure_with_indexes(queries, list(proposals), options["repeats"])
+
+        self.report(queries)
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("No indexes to propose."))
+        elif options["write_migration"]:
+            path = self.write_migration(list(proposals))
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+            self.stdout.write("Add the same indexes to the Meta.indexes of the models:")
+            for model_name, fields in proposals:
+                self.stdout.write(f"  {model_name}: {self.build_index(model_name, fields)!r}")
+
+    def load_queries(self, path):
+        """Group the logged SELECTs by statement template, keeping the latest sample."""
+        groups = {}
+        for entry in read_log(path):
+            sql = entry.get("sql") or ""
+            if sql.lstrip()[:6].upper() != "SELECT":
+                continue
+            template = statement_template(sql)
+            group = groups.setdefault(template, {"count": 0, "max_ms": 0})
+            group.update(sql=sql, params=entry.get("params") or [], view=entry.get("view"))
+            group["count"] += 1
+            group["max_ms"] = max(group["max_ms"], entry.get("ms", 0))
+        return sorted(groups.values(), key=lambda group: -group["count"] * group["max_ms"])
+
+    def propose(self, query, table, used_columns):
+        """
+        Return (model label, field names) of an index for a table that is
+        scanned in full (no used columns) or searched through an index that
+        covers only some of the filtered columns, or None.
+        """
+        equality, ranges = filtered_columns(query["sql"], table)
+        if used_columns:
+            if set(equality) <= set(used_columns):
+                return None
+            # Keep the columns the planner already searches by in front
+            equality = [c for c in used_columns if c in equality] + [c for c in equality if c not in used_columns]
+
+        model = self.table_models.get(table)
+        if model is None:
+            query.setdefault("notes", []).append(f"{table}: not a model table")
+            return None
+        if model._meta.auto_created:
+            query.setdefault("notes", []).append(
+                f"{table}: automatic many-to-many table, index it through an explicit through model"
+            )
+            return None
+
+        columns = equality + ranges[:1]
+        if not columns:
+            query.setdefault("notes", []).append(f"{table}: no filter or ordering to index")
+            return None
+        if self.covered(table, columns):
+            query.setdefault("notes", []).append(
+                f"{table}: an index on ({', '.join(columns)}) exists, the planner chose a scan"
+            )
+            return None
+
+        fields_by_column = {field.column: field.name for field in model._meta.concrete_fields}
+        fields = tuple(fields_by_column[column] for column in columns if column in fields_by_column)
+        return (model._meta.label, fields) if fields else None
+
+    def covered(self, table, columns):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        return any(
+            constraint["columns"][: len(columns)] == columns
+            for constraint in constraints.values()
+            if constraint["index"] or constraint["unique"] or constraint["primary_key"]
+        )
+
+    def build_index(self, model_label, fields):
+        model = apps.get_model(model_label)
+        index = models.Index(fields=list(fields))
+        index.set_name_with_model(model)
+        return index
+
+    def time_query(self, query, repeats):
+        timings = []
+        with connection.cursor() as cursor:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                cursor.execute(query["sql"], query["params"])
+                cursor.fetchall()
+                timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def measure_with_indexes(self, queries, proposals, repeats):
+        """Create the proposed indexes in a transaction, time again and roll back."""
+        schema_editor = connection.SchemaEditorClass(connection, collect_sql=True)
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for model_label, fields in proposals:
+                        index = self.build_index(model_label, fields)
+                        cursor.execute(str(index.create_sql(apps.get_model(model_label), schema_editor)))
+                for query in queries:
+                    query["after"] = self.time_query(query, repeats)
+                    query["plan_after"] = explain(connection, query["sql"], query["params"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, queries):
+        flagged = [query for query in queries if query["scans"] or query["proposals"]]
+        self.stdout.write(
+            f"{len(queries)} distinct statements, {len(queries) - len(flagged)} fully served by indexes."
+        )
+        for number, query in enumerate(flagged, start=1):
+            self.stdout.write(
+                f"\n#{number} {query['view'] or '-'}: seen {query['count']}x, up to {query['max_ms']}ms"
+            )
+            self.stdout.write(f"  {query['sql'][:300]}")
+            self.stdout.write("  plan: " + " | ".join(query["plan"]))
+            for table in query["scans"]:
+                self.stdout.write(self.style.WARNING(f"  full scan of {table}"))
+            for note in query.get("notes", []):
+                self.stdout.write(f"  note: {note}")
+            for model_label, fields in query["proposals"]:
+                self.stdout.write(self.style.SUCCESS(f"  propose index on {model_label}({', '.join(fields)})"))
+            timing = f"  {query['before']:.2f}ms"
+            if "after" in query:
+                timing += f" -> {query['after']:.2f}ms with the proposed indexes"
+                self.stdout.write("  plan after: " + " | ".join(query["plan_after"]))
+            self.stdout.write(timing)
+
+    def write_migration(self, proposals):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        leaf = loader.graph.leaf_nodes("backend")[-1]
+        number = int(leaf[1].split("_")[0]) + 1
+
+        migration = migrations.Migration(f"{number:04d}_index_advisor", "backend")
+        migration.dependencies = [leaf]
+        migration.operations = [
+            migrations.AddIndex(
+                model_name=apps.get_model(model_label)._meta.model_name,
+                index=self.build_index(model_label, fields),
+            )
+            for model_label, fields in proposals
+        ]
+        writer = MigrationWriter(migration)
+        Path(writer.path).write_text(writer.as_string())
+        return writer.path
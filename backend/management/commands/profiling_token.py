@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from backend.profiling import TOKEN_HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed header value that makes the server profile a request."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{TOKEN_HEADER}: {make_token()}")
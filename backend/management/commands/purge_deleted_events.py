@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.event_deletion import PURGE_BATCH_SIZE, claim, pending_deletions, purge_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge the rows and material files of deleted events in batches, including "
+        "purges interrupted by a restart."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=PURGE_BATCH_SIZE,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0,
+            help="Seconds to wait between batches, to leave the database to the requests.",
+        )
+
+    def handle(self, *args, **options):
+        purged = 0
+        for deletion in pending_deletions().order_by("requested_at"):
+            if not claim(deletion):
+                self.stdout.write(f"Event {deletion.event_id} is being purged by another worker.")
+                continue
+            self.stdout.write(f"Purging event {deletion.event_id} ({deletion.title})")
+            rows = 0
+            for stage, count in purge_event(deletion, options["batch_size"]):
+                rows += count
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"  {stage}: {count} rows ({rows} so far)")
+                time.sleep(options["pause"])
+            deletion.refresh_from_db()
+            self.stdout.write(f"  {deletion.rows_deleted} rows and {deletion.files_deleted} files deleted")
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} deleted events."))
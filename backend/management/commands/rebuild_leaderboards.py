@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.leaderboard import leaderboard_differences, rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized quiz leaderboards from scratch and verify them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event", type=int, action="append", dest="events",
+            help="Only rebuild the leaderboard of this event (repeatable).",
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report entries that differ from a recomputation, without writing.",
+        )
+
+    def handle(self, *args, **options):
+        event_ids = options["events"]
+
+        if not options["check"]:
+            count = rebuild_leaderboards(event_ids)
+            self.stdout.write(f"Rebuilt {count} leaderboard entries.")
+
+        differences = leaderboard_differences(event_ids)
+        if differences:
+            for event_id, user_id in differences[:20]:
+                self.stdout.write(f"  event {event_id}, user {user_id} differs")
+            raise CommandError(f"{len(differences)} leaderboard entries are out of date.")
+
+        self.stdout.write(self.style.SUCCESS("Leaderboards match the quiz responses."))
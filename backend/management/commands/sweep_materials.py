@@ -0,0 +1,124 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import Material
+
+CHUNK_SIZE = 1_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete material files that no Material row references anymore. The storage "
+        "directory is streamed with os.scandir and checked against the database "
+        "one chunk of names at a time, so memory stays flat however many files there are."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Keep orphans modified more recently than this; uploads are saved before their row.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the orphans without deleting them.")
+        parser.add_argument(
+            "--rate", type=float, default=50,
+            help="At most this many deletions per second, 0 for no limit.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="File names checked per query.")
+
+    def handle(self, *args, **options):
+        field = Material._meta.get_field("file")
+        try:
+            root = field.storage.path("")
+        except NotImplementedError:
+            raise CommandError("Materials are not stored on the local filesystem.")
+        directory = os.path.join(root, field.upload_to)
+        if not os.path.isdir(directory):
+            self.stdout.write(f"No material directory at {directory}.")
+            return
+
+        self.options = options
+        self.cutoff = time.time() - options["grace_hours"] * 3600
+        self.totals = dict.fromkeys(("scanned", "referenced", "recent", "orphans", "deleted", "failed", "bytes"), 0)
+        self.last_delete = 0.0
+
+        chunk = []
+        for name, entry in self.scan(root, directory):
+            chunk.append((name, entry))
+            if len(chunk) >= options["chunk_size"]:
+                self.sweep(chunk)
+                chunk = []
+        if chunk:
+            self.sweep(chunk)
+
+        totals = self.totals
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        count = totals["orphans"] if options["dry_run"] else totals["deleted"]
+        self.stdout.write(
+            f"Scanned {totals['scanned']} files: {totals['referenced']} referenced, "
+            f"{totals['recent']} orphans within the grace period."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {count} orphaned files ({totals['bytes'] / 2**20:.1f} MiB)."
+        ))
+        if totals["failed"]:
+            raise CommandError(f"{totals['failed']} files could not be deleted.")
+
+    def scan(self, root, directory):
+        """Yield (storage name, DirEntry) for every file below directory, one directory open at a time."""
+        pending = [directory]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        # Names are stored relative to the storage root with forward slashes
+                        yield os.path.relpath(entry.path, root).replace(os.sep, "/"), entry
+
+    def sweep(self, chunk):
+        totals = self.totals
+        totals["scanned"] += len(chunk)
+        referenced = set(
+            Material.objects.filter(file__in=[name for name, _ in chunk]).values_list("file", flat=True)
+        )
+        totals["referenced"] += len(referenced)
+
+        for name, entry in chunk:
+            if name in referenced:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > self.cutoff:
+                totals["recent"] += 1
+                continue
+            totals["orphans"] += 1
+            if self.options["dry_run"]:
+                totals["bytes"] += stat.st_size
+                self.stdout.write(f"  {name}")
+                continue
+            self.throttle()
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                totals["failed"] += 1
+                self.stderr.write(f"Could not delete {name}: {e}")
+                continue
+            totals["deleted"] += 1
+            totals["bytes"] += stat.st_size
+            if self.options["verbosity"] > 1:
+                self.stdout.write(f"  deleted {name}")
+
+    def throttle(self):
+        """Space the deletions out to at most --rate per second."""
+        if self.options["rate"] <= 0:
+            return
+        wait = self.last_delete + 1 / self.options["rate"] - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_delete = time.monotonic()
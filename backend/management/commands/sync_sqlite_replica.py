@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over a local replica file, standing in "
+        "for replication when testing the read-replica router."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--replica", default="replica", help="Database alias of the replica.")
+
+    def handle(self, *args, **options):
+        alias = options["replica"]
+        if alias not in settings.DATABASES:
+            raise CommandError(f"No '{alias}' database; set SQLITE_REPLICA_PATH.")
+        primary = connections["default"].settings_dict
+        replica = connections[alias].settings_dict
+        if connections["default"].vendor != "sqlite" or connections[alias].vendor != "sqlite":
+            raise CommandError("Both databases must be SQLite; replicate other engines natively.")
+
+        connections[alias].close()
+        # The backup API copies a consistent snapshot, even from a live database
+        with sqlite3.connect(primary["NAME"]) as source, sqlite3.connect(replica["NAME"]) as target:
+            source.backup(target)
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']}"))
@@ -0,0 +1,237 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Every sample is a monotonically increasing number keyed by (name, labels);
+histograms store their buckets non-cumulatively and are cumulated when
+rendered. That keeps recording a plain dict update and makes merging a sum:
+
+- Each thread records into its own shard, so there is no lock on the hot path.
+  When a thread ends, its shard is folded into a shared total, so servers
+  that start a thread per request do not pile up shards.
+- With METRICS_DIR set, every process periodically writes its samples to
+  METRICS_DIR/<pid>.json and /metrics adds up the files of all processes, so
+  the totals stay correct behind a multi-worker server. Remove the directory
+  when the server restarts.
+
+Gauges are evaluated when /metrics is scraped, from callbacks registered
+with register_gauge().
+
+/metrics requires METRICS_TOKEN as a bearer token; without one it is only
+served with DEBUG on.
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+GAUGE = "gauge"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    "http_requests_total": (COUNTER, "HTTP requests by view, method and status code."),
+    "http_request_duration_seconds": (HISTOGRAM, "HTTP request latency by view."),
+    "http_request_db_seconds": (HISTOGRAM, "Time spent in database queries per HTTP request."),
+    "http_request_db_queries_total": (COUNTER, "Database queries run by HTTP requests."),
+    "cache_requests_total": (COUNTER, "Cache lookups by cache and result (hit or miss)."),
+    "emails_started_total": (COUNTER, "Emails whose sending started, by kind."),
+    "emails_sent_total": (COUNTER, "Emails sent by kind and result."),
+    "stripe_payments_for_deleted_events_total": (COUNTER, "Completed checkouts of deleted events, to be refunded."),
+}
+BUCKETS = {
+    "http_request_duration_seconds": LATENCY_BUCKETS,
+    "http_request_db_seconds": LATENCY_BUCKETS,
+}
+
+_gauges = {}
+# Live shards by id, and the samples of the threads that have ended
+_shards = {}
+_retired = {}
+# Reentrant: a finalizer can run during garbage collection with the lock held
+_shards_lock = threading.RLock()
+_local = threading.local()
+_last_flush = 0.0
+
+
+class _ThreadSentinel:
+    """Lives in the thread's local storage, which is cleared when the thread ends."""
+
+
+def _shard():
+    shard = getattr(_local, "samples", None)
+    if shard is None:
+        shard = _local.samples = {}
+        _local.sentinel = _ThreadSentinel()
+        with _shards_lock:  # Once per thread
+            _shards[id(shard)] = shard
+        weakref.finalize(_local.sentinel, _retire, shard)
+    return shard
+
+
+def _retire(shard):
+    """Fold the shard of an ended thread into the retired samples."""
+    with _shards_lock:
+        _shards.pop(id(shard), None)
+        for key, value in shard.items():
+            _retired[key] = _retired.get(key, 0) + value
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    shard = _shard()
+    key = (name, _labels(labels))
+    shard[key] = shard.get(key, 0) + amount
+
+
+def observe(name, value, **labels):
+    buckets = BUCKETS[name]
+    # Index len(buckets) is the +Inf bucket
+    le = bisect_left(buckets, value)
+    inc(f"{name}_bucket", le=le, **labels)
+    inc(f"{name}_sum", value, **labels)
+    inc(f"{name}_count", **labels)
+
+
+def cache_lookup(cache_name, hit):
+    inc("cache_requests_total", cache=cache_name, result="hit" if hit else "miss")
+
+
+def total(name, samples=None):
+    """Sum a counter over all its labels, from collect() unless samples are given."""
+    samples = collect() if samples is None else samples
+    return sum(value for (sample_name, _), value in samples.items() if sample_name == name)
+
+
+def register_gauge(name, help_text, callback):
+    """
+    Expose a gauge computed at scrape time. The callback returns a number or
+    a list of (labels dict, number) pairs.
+    """
+    _gauges[name] = (help_text, callback)
+
+
+def local_samples():
+    """Sum the shards of the threads of this process."""
+    with _shards_lock:
+        shards = list(_shards.values())
+        totals = dict(_retired)
+    for shard in shards:
+        # Copying a dict is atomic under the GIL, even while its thread writes
+        for key, value in dict(shard).items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _metrics_dir():
+    directory = getattr(settings, "METRICS_DIR", None)
+    return Path(directory) if directory else None
+
+
+def flush(force=False):
+    """Write this process's samples to METRICS_DIR, at most every METRICS_FLUSH_SECONDS."""
+    global _last_flush
+    directory = _metrics_dir()
+    now = time.monotonic()
+    if directory is None or (not force and now - _last_flush < getattr(settings, "METRICS_FLUSH_SECONDS", 5)):
+        return
+    _last_flush = now
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = [[name, list(labels), value] for (name, labels), value in local_samples().items()]
+    path = directory / f"{os.getpid()}.json"
+    temporary = path.with_suffix(f".tmp{threading.get_ident()}")
+    temporary.write_text(json.dumps(rows))
+    temporary.replace(path)  # Readers never see a partial file
+
+
+def collect():
+    """Return the samples of every process (or only this one without METRICS_DIR)."""
+    directory = _metrics_dir()
+    totals = local_samples()
+    if directory is None or not directory.exists():
+        return totals
+    own_file = f"{os.getpid()}.json"
+    for path in directory.glob("*.json"):
+        if path.name == own_file:
+            continue  # The live samples are newer
+        try:
+            rows = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in rows:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Render every metric in the Prometheus text exposition format."""
+    samples = collect()
+    by_metric = {}
+    for (name, labels), value in samples.items():
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        if metric_type == HISTOGRAM:
+            lines.extend(_render_histogram(name, by_metric))
+        else:
+            for labels, value in sorted(by_metric.get(name, [])):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for name, (help_text, callback) in sorted(_gauges.items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {GAUGE}")
+        value = callback()
+        series = value if isinstance(value, list) else [({}, value)]
+        for labels, number in series:
+            lines.append(f"{name}{_format_labels(_labels(labels))} {_format_value(number)}")
+    return "\n".join(lines) + "\n"
+
+
+def _render_histogram(name, by_metric):
+    buckets = BUCKETS[name]
+    counts = {}
+    for labels, value in by_metric.get(f"{name}_bucket", []):
+        le = dict(labels)["le"]
+        series = tuple(pair for pair in labels if pair[0] != "le")
+        counts.setdefault(series, [0] * (len(buckets) + 1))[le] += value
+    sums = dict(by_metric.get(f"{name}_sum", []))
+    totals = dict(by_metric.get(f"{name}_count", []))
+
+    lines = []
+    for series in sorted(counts):
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ["+Inf"], counts[series]):
+            cumulative += count
+            labels = series + (("le", bound),)
+            lines.append(f"{name}_bucket{_format_labels(labels)} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(series)} {_format_value(sums.get(series, 0))}")
+        lines.append(f"{name}_count{_format_labels(series)} {_format_value(totals.get(series, 0))}")
+    return lines
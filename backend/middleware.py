@@ -0,0 +1,228 @@
+import heapq
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, profiling
+from .slow_queries import SlowQueryRecorder
+
+logger = logging.getLogger(__name__)
+sql_logger = logging.getLogger("backend.sql")
+
+# Collapse IN lists and inline literals so that statements differing only in
+# their values share a template
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def statement_template(sql):
+    return _LITERAL.sub("?", _IN_LIST.sub("(...)", sql))
+
+
+class StatementTimer:
+    """
+    The one execute_wrapper of a request: it times every statement once and
+    hands (connection, sql, params, many, duration) to its listeners, so the
+    metrics, the SQL instrumentation and the slow-query log do not each wrap
+    and time the same statements.
+    """
+
+    def __init__(self):
+        self.listeners = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            for listener in self.listeners:
+                listener(context["connection"], sql, params, many, duration)
+
+
+def listen_to_queries(request, listener):
+    """Add a listener to the request's StatementTimer until the request ends."""
+    request.statement_timer.listeners.append(listener)
+
+
+class QueryTimingMiddleware:
+    """
+    Install a StatementTimer on every connection for the request. It must
+    come before the middleware that listen to it in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.statement_timer = StatementTimer()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(request.statement_timer))
+            return self.get_response(request)
+
+
+class QueryRecorder:
+    """Statement listener that keeps the duration and SQL of every statement."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, connection, sql, params, many, duration):
+        self.queries.append((duration, sql))
+
+    @property
+    def total_time(self):
+        return sum(duration for duration, _ in self.queries)
+
+    def slowest(self, n):
+        return heapq.nlargest(n, self.queries, key=lambda query: query[0])
+
+    def repeated_templates(self, threshold):
+        """Return {template: count} for templates run at least `threshold` times."""
+        # Count the raw statements first; ORM statements already use
+        # placeholders, so there are few distinct ones to normalize
+        counts = Counter()
+        for sql, count in Counter(sql for _, sql in self.queries).items():
+            counts[statement_template(sql)] += count
+        return {template: count for template, count in counts.items() if count >= threshold}
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the SQL run by a sample of requests. Sampled responses carry
+    Server-Timing and X-DB-Queries headers, and requests that repeat a
+    statement template (the N+1 signature) or spend too long in the database
+    are logged to the "backend.sql" logger with the view name.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 0.01)
+        self.repeat_threshold = getattr(settings, "SQL_INSTRUMENTATION_REPEAT_THRESHOLD", 10)
+        self.slow_ms = getattr(settings, "SQL_INSTRUMENTATION_SLOW_MS", 200)
+        self.slowest_count = getattr(settings, "SQL_INSTRUMENTATION_SLOWEST", 3)
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        listen_to_queries(request, recorder)
+        response = self.get_response(request)
+
+        total_ms = recorder.total_time * 1000
+        query_count = len(recorder.queries)
+        response["X-DB-Queries"] = str(query_count)
+        server_timing = f'db;dur={total_ms:.1f};desc="{query_count} queries"'
+        if response.has_header("Server-Timing"):
+            server_timing = f"{response['Server-Timing']}, {server_timing}"
+        response["Server-Timing"] = server_timing
+
+        repeated = recorder.repeated_templates(self.repeat_threshold)
+        if repeated or total_ms >= self.slow_ms:
+            self.report(request, response, recorder, total_ms, repeated)
+        return response
+
+    def report(self, request, response, recorder, total_ms, repeated):
+        match = request.resolver_match
+        view = match._func_path if match else None
+        record = {
+            "event": "sql_instrumentation",
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": len(recorder.queries),
+            "db_ms": round(total_ms, 2),
+            "slowest": [
+                {"ms": round(duration * 1000, 2), "sql": sql}
+                for duration, sql in recorder.slowest(self.slowest_count)
+            ],
+            "repeated": [
+                {"count": count, "template": template}
+                for template, count in sorted(repeated.items(), key=lambda item: -item[1])
+            ],
+        }
+        sql_logger.warning(json.dumps(record), extra={"sql_instrumentation": record})
+
+
+class QueryTimer:
+    """Statement listener that only adds up the count and time of statements."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+
+    def __call__(self, connection, sql, params, many, duration):
+        self.total_time += duration
+        self.count += 1
+
+
+class MetricsMiddleware:
+    """Record request count, latency, status code and database time per view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        listen_to_queries(request, timer)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        # Label by view rather than path to keep the number of series bounded
+        view = match._func_path if match else "unmatched"
+        metrics.inc("http_requests_total", view=view, method=request.method, status=response.status_code)
+        metrics.observe("http_request_duration_seconds", duration, view=view)
+        metrics.observe("http_request_db_seconds", timer.total_time, view=view)
+        metrics.inc("http_request_db_queries_total", timer.count, view=view)
+        metrics.flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile the requests selected by backend.profiling with cProfile. Keep it
+    last in MIDDLEWARE so that the profile is mostly the view itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response, profiler = profiling.profile_call(self.get_response, request)
+        duration = time.perf_counter() - start
+        if profiler is None:
+            return response
+        try:
+            profiling.save_profile(request, response, profiler, duration)
+        except Exception as e:
+            # A profile is never worth failing the request for
+            logger.error(f"Failed to store request profile: {str(e)}")
+        return response
+
+
+class SlowQueryMiddleware:
+    """Log the statements slower than SLOW_QUERY_MS with their query plan."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold_ms = getattr(settings, "SLOW_QUERY_MS", 100)
+
+    def __call__(self, request):
+        listen_to_queries(request, SlowQueryRecorder(self.threshold_ms, request))
+        return self.get_response(request)
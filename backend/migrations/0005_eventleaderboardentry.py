@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_question_event_ticket_price_material_questionoption_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_score', models.IntegerField(default=0)),
+                ('quizzes_completed', models.IntegerField(default=0)),
+                ('rank', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='backend.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'rank'], name='leaderboard_event_rank_idx'), models.Index(fields=['event', 'total_score'], name='leaderboard_event_score_idx')],
+                'unique_together': {('event', 'user')},
+            },
+        ),
+    ]
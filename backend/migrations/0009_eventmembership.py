@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_eventsalesrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('organizer', 'Organizer'), ('speaker', 'Speaker'), ('attendee', 'Attendee')], max_length=10)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='backend.event')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='event_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'role', 'event'], name='membership_user_role_event_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'role', 'user'), name='membership_event_role_user_uniq')],
+            },
+        ),
+    ]
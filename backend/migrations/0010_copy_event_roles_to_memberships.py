@@ -0,0 +1,54 @@
+from django.db import migrations
+
+CHUNK_SIZE = 5000
+ROLE_FIELDS = {"organizer": "organizers", "speaker": "speakers", "attendee": "attendees"}
+
+
+def copy_roles_to_memberships(apps, schema_editor):
+    Event = apps.get_model("backend", "Event")
+    EventMembership = apps.get_model("backend", "EventMembership")
+    for role, field in ROLE_FIELDS.items():
+        through = getattr(Event, field).through
+        last_id = 0
+        while True:
+            rows = list(
+                through.objects.filter(id__gt=last_id).order_by("id").values_list("id", "event_id", "user_id")[:CHUNK_SIZE]
+            )
+            if not rows:
+                break
+            EventMembership.objects.bulk_create(
+                [EventMembership(event_id=event_id, user_id=user_id, role=role) for _, event_id, user_id in rows],
+                ignore_conflicts=True,
+            )
+            last_id = rows[-1][0]
+
+
+def copy_memberships_to_roles(apps, schema_editor):
+    Event = apps.get_model("backend", "Event")
+    EventMembership = apps.get_model("backend", "EventMembership")
+    for role, field in ROLE_FIELDS.items():
+        through = getattr(Event, field).through
+        last_id = 0
+        while True:
+            rows = list(
+                EventMembership.objects.filter(role=role, id__gt=last_id)
+                .order_by("id").values_list("id", "event_id", "user_id")[:CHUNK_SIZE]
+            )
+            if not rows:
+                break
+            through.objects.bulk_create(
+                [through(event_id=event_id, user_id=user_id) for _, event_id, user_id in rows],
+                ignore_conflicts=True,
+            )
+            last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_eventmembership'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_roles_to_memberships, copy_memberships_to_roles),
+    ]
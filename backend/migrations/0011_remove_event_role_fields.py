@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_copy_event_roles_to_memberships'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='event',
+            name='attendees',
+        ),
+        migrations.RemoveField(
+            model_name='event',
+            name='organizers',
+        ),
+        migrations.RemoveField(
+            model_name='event',
+            name='speakers',
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-19 16:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0013_user_email_lower_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedEventPayment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("payment_date", models.DateTimeField()),
+                ("payment_method", models.CharField(max_length=50)),
+                ("transaction_id", models.CharField(max_length=100, unique=True)),
+                ("refunded_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "deletion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payments",
+                        to="backend.eventdeletion",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
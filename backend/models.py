@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
     
 class UserManager(BaseUserManager):
@@ -40,12 +41,100 @@ class User(AbstractUser):
 
     objects = UserManager()  # Assign the custom user manager
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Attendee imports match emails regardless of case
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}" if self.first_name else self.email
 
     def get_organized_events(self):
         # Returns all events where the user is an organizer
-        return self.organizers.all()
+        return Event.objects.for_member(self, EventMembership.ORGANIZER)
+
+
+class EventQuerySet(models.QuerySet):
+    def for_member(self, user, *roles):
+        """Events where the user has any of the roles (any role when none are given)."""
+        memberships = EventMembership.objects.filter(user=user)
+        if roles:
+            memberships = memberships.filter(role__in=roles)
+        return self.filter(id__in=memberships.values("event_id"))
+
+
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    """Hides deleted events, whose rows backend.event_deletion is purging."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class RoleMembers:
+    """
+    The users with one role in an event, standing in for the former
+    organizers/speakers/attendees ManyToManyFields: all(), add(), remove(),
+    set() and clear() behave like a related manager, and other queryset
+    methods apply to all(). all() always returns a QuerySet; when the
+    event's memberships were prefetched with their users, its results are
+    filled from them, so iterating it does not query and chaining filters
+    queries as usual.
+    """
+
+    def __init__(self, event, role):
+        self.event = event
+        self.role = role
+
+    def get_queryset(self):
+        return User.objects.filter(
+            event_memberships__event=self.event, event_memberships__role=self.role
+        )
+
+    def all(self):
+        prefetched = getattr(self.event, "_prefetched_objects_cache", {}).get("memberships")
+        queryset = self.get_queryset()
+        if prefetched is not None:
+            # The way prefetch_related fills the querysets of related managers
+            queryset._result_cache = [membership.user for membership in prefetched if membership.role == self.role]
+            queryset._prefetch_done = True
+        return queryset
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __getattr__(self, name):
+        return getattr(self.get_queryset(), name)
+
+    # Users may be given as instances or ids, as with related managers
+
+    def add(self, *users):
+        for user in users:
+            EventMembership.objects.get_or_create(event=self.event, user_id=getattr(user, "pk", user), role=self.role)
+
+    def remove(self, *users):
+        user_ids = [getattr(user, "pk", user) for user in users]
+        EventMembership.objects.filter(event=self.event, role=self.role, user_id__in=user_ids).delete()
+
+    def clear(self):
+        EventMembership.objects.filter(event=self.event, role=self.role).delete()
+
+    def set(self, users):
+        user_ids = {getattr(user, "pk", user) for user in users}
+        current = set(self.get_queryset().values_list("id", flat=True))
+        self.remove(*(current - user_ids))
+        self.add(*(user_ids - current))
+
+
+class RoleMembersDescriptor:
+    def __init__(self, role):
+        self.role = role
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return RoleMembers(instance, self.role)
+
 
 class Event(models.Model):
     EVENT_TYPES = [
@@ -66,10 +155,14 @@ class Event(models.Model):
     )  # Virtual link (Zoom, etc.)
     ticket_price = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
 
-    # Many-to-many relationships with User for different roles
-    organizers = models.ManyToManyField(User, related_name="organizers", blank=True)
-    attendees = models.ManyToManyField(User, related_name="attendees", blank=True)
-    speakers = models.ManyToManyField(User, related_name="speakers", blank=True)
+    # Users with each role, stored as EventMembership rows
+    organizers = RoleMembersDescriptor("organizer")
+    attendees = RoleMembersDescriptor("attendee")
+    speakers = RoleMembersDescriptor("speaker")
+
+    objects = EventManager()
+    # Includes deleted events
+    all_objects = EventQuerySet.as_manager()
 
     def add_organizer(self, user):
         self.organizers.add(user)
@@ -87,16 +180,26 @@ class Event(models.Model):
         self.speakers.remove(user)
 
     def remove_attendee(self, user):
-        self.speakers.remove(user)
+        self.attendees.remove(user)
+
+    def has_role(self, user, role):
+        return EventMembership.objects.filter(event=self, role=role, user_id=user.id).exists()
+
+    def roles_of(self, user):
+        """The roles a user has in this event, with one lookup."""
+        return set(
+            EventMembership.objects.filter(event=self, role__in=EventMembership.ROLE_NAMES, user_id=user.id)
+            .values_list("role", flat=True)
+        )
 
     def is_organizer(self, user):
-        return self.organizers.filter(id=user.id).exists()
+        return self.has_role(user, EventMembership.ORGANIZER)
 
     def is_speaker(self, user):
-        return self.speakers.filter(id=user.id).exists()
+        return self.has_role(user, EventMembership.SPEAKER)
 
     def is_attendee(self, user):
-        return self.attendees.filter(id=user.id).exists()
+        return self.has_role(user, EventMembership.ATTENDEE)
     
     def add_quiz(self, title, visible=False):
         """Create and add a new quiz to this event."""
@@ -133,11 +236,49 @@ class Event(models.Model):
             )
 
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the event is deleted; its rows are then purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date"], name="event_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_event_type_display()})"
 
 
+class EventMembership(models.Model):
+    ORGANIZER = "organizer"
+    SPEAKER = "speaker"
+    ATTENDEE = "attendee"
+    ROLES = [
+        (ORGANIZER, "Organizer"),
+        (SPEAKER, "Speaker"),
+        (ATTENDEE, "Attendee"),
+    ]
+    ROLE_NAMES = [role for role, _ in ROLES]
+
+    # The composite indexes below lead with event and with user
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="memberships", db_index=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="event_memberships", db_index=False)
+    role = models.CharField(max_length=10, choices=ROLES)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Role checks and rosters: (event, role, user) lookups and ranges
+            models.UniqueConstraint(fields=["event", "role", "user"], name="membership_event_role_user_uniq"),
+        ]
+        indexes = [
+            # A user's events, by role
+            models.Index(fields=["user", "role", "event"], name="membership_user_role_event_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} ({self.role}) - {self.event}"
+
+
 class EventNotification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
@@ -145,6 +286,8 @@ class EventNotification(models.Model):
     notified_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Its index also serves the unviewed-notification lookups, which
+        # match at most one row per (user, event)
         unique_together = ("user", "event")
 
 # Ticket model
@@ -226,4 +369,100 @@ class UserQuestionAnswer(models.Model):
     is_correct = models.BooleanField(default=False)
     
     def __str__(self):
-        return f"{self.quiz_response.user} - {self.question.question_text[:20]}"
\ No newline at end of file
+        return f"{self.quiz_response.user} - {self.question.question_text[:20]}"
+
+class EventLeaderboardEntry(models.Model):
+    # Materialized quiz leaderboard, kept up to date by backend.leaderboard
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    total_score = models.IntegerField(default=0)
+    quizzes_completed = models.IntegerField(default=0)
+    rank = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("event", "user")
+        indexes = [
+            models.Index(fields=["event", "rank"], name="leaderboard_event_rank_idx"),
+            models.Index(fields=["event", "total_score"], name="leaderboard_event_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.user} - {self.total_score}"
+
+class ProfilingRule(models.Model):
+    # Profile a fraction of the live requests to a view, see backend.profiling
+    view_name = models.CharField(max_length=255, help_text="Dotted path of the view, e.g. backend.views.EventListCreateView")
+    sample_rate = models.FloatField(default=1.0, help_text="Fraction of requests to profile, between 0 and 1")
+    enabled = models.BooleanField(default=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.view_name} ({self.sample_rate:.0%})"
+
+class RequestProfile(models.Model):
+    view_name = models.CharField(max_length=255, db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    file = models.FileField(upload_to='request_profiles/')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.view_name} {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+class EventSalesRollup(models.Model):
+    # Hourly registrations and revenue per event, kept up to date by backend.rollups
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='sales_rollups')
+    bucket = models.DateTimeField(help_text="Start of the hour, in UTC")
+    registrations = models.PositiveIntegerField(default=0)
+    paid_tickets = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("event", "bucket")
+
+    def __str__(self):
+        return f"{self.event_id} @ {self.bucket:%Y-%m-%d %H:00}: {self.registrations} registrations"
+
+
+class EventDeletion(models.Model):
+    # Progress of an event purge by backend.event_deletion, kept after the event is gone
+    event_id = models.BigIntegerField(unique=True)
+    title = models.CharField(max_length=255)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    requested_at = models.DateTimeField(auto_now_add=True)
+    # Refreshed after every batch; a purge not heard from in a while can be taken over
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    stage = models.CharField(max_length=50, default="queued")
+    rows_deleted = models.PositiveBigIntegerField(default=0)
+    files_deleted = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The queue: unfinished deletions, oldest first
+            models.Index(fields=["finished_at", "requested_at"], name="deletion_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.stage}, {self.rows_deleted} rows)"
+
+
+class DeletedEventPayment(models.Model):
+    # A payment of a purged event, kept so it can be refunded
+    deletion = models.ForeignKey(EventDeletion, on_delete=models.CASCADE, related_name="payments")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_date = models.DateTimeField()
+    payment_method = models.CharField(max_length=50)
+    transaction_id = models.CharField(max_length=100, unique=True)
+    refunded_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Payment {self.transaction_id} of {self.amount} for deleted event {self.deletion.event_id}"
@@ -0,0 +1,175 @@
+"""
+On-demand cProfile profiles of live requests.
+
+A request is profiled when it carries a valid signed X-Profile-Token header
+(see `python manage.py profiling_token`), when an enabled ProfilingRule
+samples its view, or with the global PROFILING_SAMPLE_RATE. Profiles are
+stored as pstats files on RequestProfile rows and can be browsed and
+downloaded from the admin. They are kept for PROFILING_RETENTION_DAYS, and
+secrets in the URL (the calendar feed tokens) are not stored.
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+from datetime import timedelta
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.urls import NoReverseMatch, Resolver404, resolve, reverse
+from django.utils import timezone
+
+from .models import ProfilingRule, RequestProfile
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = "backend.profiling"
+TOKEN_HEADER = "X-Profile-Token"
+RULES_CACHE_KEY = "profiling:rules"
+RULES_TIMEOUT = 30
+# URL parameters and query string keys whose values are never stored
+SECRET_PARAMETERS = {"token"}
+REDACTED = "REDACTED"
+# Expired profiles deleted per saved profile
+PRUNE_BATCH_SIZE = 100
+
+
+def make_token():
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+def valid_token(token):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=getattr(settings, "PROFILING_TOKEN_MAX_AGE", 60 * 60)
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def active_rules():
+    """Return {view name: sample rate} of the enabled rules, cached briefly."""
+    rules = cache.get(RULES_CACHE_KEY)
+    if rules is None:
+        rules = dict(
+            ProfilingRule.objects.filter(enabled=True)
+            .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+            .values_list("view_name", "sample_rate")
+        )
+        cache.set(RULES_CACHE_KEY, rules, RULES_TIMEOUT)
+    return rules
+
+
+def invalidate_rules():
+    cache.delete(RULES_CACHE_KEY)
+
+
+def view_name(request):
+    match = request.resolver_match
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+    return match._func_path
+
+
+def should_profile(request):
+    token = request.headers.get(TOKEN_HEADER)
+    if token and valid_token(token):
+        return True
+    rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+    rules = active_rules()
+    # Only resolve the URL when some rule could match
+    if rules:
+        rate = max(rate, rules.get(view_name(request), 0))
+    return rate > 0 and random.random() < rate
+
+
+def profile_call(func, *args):
+    """
+    Run func under cProfile, returning (result, profiler). The profiler is
+    None when profiling could not start; func still runs.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Since Python 3.12 only one profiler can be active per process, so a
+        # concurrent profiled request makes this one run unprofiled
+        logger.info(f"Request not profiled: {e}")
+        return func(*args), None
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    return result, profiler
+
+
+def redacted_path(request):
+    """The full path of a request with the values of SECRET_PARAMETERS replaced."""
+    path = request.path
+    match = request.resolver_match
+    secrets = {name: REDACTED for name in (match.kwargs if match else {}) if name in SECRET_PARAMETERS}
+    if secrets:
+        try:
+            path = reverse(match.view_name, args=match.args, kwargs={**match.kwargs, **secrets})
+        except NoReverseMatch:
+            for name in secrets:
+                path = path.replace(quote(str(match.kwargs[name])), REDACTED).replace(str(match.kwargs[name]), REDACTED)
+    if request.GET:
+        query = [
+            (key, REDACTED if key in SECRET_PARAMETERS else value)
+            for key, values in request.GET.lists() for value in values
+        ]
+        path = f"{path}?{urlencode(query)}"
+    return path
+
+
+def prune_profiles():
+    """Delete up to PRUNE_BATCH_SIZE profiles older than PROFILING_RETENTION_DAYS, with their files."""
+    cutoff = timezone.now() - timedelta(days=getattr(settings, "PROFILING_RETENTION_DAYS", 7))
+    expired = list(RequestProfile.objects.filter(created_at__lt=cutoff).order_by("created_at")[:PRUNE_BATCH_SIZE])
+    for profile in expired:
+        if profile.file:
+            profile.file.delete(save=False)
+    RequestProfile.objects.filter(pk__in=[profile.pk for profile in expired]).delete()
+    return len(expired)
+
+
+def save_profile(request, response, profiler, duration):
+    profiler.create_stats()
+    # The same bytes Profile.dump_stats() writes, readable by pstats.Stats
+    data = marshal.dumps(profiler.stats)
+    name = view_name(request) or "unmatched"
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    profile = RequestProfile(
+        view_name=name,
+        method=request.method,
+        path=redacted_path(request)[:2048],
+        status_code=response.status_code,
+        duration_ms=duration * 1000,
+    )
+    profile.file.save(f"{name}/{stamp}.prof", ContentFile(data), save=False)
+    profile.save()
+    prune_profiles()
+    return profile
+
+
+def profile_summary(profile, limit=30):
+    """Render the functions with the highest cumulative time of a profile."""
+    output = io.StringIO()
+    with profile.file.open("rb") as f:
+        stats = pstats.Stats(stream=output)
+        stats.stats = marshal.load(f)
+        stats.get_top_level_stats()
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return output.getvalue()
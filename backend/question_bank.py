@@ -0,0 +1,243 @@
+"""
+Streaming import and export of quiz question banks.
+
+Two formats are supported, one question per line/row:
+
+NDJSON, in the shape used by QuestionSerializer:
+    {"question_text": "...", "question_type": "multiple_choice",
+     "options": [{"option_text": "...", "is_correct": true}, ...]}
+
+CSV with a header row:
+    question_text,question_type,options,correct
+where `options` holds the option texts separated by "|" and `correct` the
+zero-based indexes of the correct options, also separated by "|". Banks
+whose option texts contain "|" have to use NDJSON.
+"""
+
+import csv
+import json
+import tempfile
+from itertools import groupby, islice
+
+from django.db import transaction
+
+from .models import Question, QuestionOption
+from .quiz_caches import invalidate_quiz_caches
+from .streaming import Echo, iter_text_lines
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+CSV_FIELDS = ["question_text", "question_type", "options", "correct"]
+SEPARATOR = "|"
+
+# Questions inserted per bulk_create round
+IMPORT_CHUNK_SIZE = 1_000
+# Validated questions are staged in memory up to this size, then on disk
+STAGING_MEMORY = 4 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 2_000
+MAX_REPORTED_ERRORS = 100
+
+QUESTION_TYPES = {choice for choice, _ in Question.QUESTION_TYPES}
+
+
+class QuestionBankError(Exception):
+    """Raised when an import contains invalid rows; nothing is stored."""
+
+    def __init__(self, errors, error_count):
+        super().__init__(f"{error_count} invalid rows")
+        self.errors = errors
+        self.error_count = error_count
+
+
+def detect_format(name="", content_type=""):
+    name = (name or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return CSV
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return NDJSON
+    return None
+
+
+def parse_ndjson(lines):
+    """Yield (line number, question dict or error message) per non-empty line."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Each line must be a JSON object."
+            continue
+        yield line_number, row
+
+
+def parse_csv(lines):
+    """Yield (line number, question dict or error message) per data row."""
+    reader = csv.DictReader(lines)
+    missing = set(CSV_FIELDS[:3]) - set(reader.fieldnames or [])
+    if missing:
+        yield 1, f"Missing CSV columns: {', '.join(sorted(missing))}"
+        return
+
+    for row in reader:
+        option_texts = (row.get("options") or "").split(SEPARATOR)
+        try:
+            correct = {
+                int(index) for index in (row.get("correct") or "").split(SEPARATOR)
+                if index.strip()
+            }
+        except ValueError:
+            yield reader.line_num, "Correct option indexes must be integers."
+            continue
+        yield reader.line_num, {
+            "question_text": row.get("question_text"),
+            "question_type": row.get("question_type"),
+            "options": [
+                {"option_text": text, "is_correct": i in correct}
+                for i, text in enumerate(option_texts)
+            ],
+        }
+
+
+def validate_question(row):
+    """Return (question fields, options) for a parsed row or raise ValueError."""
+    question_text = row.get("question_text")
+    if not isinstance(question_text, str) or not question_text.strip():
+        raise ValueError("question_text is required.")
+
+    question_type = row.get("question_type") or "multiple_choice"
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f"Unknown question_type '{question_type}'.")
+
+    options = row.get("options")
+    if not isinstance(options, list):
+        raise ValueError("options must be a list.")
+
+    cleaned = []
+    for option in options:
+        if not isinstance(option, dict):
+            raise ValueError("Each option must be an object.")
+        option_text = option.get("option_text")
+        if not isinstance(option_text, str) or not option_text.strip():
+            continue  # Skip empty options, like the event forms do
+        if len(option_text) > 255:
+            raise ValueError("Option texts are limited to 255 characters.")
+        cleaned.append((option_text, bool(option.get("is_correct", False))))
+
+    if len(cleaned) < 2:
+        raise ValueError("A question needs at least two options.")
+    if question_type == "true_false" and len(cleaned) != 2:
+        raise ValueError("A true/false question needs exactly two options.")
+    if not any(is_correct for _, is_correct in cleaned):
+        raise ValueError("At least one option must be correct.")
+
+    return {"question_text": question_text, "question_type": question_type}, cleaned
+
+
+def _insert_chunk(quiz, chunk):
+    questions = Question.objects.bulk_create(
+        [Question(quiz=quiz, **fields) for fields, _ in chunk]
+    )
+    QuestionOption.objects.bulk_create(
+        [
+            QuestionOption(question=question, option_text=text, is_correct=is_correct)
+            for question, (_, options) in zip(questions, chunk)
+            for text, is_correct in options
+        ]
+    )
+
+
+def import_question_bank(quiz, stream, file_format):
+    """
+    Parse a question bank incrementally and append it to a quiz.
+
+    Every row is validated and staged in a temporary file before anything
+    is written, so a slow upload or an invalid bank never holds the write
+    lock. If any row is invalid, QuestionBankError reports the first errors
+    and nothing is stored. The staged questions are then inserted
+    IMPORT_CHUNK_SIZE at a time in one transaction, so memory use does not
+    grow with the size of the bank. Returns the number of imported questions.
+    """
+    parse = parse_csv if file_format == CSV else parse_ndjson
+    errors = []
+    error_count = 0
+    imported = 0
+
+    with tempfile.SpooledTemporaryFile(max_size=STAGING_MEMORY, mode="w+", encoding="utf-8") as staged:
+        for line_number, row in parse(iter_text_lines(stream)):
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                question = validate_question(row)
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": str(e)})
+                continue
+            # Once a row failed, keep validating but stop staging
+            if not error_count:
+                staged.write(json.dumps(question) + "\n")
+
+        if error_count:
+            raise QuestionBankError(errors, error_count)
+
+        staged.seek(0)
+        rows = (json.loads(line) for line in staged)
+        with transaction.atomic():
+            while chunk := list(islice(rows, IMPORT_CHUNK_SIZE)):
+                _insert_chunk(quiz, chunk)
+                imported += len(chunk)
+
+            # bulk_create sends no signals, so drop the quiz caches ourselves
+            invalidate_quiz_caches(quiz.id)
+
+    return imported
+
+
+def iter_question_bank(quiz):
+    """
+    Yield the questions of a quiz in the NDJSON/serializer shape, reading
+    question and option rows through a chunked (server-side) cursor.
+    """
+    rows = (
+        Question.objects.filter(quiz=quiz)
+        .order_by("id", "options__id")
+        .values_list(
+            "id", "question_text", "question_type", "options__option_text", "options__is_correct"
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for (_, question_text, question_type), group in groupby(rows, key=lambda row: row[:3]):
+        yield {
+            "question_text": question_text,
+            "question_type": question_type,
+            "options": [
+                {"option_text": option_text, "is_correct": is_correct}
+                for *_, option_text, is_correct in group
+                if option_text is not None
+            ],
+        }
+
+
+def export_ndjson(quiz):
+    for question in iter_question_bank(quiz):
+        yield json.dumps(question) + "\n"
+
+
+def export_csv(quiz):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for question in iter_question_bank(quiz):
+        options = question["options"]
+        yield writer.writerow([
+            question["question_text"],
+            question["question_type"],
+            SEPARATOR.join(option["option_text"] for option in options),
+            SEPARATOR.join(str(i) for i, option in enumerate(options) if option["is_correct"]),
+        ])
@@ -0,0 +1,30 @@
+"""
+Invalidation of everything cached per quiz: the answer key, the analytics,
+the payload version and the version of the event that embeds the quiz.
+Used by the model signals and by bulk writers that send no signals.
+"""
+
+from django.db import transaction
+
+from .analytics import invalidate_quiz_analytics
+from .conditional import bump_event_version
+from .grading import invalidate_answer_key
+from .models import Quiz
+from .quiz_payloads import bump_quiz_version
+
+
+def invalidate_quiz_caches(quiz_id, event_id=None):
+    # Wait for the commit, otherwise a concurrent reader could cache the old
+    # rows again right after they were dropped
+    def invalidate():
+        invalidate_answer_key(quiz_id)
+        invalidate_quiz_analytics(quiz_id)
+        bump_quiz_version(quiz_id)
+        # Event details embed their quizzes
+        event_ids = [event_id] if event_id is not None else Quiz.objects.filter(id=quiz_id).values_list(
+            "event_id", flat=True
+        )
+        for quiz_event_id in event_ids:
+            bump_event_version(quiz_event_id)
+
+    transaction.on_commit(invalidate)
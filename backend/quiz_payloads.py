@@ -0,0 +1,82 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from . import metrics
+from .models import Question, Quiz
+from .serializers import AttendeeQuizSerializer, QuizSerializer
+
+ORGANIZER = "organizer"
+ATTENDEE = "attendee"
+
+PAYLOAD_SERIALIZERS = {
+    ORGANIZER: QuizSerializer,
+    ATTENDEE: AttendeeQuizSerializer,
+}
+
+# Payloads of old versions are never read again and simply expire
+PAYLOAD_TIMEOUT = 60 * 60
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def quiz_version_key(quiz_id):
+    return f"quiz:{quiz_id}:version"
+
+
+def quiz_version(quiz_id):
+    """
+    Return the current version marker of a quiz. Markers start from the
+    current time so that a marker lost from the cache never comes back with
+    a value an older payload was stored under.
+    """
+    return cache.get_or_set(
+        quiz_version_key(quiz_id), lambda: time.time_ns() // 1000, VERSION_TIMEOUT
+    )
+
+
+def bump_quiz_version(quiz_id):
+    """Move a quiz to a new version, retiring every cached payload of it."""
+    try:
+        cache.incr(quiz_version_key(quiz_id))
+    except ValueError:
+        # No marker cached, the next read starts a fresh one
+        pass
+
+
+def quiz_payload_key(quiz_id, version, role):
+    return f"quiz:{quiz_id}:v{version}:payload:{role}"
+
+
+def load_quiz_for_payload(quiz_id):
+    """Load a quiz with its questions and options in three queries."""
+    return Quiz.objects.prefetch_related(
+        Prefetch("questions", queryset=Question.objects.order_by("id").prefetch_related("options"))
+    ).get(pk=quiz_id)
+
+
+def build_quiz_payloads(quiz_id):
+    """Serialize both role variants of a quiz from a single prefetched load."""
+    quiz = load_quiz_for_payload(quiz_id)
+    return {
+        role: serializer_class(quiz).data
+        for role, serializer_class in PAYLOAD_SERIALIZERS.items()
+    }
+
+
+def get_quiz_payload(quiz_id, role):
+    """Return the cached payload of a quiz for a role, building both on a miss."""
+    version = quiz_version(quiz_id)
+    payload = cache.get(quiz_payload_key(quiz_id, version, role))
+    metrics.cache_lookup("quiz_payload", payload is not None)
+    if payload is None:
+        payloads = build_quiz_payloads(quiz_id)
+        cache.set_many(
+            {
+                quiz_payload_key(quiz_id, version, variant): data
+                for variant, data in payloads.items()
+            },
+            PAYLOAD_TIMEOUT,
+        )
+        payload = payloads[role]
+    return payload
@@ -0,0 +1,109 @@
+"""
+Attendee roster of an event with ticket and payment data.
+
+Pages are read by keyset on EventMembership's unique (event, role, user)
+index: the cursor is the last user id of the previous page, so every page
+costs the same no matter how deep into a 50k roster it is. Each page takes
+two queries: the attendees with the id of their ticket (a paid one first,
+then the latest), then those tickets with their payments. The CSV export
+quotes names and emails that a spreadsheet would run as formulas.
+"""
+
+import csv
+
+from django.db.models import OuterRef, Subquery
+
+from .models import EventMembership, Ticket
+from .streaming import Echo
+
+ROSTER_PAGE_SIZE = 100
+MAX_ROSTER_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 2_000
+# User ids are SQLite INTEGERs, so larger cursors cannot be compared to them
+MAX_CURSOR = 2**63 - 1
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+CSV_FIELDS = [
+    "user_id", "email", "first_name", "last_name",
+    "ticket_id", "is_paid", "purchase_date",
+    "amount", "payment_method", "payment_date",
+]
+
+
+def roster_page(event_id, after=0, limit=ROSTER_PAGE_SIZE):
+    """Return the attendees of an event with user ids above `after`, as roster rows."""
+    ticket = (
+        Ticket.objects.filter(event_id=event_id, user_id=OuterRef("user_id"))
+        .order_by("-is_paid", "-id")
+        .values("id")[:1]
+    )
+    attendees = list(
+        EventMembership.objects.filter(event_id=event_id, role=EventMembership.ATTENDEE, user_id__gt=after)
+        .order_by("user_id")
+        .annotate(ticket_id=Subquery(ticket))
+        .values("user_id", "user__email", "user__first_name", "user__last_name", "ticket_id")[:limit]
+    )
+    tickets = {
+        ticket["id"]: ticket
+        for ticket in Ticket.objects.filter(
+            id__in=[attendee["ticket_id"] for attendee in attendees if attendee["ticket_id"]]
+        ).values(
+            "id", "is_paid", "purchase_date",
+            "payment__amount", "payment__payment_method", "payment__payment_date",
+        )
+    }
+
+    rows = []
+    for attendee in attendees:
+        ticket = tickets.get(attendee["ticket_id"])
+        paid = ticket is not None and ticket["payment__amount"] is not None
+        rows.append({
+            "user_id": attendee["user_id"],
+            "email": attendee["user__email"],
+            "first_name": attendee["user__first_name"],
+            "last_name": attendee["user__last_name"],
+            "ticket": ticket and {
+                "id": ticket["id"],
+                "is_paid": ticket["is_paid"],
+                "purchase_date": ticket["purchase_date"],
+            },
+            "payment": {
+                "amount": str(ticket["payment__amount"]),
+                "payment_method": ticket["payment__payment_method"],
+                "payment_date": ticket["payment__payment_date"],
+            } if paid else None,
+        })
+    return rows
+
+
+def iter_roster(event_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield every roster row of an event, holding one chunk in memory at a time."""
+    after = 0
+    while True:
+        rows = roster_page(event_id, after, chunk_size)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1]["user_id"]
+
+
+def csv_text(value):
+    """Quote user-entered text so spreadsheets show it rather than evaluate it."""
+    return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+
+
+def export_roster_csv(event_id):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for row in iter_roster(event_id):
+        ticket = row["ticket"] or {}
+        payment = row["payment"] or {}
+        yield writer.writerow([
+            row["user_id"], csv_text(row["email"]), csv_text(row["first_name"]), csv_text(row["last_name"]),
+            ticket.get("id", ""), ticket.get("is_paid", ""),
+            ticket["purchase_date"].isoformat() if ticket else "",
+            payment.get("amount", ""), csv_text(payment.get("payment_method", "")),
+            payment["payment_date"].isoformat() if payment else "",
+        ])
@@ -0,0 +1,127 @@
+"""
+Read-replica routing.
+
+ReplicaRoutingMiddleware marks safe (GET/HEAD/OPTIONS) requests to the URL
+names in REPLICA_READ_VIEWS; while such a request runs, ReplicaRouter sends
+reads of the models in REPLICA_READ_MODELS (every model when empty) to a
+random alias of DATABASE_REPLICAS. Everything else reads from and writes to
+"default".
+
+Read-your-writes: after a request that wrote, the user is pinned to the
+primary for REPLICA_STICKY_SECONDS, which should exceed the replication lag.
+The middleware decides whether a request is pinned before the view runs, so
+the router never touches the request.
+"""
+
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.authentication import get_authorization_header
+from rest_framework.authtoken.models import Token
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+TOKEN_USER_TIMEOUT = 5 * 60
+
+_routing = ContextVar("replica_routing", default=None)
+
+
+def pin_key(user_id):
+    return f"replica:pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(pin_key(user_id), True, getattr(settings, "REPLICA_STICKY_SECONDS", 10))
+
+
+def token_user_id(request):
+    """
+    Return the id of the user whose API token the request carries, or None.
+    Token authentication only runs inside the view, so routing resolves the
+    token itself; the answer is cached since it only picks a database and
+    authenticates nothing.
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b"token":
+        return None
+    cache_key = f"replica:token:{hashlib.sha256(auth[1]).hexdigest()}"
+    user_id = cache.get(cache_key)
+    if user_id is None:
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            return None
+        user_id = Token.objects.using(PRIMARY).filter(key=key).values_list("user_id", flat=True).first()
+        if user_id is None:
+            return None
+        cache.set(cache_key, user_id, TOKEN_USER_TIMEOUT)
+    return user_id
+
+
+class RoutingState:
+    def __init__(self, replica_reads=False, pinned=False):
+        self.replica_reads = replica_reads
+        self.pinned = pinned
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = list(getattr(settings, "DATABASE_REPLICAS", []))
+        self.models = set(getattr(settings, "REPLICA_READ_MODELS", []))
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if not self.replicas or state is None or not state.replica_reads or state.wrote:
+            return PRIMARY
+        if self.models and model._meta.label not in self.models:
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block or state.pinned:
+            return PRIMARY
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = set(getattr(settings, "REPLICA_READ_VIEWS", []))
+        self.replicas = list(getattr(settings, "DATABASE_REPLICAS", []))
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        user = getattr(request, "user", None)
+        if state.wrote and user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        if state is None or not self.replicas or request.method not in SAFE_METHODS:
+            return None
+        if request.resolver_match.view_name in self.views:
+            user_id = token_user_id(request)
+            state.pinned = user_id is not None and bool(cache.get(pin_key(user_id)))
+            state.replica_reads = True
+        return None
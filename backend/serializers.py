@@ -66,6 +66,29 @@ class QuizSerializer(serializers.ModelSerializer):
         return instance
 
 
+# Read-only variants for attendees, which must not reveal the correct answers
+class AttendeeQuestionOptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionOption
+        fields = ['id', 'option_text']
+
+
+class AttendeeQuestionSerializer(serializers.ModelSerializer):
+    options = AttendeeQuestionOptionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'question_text', 'question_type', 'options']
+
+
+class AttendeeQuizSerializer(serializers.ModelSerializer):
+    questions = AttendeeQuestionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'visible', 'questions']
+
+
 class MaterialSerializer(serializers.ModelSerializer):
     class Meta:
         model = Material
@@ -74,17 +97,48 @@ class MaterialSerializer(serializers.ModelSerializer):
 
 # Event Serializer
 class EventSerializer(serializers.ModelSerializer):
+    # Relations embedded in full by default; the others are lists of ids
+    EXPANDABLE = ("organizers", "speakers", "quizzes", "materials")
+
     has_unread_update = serializers.SerializerMethodField()
     quizzes = QuizSerializer(many=True, required=False)
     materials = MaterialSerializer(many=True, required=False)
     organizers = UserSerializer(many=True, read_only=True)
     speakers = UserSerializer(many=True, read_only=True)
+    attendees = serializers.PrimaryKeyRelatedField(many=True, queryset=User.objects.all(), required=False)
     
     class Meta:
         model = Event
-        fields = "__all__"  # includes has_unread_update, quizzes, materials
+        # Roles are EventMembership rows, which "__all__" would not include
+        fields = [
+            "id", "has_unread_update", "quizzes", "materials", "organizers", "speakers",
+            "title", "description", "date", "event_type", "location", "virtual_location",
+            "ticket_price", "updated_at", "attendees",
+        ]
+
+    def __init__(self, *args, fields=None, expand=None, answer_keys=False, **kwargs):
+        """
+        Read-only sparse fieldsets: keep only `fields` (all when None) and
+        embed only the relations in `expand` (EXPANDABLE when None), which
+        are kept even when missing from `fields`. Embedded quizzes leave out
+        the correct answers unless `answer_keys` is set, for organizers.
+        """
+        super().__init__(*args, **kwargs)
+        if expand is None:
+            expand = self.EXPANDABLE
+        if fields is not None:
+            for name in set(self.fields) - set(fields) - set(expand):
+                self.fields.pop(name)
+        for name in set(self.EXPANDABLE) & set(self.fields) - set(expand):
+            self.fields[name] = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+        # Writes keep the full quiz serializer; they come from organizers
+        if not answer_keys and "data" not in kwargs and "quizzes" in expand and "quizzes" in self.fields:
+            self.fields["quizzes"] = AttendeeQuizSerializer(many=True, read_only=True)
     
     def get_has_unread_update(self, obj):
+        # Annotated by backend.fieldsets.event_queryset
+        if hasattr(obj, "has_unread"):
+            return obj.has_unread
         request = self.context.get("request")
         user = getattr(request, "user", None)
         if not user or not user.is_authenticated:
@@ -98,9 +152,10 @@ class EventSerializer(serializers.ModelSerializer):
         quizzes_data = validated_data.pop('quizzes', [])
         materials_data = validated_data.pop('materials', [])
         
-        # Get organizers and speakers
+        # Get organizers, speakers and attendees
         organizers_data = validated_data.pop('organizers', [])
         speakers_data = validated_data.pop('speakers', [])
+        attendees_data = validated_data.pop('attendees', [])
         
         # Create the event
         event = Event.objects.create(**validated_data)
@@ -110,6 +165,8 @@ class EventSerializer(serializers.ModelSerializer):
             event.organizers.set(organizers_data)
         if speakers_data:
             event.speakers.set(speakers_data)
+        if attendees_data:
+            event.attendees.set(attendees_data)
         
         # Create quizzes
         for quiz_data in quizzes_data:
@@ -135,15 +192,18 @@ class EventSerializer(serializers.ModelSerializer):
         # Similar to create, but handle updating existing related objects
         quizzes_data = validated_data.pop('quizzes', None)
         materials_data = validated_data.pop('materials', None)
+        attendees_data = validated_data.pop('attendees', None)
         
         # Update basic event fields
         instance = super().update(instance, validated_data)
         
-        # Update organizers and speakers if provided
+        # Update organizers, speakers and attendees if provided
         if 'organizers' in validated_data:
             instance.organizers.set(validated_data.pop('organizers'))
         if 'speakers' in validated_data:
             instance.speakers.set(validated_data.pop('speakers'))
+        if attendees_data is not None:
+            instance.attendees.set(attendees_data)
         
         # Update quizzes if provided
         if quizzes_data is not None:
@@ -4,12 +4,28 @@ from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 import logging
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
+
+def emails_in_flight():
+    # Emails are sent inline, so the backlog is the sends that have started
+    # and not finished yet, summed over every process like the counters
+    samples = metrics.collect()
+    return metrics.total("emails_started_total", samples) - metrics.total("emails_sent_total", samples)
+
+
+metrics.register_gauge(
+    "emails_in_flight", "Emails being sent right now, in every process.", emails_in_flight,
+)
+
+
 def send_ticket_confirmation_email(user_email, user_name, event_title, event_date, ticket_id):
     """
     Send a confirmation email to the user after successful ticket purchase
     """
+    metrics.inc("emails_started_total", kind="ticket_confirmation")
     try:
         subject = f"Your Ticket Confirmation for {event_title}"
         
@@ -50,7 +66,9 @@ def send_ticket_confirmation_email(user_email, user_name, event_title, event_dat
         )
         
         logger.info(f"Ticket confirmation email sent to {user_email} for event {event_title}")
+        metrics.inc("emails_sent_total", kind="ticket_confirmation", result="sent")
         return True
     except Exception as e:
         logger.error(f"Failed to send confirmation email: {str(e)}")
+        metrics.inc("emails_sent_total", kind="ticket_confirmation", result="failed")
         return False
\ No newline at end of file
@@ -45,6 +45,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Times the statements for the three middleware after it
+    "backend.middleware.QueryTimingMiddleware",
+    "backend.middleware.MetricsMiddleware",
+    "backend.middleware.QueryInstrumentationMiddleware",
+    "backend.middleware.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,6 +59,8 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    "backend.middleware.ProfilingMiddleware",
+    "backend.routers.ReplicaRoutingMiddleware",
 ]
 
 # REST Framework settings
@@ -77,6 +84,50 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+# SQL instrumentation (backend.middleware.QueryInstrumentationMiddleware)
+# Fraction of requests whose queries are recorded; raise it to 1 while
+# looking for N+1 queries locally
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv("SQL_INSTRUMENTATION_SAMPLE_RATE", "0.01"))
+# Log a request when one statement template runs this many times (N+1)...
+SQL_INSTRUMENTATION_REPEAT_THRESHOLD = 10
+# ...or when its queries take this long in total
+SQL_INSTRUMENTATION_SLOW_MS = 200
+SQL_INSTRUMENTATION_SLOWEST = 3
+
+# Statements slower than this are logged with their plan to SLOW_QUERY_LOG,
+# which `manage.py index_advisor` reads
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", str(BASE_DIR / "slow_queries.jsonl"))
+
+# Metrics served at /metrics (backend.metrics)
+# With several worker processes, point METRICS_DIR at a directory shared by
+# them and empty it when the server restarts
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = 5
+# Scrapers must send "Authorization: Bearer <token>"; without a token
+# /metrics is only served with DEBUG on
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Request profiling (backend.profiling); rules are managed in the admin
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+# Stored profiles older than this are deleted, with their files
+PROFILING_RETENTION_DAYS = int(os.getenv("PROFILING_RETENTION_DAYS", "7"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+        "slow_queries": {"class": "logging.FileHandler", "filename": SLOW_QUERY_LOG, "delay": True},
+    },
+    "loggers": {
+        # One JSON object per line
+        "backend.sql": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+        "backend.slow_queries": {"handlers": ["slow_queries"], "level": "WARNING", "propagate": False},
+    },
+}
+
 # Stripe settings
 STRIPE_TEST_PUBLIC_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 STRIPE_TEST_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
@@ -118,8 +169,64 @@ WSGI_APPLICATION = "backend.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # SQLite with WAL, tuned pragmas and retries on lock contention
+        "ENGINE": "backend.sqlite",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Take the write lock when an atomic block starts
+            "transaction_mode": "IMMEDIATE",
+        },
+        # Reuse connections across requests
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        # A file rather than shared memory, so that tests running threads get
+        # independent connections and the same locking as production
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+# Read replicas (backend.routers). To try them locally, point
+# SQLITE_REPLICA_PATH at a second file and refresh it from the primary with
+# `python manage.py sync_sqlite_replica`
+DATABASE_ROUTERS = ["backend.routers.ReplicaRouter"]
+DATABASE_REPLICAS = []
+if os.getenv("SQLITE_REPLICA_PATH"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("SQLITE_REPLICA_PATH"),
+        # Tests read and write through the primary
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append("replica")
+# GET requests to the views with these URL names read from the replicas...
+REPLICA_READ_VIEWS = [
+    "events-list-create",
+    "events-calendar",
+    "events-batch",
+    "event-detail",
+    "event-leaderboard",
+    "quiz-detail",
+    "user-search",
+]
+# ...for these models (all models when empty)
+REPLICA_READ_MODELS = []
+# Users read from the primary for this long after their own writes
+REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Answer keys, quiz payloads, dashboards, ETag version markers and replica
+# pins are invalidated on commit by the process that wrote, so every worker
+# must share one cache. The in-memory default is per process and only suits
+# runserver and tests; `manage.py check --deploy` rejects it. For example:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "sees-default"),
     }
 }
 
@@ -1,7 +1,14 @@
 # backend/signals.py
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Event, EventNotification
+from .models import Event, EventMembership, EventNotification, Material, Payment, ProfilingRule, Quiz, Question, QuestionOption, Ticket, UserQuizResponse
+from .analytics import invalidate_quiz_analytics
+from .conditional import bump_event_version
+from .dashboard import invalidate_event_dashboards
+from .leaderboard import record_quiz_score
+from .profiling import invalidate_rules
+from .quiz_caches import invalidate_quiz_caches
 
 
 @receiver(post_save, sender=Event)
@@ -11,3 +18,71 @@ def mark_event_as_unviewed_for_attendees(sender, instance, created, **kwargs):
             EventNotification.objects.update_or_create(
                 user=attendee, event=instance, defaults={"is_viewed": False}
             )
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def invalidate_quiz_answer_key(sender, instance, **kwargs):
+    invalidate_quiz_caches(instance.id, instance.event_id)
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+def bump_material_event_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_event_version(instance.event_id))
+
+
+@receiver(post_save, sender=EventMembership)
+@receiver(post_delete, sender=EventMembership)
+def bump_member_event_version(sender, instance, **kwargs):
+    # Event details embed their organizers and speakers
+    transaction.on_commit(lambda: bump_event_version(instance.event_id))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance, **kwargs):
+    invalidate_quiz_caches(instance.quiz_id)
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def invalidate_option_answer_key(sender, instance, **kwargs):
+    # The question may already be gone when options are removed by a cascade,
+    # in which case its own post_delete has invalidated the key
+    quiz_ids = Question.objects.filter(id=instance.question_id).values_list(
+        "quiz_id", flat=True
+    )
+    for quiz_id in quiz_ids:
+        invalidate_quiz_caches(quiz_id)
+
+
+@receiver(post_save, sender=UserQuizResponse)
+@receiver(post_delete, sender=UserQuizResponse)
+def invalidate_quiz_response_analytics(sender, instance, **kwargs):
+    # Answers are bulk-inserted after the response row, so wait for the commit
+    # before dropping the analytics of the quiz
+    transaction.on_commit(lambda: invalidate_quiz_analytics(instance.quiz_id))
+
+
+@receiver(post_delete, sender=UserQuizResponse)
+def remove_quiz_response_from_leaderboard(sender, instance, **kwargs):
+    if instance.completed_at is None:
+        return
+    event_ids = Quiz.objects.filter(id=instance.quiz_id).values_list("event_id", flat=True)
+    for event_id in event_ids:
+        record_quiz_score(event_id, instance.user_id, -instance.score, completed_delta=-1)
+
+
+@receiver(post_save, sender=ProfilingRule)
+@receiver(post_delete, sender=ProfilingRule)
+def invalidate_profiling_rules(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_rules)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_payment_dashboards(sender, instance, **kwargs):
+    event_ids = Ticket.objects.filter(id=instance.ticket_id).values_list("event_id", flat=True)
+    for event_id in event_ids:
+        invalidate_event_dashboards(event_id)
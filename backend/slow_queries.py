@@ -0,0 +1,137 @@
+"""
+Slow-query capture and the plan analysis used by `manage.py index_advisor`.
+
+SlowQueryMiddleware looks at every statement of a request; those slower than
+SLOW_QUERY_MS are written, with their EXPLAIN plan, as one JSON object per
+line to the "backend.slow_queries" logger (SLOW_QUERY_LOG by default).
+"""
+
+import json
+import logging
+import re
+
+logger = logging.getLogger("backend.slow_queries")
+
+# SQLite prints "SCAN backend_ticket" (older versions "SCAN TABLE ...") for a
+# full table scan and adds "USING [COVERING] INDEX" when it walks an index
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_SQLITE_SEARCH = re.compile(
+    r"^SEARCH (?:TABLE )?(\w+)(?: AS \w+)? USING (?:COVERING )?INDEX \w+ \((.*)\)$"
+)
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+_COLUMN = re.compile(
+    r'"(?P<table>\w+)"\."(?P<column>\w+)"\s*(?P<op>=|IN\b|<=|>=|<|>|BETWEEN\b|IS\b)',
+    re.IGNORECASE,
+)
+# Boolean columns are filtered on bare: `"t"."flag" AND ...`, `NOT "t"."flag"`
+_BOOLEAN = re.compile(
+    r'"(?P<table>\w+)"\."(?P<column>\w+)"\s*(?=\bAND\b|\bOR\b|\)|$)', re.IGNORECASE
+)
+_ORDER_BY = re.compile(r'ORDER BY\s+"(?P<table>\w+)"\."(?P<column>\w+)"', re.IGNORECASE)
+
+
+def explain(connection, sql, params):
+    """Return the plan of a statement as a list of lines."""
+    prefix = connection.ops.explain_query_prefix()
+    # create_cursor() needs an open connection, which a management command
+    # may not have yet
+    connection.ensure_connection()
+    # A backend cursor bypasses the execute wrappers, so the EXPLAIN is
+    # neither timed nor counted as one of the request's queries
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"{prefix} {sql}", params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def full_scans(plan):
+    """Return the tables a plan reads in full."""
+    tables = []
+    for line in plan:
+        line = line.strip()
+        match = _SQLITE_SCAN.match(line) or _POSTGRES_SCAN.search(line)
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def partial_searches(plan):
+    """Return (table, columns) of the index searches in a SQLite plan."""
+    searches = []
+    for line in plan:
+        match = _SQLITE_SEARCH.match(line.strip())
+        if match:
+            searches.append((match.group(1), re.findall(r"(\w+)\s*[=<>]", match.group(2))))
+    return searches
+
+
+def filtered_columns(sql, table):
+    """
+    Return (equality columns, range columns) that the WHERE clause of a
+    statement filters `table` by, followed by its ORDER BY columns.
+    """
+    where = sql.split(" WHERE ", 1)[1] if " WHERE " in sql else ""
+    where = where.split(" ORDER BY ", 1)[0]
+    equality, ranges = [], []
+    for match in _COLUMN.finditer(where):
+        if match["table"] != table:
+            continue
+        target = equality if match["op"].upper() in ("=", "IN", "IS") else ranges
+        if match["column"] not in target:
+            target.append(match["column"])
+    for match in _BOOLEAN.finditer(where):
+        if match["table"] == table and match["column"] not in equality + ranges:
+            equality.append(match["column"])
+    for match in _ORDER_BY.finditer(sql):
+        if match["table"] == table and match["column"] not in ranges:
+            ranges.append(match["column"])
+    return equality, [column for column in ranges if column not in equality]
+
+
+def read_log(path):
+    """Yield the captured queries of a slow-query log."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class SlowQueryRecorder:
+    """Statement listener that logs statements slower than the threshold."""
+
+    def __init__(self, threshold_ms, request=None):
+        self.threshold = threshold_ms / 1000
+        self.request = request
+
+    def __call__(self, connection, sql, params, many, duration):
+        if duration >= self.threshold and not many:
+            self.record(connection, sql, params, duration)
+
+    def record(self, connection, sql, params, duration):
+        plan = None
+        if sql.lstrip()[:6].upper() == "SELECT":
+            try:
+                plan = explain(connection, sql, params)
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+        match = self.request.resolver_match if self.request is not None else None
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "view": match._func_path if match else None,
+            "database": connection.alias,
+            "ms": round(duration * 1000, 2),
+            "sql": sql,
+            "params": list(params or ()),
+            "plan": plan,
+        }, default=str))
@@ -0,0 +1,96 @@
+"""
+SQLite backend tuned for concurrent writers.
+
+Use it with ENGINE "backend.sqlite". On top of the stock backend it:
+
+- sets WAL journaling and the PRAGMAS below on every new connection, so
+  readers no longer block the writer and commits fsync less often;
+- retries statements run outside a transaction, including the BEGIN of
+  atomic blocks, with exponential backoff while the database is locked.
+  Statements inside a transaction are never retried, since the transaction
+  may have to start over; use "transaction_mode": "IMMEDIATE" so that atomic
+  blocks take the write lock up front instead of failing when they upgrade a
+  read to a write.
+
+OPTIONS may override "pragmas" (merged into PRAGMAS), "write_retries" and
+"retry_backoff" (seconds before the first retry). The stock "timeout"
+option (seconds) sets busy_timeout, which would otherwise override it.
+"""
+
+import random
+import time
+
+from django.db.backends.sqlite3 import base as sqlite3_base
+from django.db.backends.sqlite3.base import Database, SQLiteCursorWrapper
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    # Durable across application crashes; only a power loss can drop the
+    # last commits, which WAL makes acceptable
+    "synchronous": "NORMAL",
+    # Milliseconds; OPTIONS["timeout"] takes precedence
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative values are in KiB
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+WRITE_RETRIES = 5
+RETRY_BACKOFF = 0.05
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+class RetryingCursorWrapper(SQLiteCursorWrapper):
+    retries = WRITE_RETRIES
+    backoff = RETRY_BACKOFF
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, param_list)
+
+    def _retry(self, method, query, params):
+        attempt = 0
+        while True:
+            try:
+                return method(query, params)
+            except Database.OperationalError as e:
+                if (
+                    attempt >= self.retries
+                    or self.connection.in_transaction
+                    or not is_lock_error(e)
+                ):
+                    raise
+                # Full jitter keeps the waiting writers from retrying in step
+                time.sleep(random.uniform(0, self.backoff * 2**attempt))
+                attempt += 1
+
+
+class DatabaseWrapper(sqlite3_base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Our own OPTIONS must not reach sqlite3.connect()
+        self.pragmas = dict(PRAGMAS)
+        if kwargs.get("timeout") is not None:
+            self.pragmas["busy_timeout"] = int(kwargs["timeout"] * 1000)
+        self.pragmas.update(kwargs.pop("pragmas", {}))
+        self.write_retries = kwargs.pop("write_retries", WRITE_RETRIES)
+        self.retry_backoff = kwargs.pop("retry_backoff", RETRY_BACKOFF)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.retries = self.write_retries
+        cursor.backoff = self.retry_backoff
+        return cursor
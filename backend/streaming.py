@@ -0,0 +1,26 @@
+"""
+Helpers shared by the streamed uploads and CSV downloads: question banks,
+attendee imports and rosters.
+"""
+
+import codecs
+
+
+def iter_text_lines(stream, encoding="utf-8-sig"):
+    """
+    Decode a binary stream (an upload or the request itself) line by line
+    without reading it all at once.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in stream:
+        yield decoder.decode(line)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class Echo:
+    """File-like object whose write() hands back the value, for csv.writer."""
+
+    def write(self, value):
+        return value
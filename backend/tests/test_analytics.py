@@ -0,0 +1,79 @@
+import statistics
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from backend.analytics import compute_quiz_analytics, get_quiz_analytics
+from backend.models import Event, Question, QuestionOption, Quiz, User, UserQuestionAnswer, UserQuizResponse
+
+
+class QuizAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        event = Event.objects.create(
+            title="Quiz night", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.quiz = Quiz.objects.create(event=event, title="Round 1", visible=True)
+        self.questions, self.options = [], {}
+        for text, (right, wrong) in (("2 + 2?", ("4", "5")), ("3 * 3?", ("9", "6"))):
+            question = Question.objects.create(quiz=self.quiz, question_text=text, question_type="multiple_choice")
+            self.questions.append(question)
+            self.options[right] = QuestionOption.objects.create(question=question, option_text=right, is_correct=True)
+            self.options[wrong] = QuestionOption.objects.create(question=question, option_text=wrong, is_correct=False)
+
+        # Totals 2, 1, 0 and 1; the last response skipped the second question
+        for n, choices in enumerate([("4", "9"), ("4", "6"), ("5", "6"), ("4", None)]):
+            self.respond(f"u{n}@example.com", choices)
+        self.respond("late@example.com", ("5", "9"), completed=False)
+
+    def respond(self, email, choices, completed=True):
+        user = User.objects.create_user(email, "Quiz", "Taker", "pw")
+        response = UserQuizResponse.objects.create(
+            user=user, quiz=self.quiz, completed_at=timezone.now() if completed else None,
+        )
+        for question, choice in zip(self.questions, choices):
+            option = self.options.get(choice)
+            UserQuestionAnswer.objects.create(
+                quiz_response=response, question=question, selected_option=option,
+                is_correct=bool(option and option.is_correct),
+            )
+
+    def test_item_statistics(self):
+        analytics = compute_quiz_analytics(self.quiz.id)
+        self.assertEqual(analytics["responses"], 4)
+        self.assertEqual(analytics["mean_score"], 50.0)
+        first, second = analytics["questions"]
+
+        self.assertEqual((first["p_value"], second["p_value"]), (0.75, 0.25))
+        self.assertEqual((first["answered"], second["answered"]), (4, 3))
+        totals = [2, 1, 0, 1]
+        for question, column in ((first, [1, 1, 0, 1]), (second, [1, 0, 0, 0])):
+            self.assertAlmostEqual(question["discrimination"], statistics.correlation(column, totals), places=4)
+
+        def options(question):
+            return [(o["is_correct"], o["count"], o["frequency"], o["mean_total_score"]) for o in question["options"]]
+        self.assertEqual(options(first), [(True, 3, 0.75, 1.3333), (False, 1, 0.25, 0.0)])
+        self.assertEqual(options(second), [(True, 1, 0.3333, 2.0), (False, 2, 0.6667, 0.5)])
+
+        histogram = {bucket["from"]: bucket["count"] for bucket in analytics["score_histogram"]}
+        self.assertEqual({low: count for low, count in histogram.items() if count}, {0: 1, 50: 2, 90: 1})
+
+    def test_items_without_variance_have_no_discrimination(self):
+        UserQuizResponse.objects.filter(completed_at__isnull=False).exclude(user__email="u0@example.com").delete()
+        analytics = compute_quiz_analytics(self.quiz.id)
+        self.assertEqual(analytics["responses"], 1)
+        self.assertEqual([q["discrimination"] for q in analytics["questions"]], [None, None])
+
+    def test_quiz_without_responses(self):
+        UserQuizResponse.objects.all().delete()
+        analytics = compute_quiz_analytics(self.quiz.id)
+        self.assertEqual((analytics["responses"], analytics["mean_score"]), (0, None))
+        self.assertEqual([q["p_value"] for q in analytics["questions"]], [None, None])
+
+    def test_new_responses_invalidate_the_cache(self):
+        self.assertEqual(get_quiz_analytics(self.quiz.id)["responses"], 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.respond("next@example.com", ("4", "9"))
+        self.assertEqual(get_quiz_analytics(self.quiz.id)["responses"], 5)
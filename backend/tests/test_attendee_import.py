@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from backend.attendee_import import import_attendees
+from backend.models import Event, EventSalesRollup, Ticket, User
+
+
+class AttendeeImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.bea = User.objects.create_user("Bea@example.com", "Bea", "Attendee", "pw")
+        self.cal = User.objects.create_user("cal@example.com", "Cal", "Attendee", "pw")
+
+    def run_import(self, *emails):
+        return import_attendees(self.event, enumerate(emails, start=1))
+
+    def registrations(self):
+        return EventSalesRollup.objects.filter(event=self.event).aggregate(n=Sum("registrations"))["n"] or 0
+
+    def test_emails_match_regardless_of_case(self):
+        report = self.run_import("bea@EXAMPLE.com", "CAL@example.com", "nobody@example.com")
+        self.assertEqual([r["status"] for r in report["results"]], ["enrolled", "enrolled", "unknown_user"])
+        self.assertTrue(self.event.is_attendee(self.bea))
+        self.assertTrue(self.event.is_attendee(self.cal))
+
+    def test_exact_match_wins_over_other_casing(self):
+        other = User.objects.create_user("bea@example.com", "Other", "Bea", "pw")
+        self.run_import("bea@example.com")
+        self.assertTrue(self.event.is_attendee(other))
+        self.assertFalse(self.event.is_attendee(self.bea))
+
+    def test_repeated_import_adds_no_tickets(self):
+        self.run_import("Bea@example.com", "cal@example.com")
+        report = self.run_import("Bea@example.com", "cal@example.com")
+        self.assertEqual(report["counts"]["already_attending"], 2)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 2)
+        self.assertEqual(self.registrations(), 2)
+
+    def test_existing_ticket_is_not_duplicated_or_counted(self):
+        # A pending ticket from an abandoned checkout
+        Ticket.objects.create(user=self.bea, event=self.event, is_paid=False)
+        before = self.registrations()
+        report = self.run_import("Bea@example.com", "cal@example.com")
+        self.assertEqual(report["counts"]["enrolled"], 2)
+        self.assertEqual(Ticket.objects.filter(event=self.event, user=self.bea).count(), 1)
+        self.assertEqual(Ticket.objects.filter(event=self.event, user=self.cal).count(), 1)
+        self.assertEqual(self.registrations() - before, 1)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from django.utils.http import http_date
+
+from backend.calendar_feeds import LINE_LIMIT, escape_text, feed_token, fold
+from backend.models import Event, User
+
+
+def unfold(text):
+    return text.replace("\r\n ", "")
+
+
+class FoldTests(SimpleTestCase):
+    def test_short_lines_are_kept(self):
+        self.assertEqual(fold("SUMMARY:Launch"), "SUMMARY:Launch\r\n")
+
+    def test_long_lines_fit_the_limit(self):
+        for line in ("DESCRIPTION:" + "x" * 300, "SUMMARY:" + "é" * 100, "SUMMARY:" + "a" + "🎉" * 50):
+            with self.subTest(line=line[:20]):
+                folded = fold(line)
+                self.assertEqual(unfold(folded), line + "\r\n")
+                physical = folded[:-2].split("\r\n")
+                self.assertTrue(all(len(part.encode()) <= LINE_LIMIT for part in physical))
+                self.assertTrue(all(part.startswith(" ") for part in physical[1:]))
+
+    def test_escaping(self):
+        self.assertEqual(escape_text("a,b;c\\d\r\ne\nf"), "a\\,b\\;c\\\\d\\ne\\nf")
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("att@example.com", "Ada", "Attendee", "pw")
+        self.event = Event.objects.create(
+            title="Launch, part 1", description="Bring a laptop; doors at 9.\nParking behind.",
+            date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.event.add_attendee(self.user)
+        self.url = f"/api/calendar/{feed_token(self.user.id)}/events.ics"
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, **headers)
+
+    def test_feed_lists_the_user_events(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        body = unfold(b"".join(response.streaming_content).decode())
+        self.assertIn(f"UID:event-{self.event.id}@testserver\r\n", body)
+        self.assertIn("SUMMARY:Launch\\, part 1\r\n", body)
+        self.assertIn("DESCRIPTION:Bring a laptop\\; doors at 9.\\nParking behind.\r\n", body)
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n"))
+
+    def test_unchanged_feed_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code, 304)
+
+    def test_changes_give_a_new_etag(self):
+        etag = self.get()["ETag"]
+        other = Event.objects.create(
+            title="Workshop", description="", date=timezone.now() + timedelta(days=9), location="Hall 2",
+        )
+        other.add_attendee(self.user)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        other.title = "Workshop (moved)"
+        other.save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_stale_last_modified_gets_the_feed(self):
+        stale = http_date((self.event.updated_at - timedelta(hours=1)).timestamp())
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=stale).status_code, 200)
+
+    def test_single_event_feed(self):
+        url = f"/api/calendar/{feed_token(self.user.id)}/events/{self.event.id}.ics"
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(self.get(f"/api/calendar/{feed_token(self.user.id)}/events/0.ics").status_code, 404)
+
+    def test_bad_token(self):
+        self.assertEqual(self.get(f"/api/calendar/{self.user.id}:forged/events.ics").status_code, 404)
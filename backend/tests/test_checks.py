@@ -0,0 +1,16 @@
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from backend.checks import check_shared_cache
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_rejected(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["backend.E001"])
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://127.0.0.1:6379/1",
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
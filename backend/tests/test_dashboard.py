@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.dashboard import compute_organizer_dashboard, get_organizer_dashboard
+from backend.event_deletion import request_event_deletion
+from backend.models import Event, Payment, Quiz, Ticket, User, UserQuizResponse
+
+
+class OrganizerDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        self.co_organizer = User.objects.create_user("co@example.com", "Cora", "Organizer", "pw")
+        self.launch = self.create_event("Launch", days=7)
+        self.launch.add_organizer(self.co_organizer)
+        self.workshop = self.create_event("Workshop", days=14)
+        self.other = Event.objects.create(
+            title="Someone else's", description="", date=timezone.now() + timedelta(days=3), location="Hall 2",
+        )
+
+        self.attendees = [User.objects.create_user(f"att{n}@example.com", f"Att{n}", "Attendee", "pw") for n in range(3)]
+        for n, user in enumerate(self.attendees):
+            self.launch.add_attendee(user)
+            ticket = Ticket.objects.create(user=user, event=self.launch, is_paid=n < 2)
+            if n < 2:
+                Payment.objects.create(ticket=ticket, amount="12.50", payment_method="credit_card", transaction_id=f"pi_{n}")
+        Ticket.objects.create(user=self.attendees[0], event=self.other, is_paid=True)
+
+        quizzes = [Quiz.objects.create(event=self.launch, title=f"Round {n}") for n in range(2)]
+        UserQuizResponse.objects.create(user=self.attendees[0], quiz=quizzes[0], completed_at=timezone.now())
+        UserQuizResponse.objects.create(user=self.attendees[1], quiz=quizzes[1], completed_at=timezone.now())
+        UserQuizResponse.objects.create(user=self.attendees[2], quiz=quizzes[1])
+
+    def create_event(self, title, days):
+        event = Event.objects.create(
+            title=title, description="", date=timezone.now() + timedelta(days=days), location="Hall 1",
+        )
+        event.add_organizer(self.organizer)
+        return event
+
+    def test_aggregates(self):
+        dashboard = compute_organizer_dashboard(self.organizer.id)
+        launch, workshop = dashboard["events"]
+        self.assertEqual(launch["event_id"], self.launch.id)
+        self.assertEqual(
+            {key: launch[key] for key in (
+                "tickets_sold", "paid_tickets", "pending_tickets", "revenue", "attendees", "quizzes",
+                "quiz_completions", "quiz_completion_rate",
+            )},
+            {
+                "tickets_sold": 3, "paid_tickets": 2, "pending_tickets": 1, "revenue": "25.00", "attendees": 3,
+                "quizzes": 2, "quiz_completions": 2, "quiz_completion_rate": 0.3333,
+            },
+        )
+        self.assertEqual(
+            (workshop["tickets_sold"], workshop["revenue"], workshop["quiz_completion_rate"]), (0, "0.00", None),
+        )
+        self.assertEqual(dashboard["totals"], {
+            "tickets_sold": 3, "paid_tickets": 2, "pending_tickets": 1, "revenue": "25.00", "attendees": 3,
+        })
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        response = client.get("/api/organizer/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["title"] for row in response.data["events"]], ["Launch", "Workshop"])
+
+    def test_payments_invalidate_every_organizer(self):
+        get_organizer_dashboard(self.organizer.id)
+        get_organizer_dashboard(self.co_organizer.id)
+        ticket = Ticket.objects.get(event=self.launch, is_paid=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(ticket=ticket, amount="12.50", payment_method="credit_card", transaction_id="pi_2")
+        for user in (self.organizer, self.co_organizer):
+            self.assertEqual(get_organizer_dashboard(user.id)["totals"]["revenue"], "37.50")
+
+    def test_deleted_events_leave_the_dashboard(self):
+        get_organizer_dashboard(self.organizer.id)
+        # The purge itself is left to the worker, which is not started here
+        with mock.patch("backend.event_deletion.start_worker"), self.captureOnCommitCallbacks(execute=True):
+            request_event_deletion(self.workshop, self.organizer)
+        self.assertEqual([row["title"] for row in get_organizer_dashboard(self.organizer.id)["events"]], ["Launch"])
+
+    def test_unsignalled_changes_wait_for_the_timeout(self):
+        get_organizer_dashboard(self.organizer.id)
+        Ticket.objects.create(user=self.co_organizer, event=self.workshop, is_paid=True)
+        self.assertEqual(get_organizer_dashboard(self.organizer.id)["totals"]["tickets_sold"], 3)
+        cache.clear()
+        self.assertEqual(get_organizer_dashboard(self.organizer.id)["totals"]["tickets_sold"], 4)
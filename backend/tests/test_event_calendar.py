@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.models import Event, User
+
+
+class EventCalendarTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("att@example.com", "Ada", "Attendee", "pw")
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=3), location="Hall 1",
+        )
+        self.event.add_attendee(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, **params):
+        return self.client.get("/api/events/calendar/", params)
+
+    def test_upcoming_days(self):
+        response = self.get(days=7)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event["id"] for event in response.data["events"]], [self.event.pk])
+        self.assertEqual(self.get(days=2).data["events"], [])
+
+    def test_days_out_of_range_are_rejected(self):
+        for days in ("99999999999", "-99999999999", "0", "367", "soon"):
+            with self.subTest(days=days):
+                self.assertEqual(self.get(days=days).status_code, 400)
+        self.assertEqual(self.get(days=366).status_code, 200)
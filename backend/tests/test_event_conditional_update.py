@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from backend.models import Event, User
+
+
+class EventIfMatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user("org@example.com", "Olga", "Organizer", "pw")
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.event.add_organizer(self.organizer)
+        self.client.force_authenticate(self.organizer)
+        self.url = f"/api/events/{self.event.id}/"
+        self.etag = self.client.get(self.url)["ETag"]
+
+    def put(self, data, etag):
+        return self.client.put(self.url, data, format="json", HTTP_IF_MATCH=etag)
+
+    def test_invalid_update_keeps_etag_current(self):
+        self.assertEqual(self.put({"ticket_price": "free"}, self.etag).status_code, 400)
+        self.assertEqual(self.put({"title": "Launch party"}, self.etag).status_code, 200)
+
+    def test_invalid_quizzes_roll_back(self):
+        response = self.put({"title": "Renamed", "quizzes": "not json"}, self.etag)
+        self.assertEqual(response.status_code, 400)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "Launch")
+        self.assertEqual(self.put({"title": "Launch party"}, self.etag).status_code, 200)
+
+    def test_stale_etag_is_rejected(self):
+        response = self.put({"title": "First"}, self.etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.put({"title": "Second"}, self.etag).status_code, 412)
+        self.assertEqual(self.put({"title": "Second"}, response["ETag"]).status_code, 200)
@@ -0,0 +1,158 @@
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+
+import stripe
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.event_deletion import CLAIM_TIMEOUT, PURGE_STEPS, purge_event, purge_pending, request_event_deletion
+from backend.models import (
+    DeletedEventPayment, Event, EventDeletion, Material, Payment, Question, QuestionOption, Quiz, Ticket, User, UserQuestionAnswer,
+    UserQuizResponse,
+)
+
+
+def create_event(title="Launch"):
+    return Event.objects.create(
+        title=title, description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+    )
+
+
+class EventDeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.organizer = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        self.event = create_event()
+        self.event.add_organizer(self.organizer)
+        for n in range(3):
+            user = User.objects.create_user(f"att{n}@example.com", f"Att{n}", "Attendee", "pw")
+            self.event.add_attendee(user)
+            ticket = Ticket.objects.create(user=user, event=self.event, is_paid=True)
+            Payment.objects.create(ticket=ticket, amount=10, payment_method="credit_card", transaction_id=f"pi_{n}")
+        quiz = Quiz.objects.create(event=self.event, title="Round 1", visible=True)
+        question = Question.objects.create(quiz=quiz, question_text="2 + 2?", question_type="multiple_choice")
+        option = QuestionOption.objects.create(question=question, option_text="4", is_correct=True)
+        response = UserQuizResponse.objects.create(user=user, quiz=quiz, score=100)
+        UserQuestionAnswer.objects.create(
+            quiz_response=response, question=question, selected_option=option, is_correct=True,
+        )
+
+        self.own = Material.objects.create(event=self.event, title="Slides", file=ContentFile(b"slides", "slides.pdf"))
+        shared = Material.objects.create(event=self.event, title="Map", file=ContentFile(b"map", "map.pdf"))
+        self.other_event = create_event("Other")
+        Material.objects.create(event=self.other_event, title="Map", file=shared.file.name)
+        self.storage = Material._meta.get_field("file").storage
+        self.shared_name = shared.file.name
+
+    def remaining_rows(self):
+        counts = {stage: model.objects.filter(**{lookup: self.event.pk}).count() for stage, model, lookup in PURGE_STEPS}
+        counts["materials"] = Material.objects.filter(event_id=self.event.pk).count()
+        return {stage: count for stage, count in counts.items() if count}
+
+    def test_deletion_hides_the_event(self):
+        request_event_deletion(self.event, self.organizer)
+        self.assertFalse(Event.objects.filter(pk=self.event.pk).exists())
+        self.assertTrue(Event.all_objects.filter(pk=self.event.pk).exists())
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        self.assertEqual(client.get(f"/api/events/{self.event.pk}/").status_code, 404)
+
+    def test_purge_removes_rows_and_unshared_files(self):
+        deletion = request_event_deletion(self.event, self.organizer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_pending(batch_size=2), 1)
+
+        self.assertEqual(self.remaining_rows(), {})
+        self.assertFalse(Event.all_objects.filter(pk=self.event.pk).exists())
+        self.assertTrue(Event.objects.filter(pk=self.other_event.pk).exists())
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.finished_at)
+        self.assertEqual(deletion.stage, "done")
+        self.assertEqual(deletion.files_deleted, 1)
+        self.assertFalse(self.storage.exists(self.own.file.name))
+        self.assertTrue(self.storage.exists(self.shared_name))
+
+    def test_purged_payments_are_kept_for_refund(self):
+        deletion = request_event_deletion(self.event, self.organizer)
+        with self.captureOnCommitCallbacks(execute=True), self.assertLogs("backend.event_deletion", "WARNING") as logs:
+            purge_pending(batch_size=2)
+
+        kept = DeletedEventPayment.objects.filter(deletion=deletion).order_by("transaction_id")
+        self.assertEqual(
+            [(p.transaction_id, p.amount, p.user.email) for p in kept],
+            [(f"pi_{n}", 10, f"att{n}@example.com") for n in range(3)],
+        )
+        self.assertTrue(all(p.refunded_at is None for p in kept))
+        self.assertEqual(sum("needs a refund" in line for line in logs.output), 3)
+
+    def test_interrupted_purge_is_resumed(self):
+        deletion = request_event_deletion(self.event, self.organizer)
+        steps = purge_event(deletion, batch_size=1)
+        for _ in range(4):
+            next(steps)
+        steps.close()  # The worker died
+
+        # Another worker only takes the purge over once the claim expires
+        self.assertEqual(purge_pending(), 0)
+        EventDeletion.objects.filter(pk=deletion.pk).update(claimed_at=timezone.now() - CLAIM_TIMEOUT * 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_pending(), 1)
+        self.assertEqual(self.remaining_rows(), {})
+        self.assertFalse(Event.all_objects.filter(pk=self.event.pk).exists())
+
+    def test_webhook_for_deleted_event_is_left_for_refund(self):
+        buyer = User.objects.create_user("buyer@example.com", "Bo", "Buyer", "pw")
+        ticket = Ticket.objects.create(user=buyer, event=self.event, is_paid=False)
+        request_event_deletion(self.event, self.organizer)
+        payload = stripe.Event.construct_from({
+            "type": "checkout.session.completed",
+            "data": {"object": {
+                "amount_total": 1000,
+                "payment_intent": "pi_deleted",
+                "metadata": {"event_id": str(self.event.pk), "user_id": str(buyer.pk), "ticket_id": str(ticket.pk)},
+            }},
+        }, "sk_test")
+
+        with mock.patch.object(stripe.Webhook, "construct_event", return_value=payload), \
+                self.assertLogs("backend.views", "ERROR") as logs:
+            response = APIClient().post("/webhook/stripe/", data=b"{}", content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("pi_deleted", logs.output[0])
+        ticket.refresh_from_db()
+        self.assertFalse(ticket.is_paid)
+        self.assertFalse(Payment.objects.filter(transaction_id="pi_deleted").exists())
+        kept = DeletedEventPayment.objects.get(transaction_id="pi_deleted")
+        self.assertEqual((kept.deletion.event_id, kept.user, kept.amount), (self.event.pk, buyer, 10))
+        self.assertFalse(self.event.is_attendee(buyer))
+
+
+class EventDeletionWorkerTests(TransactionTestCase):
+    def test_worker_purges_after_commit(self):
+        organizer = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        event = create_event()
+        event.add_organizer(organizer)
+        Ticket.objects.create(user=organizer, event=event, is_paid=True)
+
+        deletion = request_event_deletion(event, organizer)
+        for thread in threading.enumerate():
+            if thread.name == "event-deletion":
+                thread.join(timeout=30)
+
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.finished_at)
+        self.assertFalse(Event.all_objects.filter(pk=event.pk).exists())
+        self.assertFalse(Ticket.objects.filter(event_id=event.pk).exists())
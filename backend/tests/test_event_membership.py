@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Prefetch
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from backend.models import Event, EventMembership, User
+
+
+def create_event(**fields):
+    return Event.objects.create(
+        title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1", **fields,
+    )
+
+
+class RoleMembersTests(TestCase):
+    def setUp(self):
+        self.event = create_event()
+        self.users = [
+            User.objects.create_user(f"user{n}@example.com", f"User{n}", "Member", "pw") for n in range(3)
+        ]
+
+    def prefetched_event(self):
+        memberships = EventMembership.objects.select_related("user")
+        return Event.objects.prefetch_related(Prefetch("memberships", queryset=memberships)).get(pk=self.event.pk)
+
+    def test_add_remove_set_clear(self):
+        first, second, third = self.users
+        self.event.attendees.add(first, second.pk)
+        self.event.organizers.add(third)
+        self.assertCountEqual(self.event.attendees.all(), [first, second])
+        self.event.attendees.remove(first)
+        self.assertCountEqual(self.event.attendees.all(), [second])
+        self.event.attendees.set([first, third.pk])
+        self.assertCountEqual(self.event.attendees.all(), [first, third])
+        self.event.attendees.clear()
+        self.assertFalse(self.event.attendees.exists())
+        self.assertCountEqual(self.event.organizers.all(), [third])
+
+    def test_all_is_a_queryset_on_both_paths(self):
+        first, second, third = self.users
+        self.event.attendees.add(first, second)
+        self.event.organizers.add(third)
+
+        event = self.prefetched_event()
+        with self.assertNumQueries(0):
+            attendees = event.attendees.all()
+            self.assertIsInstance(attendees, QuerySet)
+            self.assertCountEqual(attendees, [first, second])
+            self.assertEqual(len(attendees), 2)
+        self.assertEqual(list(attendees.filter(pk=first.pk)), [first])
+        self.assertCountEqual(attendees.values_list("pk", flat=True), [first.pk, second.pk])
+
+        plain = self.event.attendees.all()
+        self.assertIsInstance(plain, QuerySet)
+        self.assertEqual(list(plain.filter(pk=first.pk)), [first])
+        self.assertCountEqual(plain.values_list("pk", flat=True), [first.pk, second.pk])
+
+
+class MembershipDataMigrationTests(TransactionTestCase):
+    before = [("backend", "0009_eventmembership")]
+    after = [("backend", "0010_copy_event_roles_to_memberships")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_roles_are_copied_both_ways(self):
+        apps = self.migrate(self.before)
+        OldEvent = apps.get_model("backend", "Event")
+        OldUser = apps.get_model("backend", "User")
+        organizer = OldUser.objects.create(email="org@example.com", first_name="Olu", last_name="Organizer")
+        attendee = OldUser.objects.create(email="att@example.com", first_name="Ari", last_name="Attendee")
+        event = OldEvent.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        event.organizers.add(organizer)
+        event.speakers.add(organizer)
+        event.attendees.add(attendee)
+
+        apps = self.migrate(self.after)
+        Membership = apps.get_model("backend", "EventMembership")
+        self.assertCountEqual(
+            Membership.objects.values_list("event_id", "user_id", "role"),
+            [
+                (event.pk, organizer.pk, "organizer"),
+                (event.pk, organizer.pk, "speaker"),
+                (event.pk, attendee.pk, "attendee"),
+            ],
+        )
+
+        # Reversing recreates the role rows from the memberships
+        OldEvent = apps.get_model("backend", "Event")
+        for field in ("organizers", "speakers", "attendees"):
+            getattr(OldEvent, field).through.objects.all().delete()
+        Membership.objects.create(event_id=event.pk, user_id=attendee.pk, role="speaker")
+        apps = self.migrate(self.before)
+        event = apps.get_model("backend", "Event").objects.get(pk=event.pk)
+        self.assertEqual(list(event.organizers.values_list("pk", flat=True)), [organizer.pk])
+        self.assertCountEqual(event.speakers.values_list("pk", flat=True), [organizer.pk, attendee.pk])
+        self.assertEqual(list(event.attendees.values_list("pk", flat=True)), [attendee.pk])
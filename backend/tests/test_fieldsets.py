@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from backend.fieldsets import event_queryset, fieldset_tag, parse_event_fieldset
+from backend.models import Event, Material, Question, QuestionOption, Quiz, User
+from backend.serializers import EventSerializer
+
+
+class ParseFieldsetTests(SimpleTestCase):
+    def test_defaults_embed_every_relation(self):
+        self.assertEqual(parse_event_fieldset({}), (None, set(EventSerializer.EXPANDABLE)))
+        self.assertEqual(parse_event_fieldset({"fields": "id,title"}), ({"id", "title"}, set()))
+        self.assertEqual(
+            parse_event_fieldset({"fields": "id", "expand": "quizzes"}), ({"id"}, {"quizzes"}),
+        )
+
+    def test_unknown_names_are_rejected(self):
+        for params in ({"fields": "id,password"}, {"expand": "attendees"}):
+            with self.subTest(params=params), self.assertRaises(ValueError):
+                parse_event_fieldset(params)
+
+    def test_tags_ignore_order(self):
+        self.assertEqual(fieldset_tag({"title", "id"}, {"quizzes"}), fieldset_tag({"id", "title"}, {"quizzes"}))
+        self.assertEqual(fieldset_tag(None, set(EventSerializer.EXPANDABLE)), "full")
+        self.assertNotEqual(fieldset_tag({"id"}, set()), fieldset_tag({"id"}, {"quizzes"}))
+
+
+class EventQuerysetTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        self.people = [User.objects.create_user(f"p{n}@example.com", f"P{n}", "Person", "pw") for n in range(3)]
+        for n in range(3):
+            event = Event.objects.create(
+                title=f"Event {n}", description="", date=timezone.now() + timedelta(days=n + 1), location="Hall 1",
+            )
+            event.add_organizer(self.user)
+            event.add_speaker(self.people[0])
+            event.add_attendee(self.people[1])
+            event.add_attendee(self.people[2])
+            quiz = Quiz.objects.create(event=event, title="Round 1", visible=True)
+            question = Question.objects.create(quiz=quiz, question_text="2 + 2?", question_type="multiple_choice")
+            QuestionOption.objects.create(question=question, option_text="4", is_correct=True)
+            Material.objects.create(event=event, title="Slides", file=ContentFile(b"slides", "slides.pdf"))
+        self.request = APIRequestFactory().get("/api/events/")
+        self.request.user = self.user
+
+    def serialize(self, fields, expand, queries):
+        events = event_queryset(Event.objects.order_by("id"), self.user, fields, expand)
+        with self.assertNumQueries(queries):
+            return EventSerializer(
+                events, many=True, fields=fields, expand=expand, context={"request": self.request},
+            ).data
+
+    def test_card_fields_take_one_query(self):
+        data = self.serialize({"id", "title", "date", "event_type"}, set(), queries=1)
+        self.assertEqual(set(data[0]), {"id", "title", "date", "event_type"})
+
+    def test_roles_share_one_membership_prefetch(self):
+        data = self.serialize({"id", "organizers", "speakers", "attendees"}, set(), queries=2)
+        self.assertEqual(data[0]["organizers"], [self.user.id])
+        self.assertEqual(data[0]["speakers"], [self.people[0].id])
+        self.assertEqual(data[0]["attendees"], [self.people[1].id, self.people[2].id])
+
+    def test_expanded_quizzes_prefetch_questions_and_options(self):
+        data = self.serialize({"id"}, {"quizzes"}, queries=4)
+        self.assertEqual(data[0]["quizzes"][0]["questions"][0]["options"][0]["option_text"], "4")
+
+    def test_full_events_do_not_grow_with_the_event_count(self):
+        data = self.serialize(None, set(EventSerializer.EXPANDABLE), queries=6)
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]["organizers"][0]["email"], self.user.email)
+        self.assertEqual(data[0]["materials"][0]["title"], "Slides")
+
+    def test_detail_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        event = Event.objects.order_by("id").first()
+        response = client.get(f"/api/events/{event.id}/", {"fields": "title,quizzes"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"title": "Event 0", "quizzes": [event.quizzes.get().id]})
+        self.assertEqual(client.get(f"/api/events/{event.id}/", {"fields": "secret"}).status_code, 400)
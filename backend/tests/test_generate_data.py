@@ -0,0 +1,57 @@
+import io
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from backend.leaderboard import leaderboard_differences
+from backend.models import Event, Payment, Ticket, User, UserQuizResponse
+from backend.rollups import rollup_differences
+
+
+class GenerateDataTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def generate(self, seed):
+        call_command("generate_data", scale=0.05, seed=seed, anchor_date="2025-04-01", stdout=io.StringIO())
+
+    def snapshot(self):
+        """The generated data without primary keys, which depend on earlier rows."""
+        return {
+            "users": sorted(User.objects.values_list("email", "first_name", "last_name", "phone", "is_staff")),
+            "events": sorted(Event.all_objects.values_list("title", "date", "event_type", "location", "ticket_price")),
+            "tickets": sorted(Ticket.objects.values_list("user__email", "event__date", "is_paid", "purchase_date")),
+            "payments": sorted(Payment.objects.values_list("ticket__user__email", "amount", "payment_date")),
+            "responses": sorted(
+                UserQuizResponse.objects.values_list("user__email", "quiz__event__date", "quiz__title", "score")
+            ),
+        }
+
+    def clear(self):
+        Event.all_objects.all().delete()
+        User.objects.all().delete()
+
+    def test_same_seed_generates_the_same_data(self):
+        self.generate(seed=7)
+        first = self.snapshot()
+        self.assertTrue(all(first.values()))
+
+        self.clear()
+        self.generate(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+        self.clear()
+        self.generate(seed=8)
+        self.assertNotEqual(self.snapshot()["events"], first["events"])
+
+    def test_derived_tables_match_the_generated_rows(self):
+        self.generate(seed=7)
+        self.assertEqual(leaderboard_differences(), [])
+        self.assertEqual(rollup_differences(), [])
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from backend.leaderboard import leaderboard_differences, record_quiz_score
+from backend.models import Event, EventLeaderboardEntry, Quiz, User, UserQuizResponse
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Quiz night", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.users = {
+            name: User.objects.create_user(f"{name}@example.com", name.title(), "Player", "pw")
+            for name in ("ada", "bo", "cy", "di")
+        }
+
+    def score(self, name, delta, completed=1):
+        return record_quiz_score(self.event.id, self.users[name].id, delta, completed_delta=completed)
+
+    def ranks(self):
+        names = {user.id: name for name, user in self.users.items()}
+        return {
+            names[user_id]: (rank, total)
+            for user_id, rank, total in EventLeaderboardEntry.objects.filter(event=self.event)
+            .values_list("user_id", "rank", "total_score")
+        }
+
+    def test_ties_share_a_rank(self):
+        self.score("ada", 50)
+        self.score("bo", 80)
+        self.score("cy", 50)
+        self.score("di", 20)
+        self.assertEqual(self.ranks(), {"bo": (1, 80), "ada": (2, 50), "cy": (2, 50), "di": (4, 20)})
+
+    def test_raised_score_passes_the_users_in_between(self):
+        for name, total in (("ada", 50), ("bo", 80), ("cy", 50), ("di", 20)):
+            self.score(name, total)
+        self.score("di", 30)  # 50, tying ada and cy
+        self.assertEqual(self.ranks(), {"bo": (1, 80), "ada": (2, 50), "cy": (2, 50), "di": (2, 50)})
+        self.score("cy", 40)  # 90, past bo
+        self.assertEqual(self.ranks(), {"cy": (1, 90), "bo": (2, 80), "ada": (3, 50), "di": (3, 50)})
+
+    def test_lowered_score_drops_below_the_users_in_between(self):
+        for name, total in (("ada", 50), ("bo", 80), ("cy", 50), ("di", 20)):
+            self.score(name, total)
+        self.score("bo", -60)  # 20, tying di
+        self.assertEqual(self.ranks(), {"ada": (1, 50), "cy": (1, 50), "bo": (3, 20), "di": (3, 20)})
+
+    def test_removed_entry_moves_the_users_below_up(self):
+        for name, total in (("ada", 50), ("bo", 80), ("cy", 50), ("di", 20)):
+            self.score(name, total)
+        self.assertIsNone(self.score("bo", -80, completed=-1))
+        self.assertEqual(self.ranks(), {"ada": (1, 50), "cy": (1, 50), "di": (3, 20)})
+
+    def test_matches_the_recomputation(self):
+        quizzes = [Quiz.objects.create(event=self.event, title=f"Round {n}") for n in range(2)]
+        responses = []
+        for quiz, name, score in [
+            (quizzes[0], "ada", 60), (quizzes[0], "bo", 40), (quizzes[1], "bo", 20),
+            (quizzes[1], "cy", 60), (quizzes[0], "di", 10),
+        ]:
+            responses.append(UserQuizResponse.objects.create(
+                user=self.users[name], quiz=quiz, score=score, completed_at=timezone.now(),
+            ))
+            self.score(name, score)
+        self.assertEqual(leaderboard_differences([self.event.id]), [])
+
+        # Deleting a response takes its score off the leaderboard
+        responses[2].delete()
+        self.assertEqual(self.ranks()["bo"], (3, 40))
+        self.assertEqual(leaderboard_differences([self.event.id]), [])
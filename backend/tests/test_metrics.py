@@ -0,0 +1,126 @@
+import gc
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core import mail
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+
+from backend import metrics
+from backend.services import emails_in_flight, send_ticket_confirmation_email
+
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(metrics.METRICS, {
+            "test_jobs_total": (metrics.COUNTER, "Test jobs."),
+            "test_duration_seconds": (metrics.HISTOGRAM, "Test durations."),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        buckets = mock.patch.dict(metrics.BUCKETS, {"test_duration_seconds": (0.1, 1)})
+        buckets.start()
+        self.addCleanup(buckets.stop)
+        # Gauges query the database; they are tested elsewhere
+        gauges = mock.patch.object(metrics, "_gauges", {})
+        gauges.start()
+        self.addCleanup(gauges.stop)
+        self.baseline = metrics.local_samples()
+
+    def delta(self, name, **labels):
+        key = (name, metrics._labels(labels))
+        return metrics.local_samples().get(key, 0) - self.baseline.get(key, 0)
+
+    def test_counter_rendering_and_label_escaping(self):
+        metrics.inc("test_jobs_total", 2, kind='say "hi"\n')
+        output = metrics.render()
+        self.assertIn("# HELP test_jobs_total Test jobs.\n# TYPE test_jobs_total counter\n", output)
+        self.assertIn('test_jobs_total{kind="say \\"hi\\"\\n"} ', output)
+        self.assertEqual(self.delta("test_jobs_total", kind='say "hi"\n'), 2)
+
+    def test_histogram_buckets_are_cumulative(self):
+        view = "histogram-test"
+        for value in (0.05, 0.5, 0.7, 3):
+            metrics.observe("test_duration_seconds", value, view=view)
+        lines = [line for line in metrics.render().splitlines() if f'view="{view}"' in line]
+        self.assertEqual(lines, [
+            f'test_duration_seconds_bucket{{view="{view}",le="0.1"}} 1',
+            f'test_duration_seconds_bucket{{view="{view}",le="1"}} 3',
+            f'test_duration_seconds_bucket{{view="{view}",le="+Inf"}} 4',
+            f'test_duration_seconds_sum{{view="{view}"}} 4.25',
+            f'test_duration_seconds_count{{view="{view}"}} 4',
+        ])
+
+    def test_ended_threads_are_folded_into_the_totals(self):
+        shards_before = len(metrics._shards)
+        threads = [threading.Thread(target=metrics.inc, args=("test_jobs_total",), kwargs={"kind": "thread"})
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        del threads
+        gc.collect()
+        self.assertLessEqual(len(metrics._shards), shards_before)
+        self.assertEqual(self.delta("test_jobs_total", kind="thread"), 20)
+
+    def test_metrics_dir_merges_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(METRICS_DIR=directory):
+            metrics.inc("test_jobs_total", kind="merged")
+            metrics.flush(force=True)
+            self.assertTrue(os.path.exists(os.path.join(directory, f"{os.getpid()}.json")))
+            other = [["test_jobs_total", [["kind", "merged"]], 5]]
+            with open(os.path.join(directory, "999999.json"), "w") as f:
+                json.dump(other, f)
+            with open(os.path.join(directory, "broken.json"), "w") as f:
+                f.write("{")
+            key = ("test_jobs_total", (("kind", "merged"),))
+            self.assertEqual(metrics.collect()[key], metrics.local_samples()[key] + 5)
+
+
+class MetricsViewTests(TestCase):
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE http_requests_total counter", response.content.decode())
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_no_token_outside_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+class EmailMetricsTests(TestCase):
+    def send(self):
+        return send_ticket_confirmation_email("att@example.com", "Ari", "Launch", "2026-11-01", 1)
+
+    def test_email_in_flight_during_send(self):
+        observed = []
+
+        def send_mail(*args, **kwargs):
+            observed.append(emails_in_flight())
+            return 1
+
+        with mock.patch("backend.services.send_mail", send_mail):
+            self.assertTrue(self.send())
+        self.assertEqual(observed, [1])
+        self.assertEqual(emails_in_flight(), 0)
+        self.assertIn("emails_in_flight 0\n", metrics.render())
+
+    def test_failed_send_leaves_the_gauge(self):
+        sent = metrics.total("emails_sent_total")
+        with mock.patch("backend.services.send_mail", side_effect=OSError("SMTP down")):
+            self.assertFalse(self.send())
+        self.assertEqual(emails_in_flight(), 0)
+        self.assertEqual(metrics.total("emails_sent_total"), sent + 1)
+
+    def test_sent_email(self):
+        self.assertTrue(self.send())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(emails_in_flight(), 0)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from backend import metrics
+from backend.models import Event, User
+
+
+class QueryTimingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        event.add_organizer(self.user)
+        self.client.force_authenticate(self.user)
+
+    def db_queries(self):
+        return metrics.total("http_request_db_queries_total", metrics.local_samples())
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_one_wrapper_feeds_every_consumer(self):
+        before = self.db_queries()
+        original = BaseDatabaseWrapper.execute_wrapper
+        with mock.patch.object(
+            BaseDatabaseWrapper, "execute_wrapper", autospec=True, side_effect=original,
+        ) as execute_wrapper, CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, 200)
+        wrapped = [call.args[0].alias for call in execute_wrapper.call_args_list]
+        self.assertEqual(sorted(wrapped), sorted(set(wrapped)))
+        self.assertEqual(response["X-DB-Queries"], str(len(captured)))
+        self.assertEqual(self.db_queries() - before, len(captured))
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_request_has_no_sql_headers(self):
+        before = self.db_queries()
+        response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-DB-Queries"))
+        self.assertGreater(self.db_queries(), before)
@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from backend import profiling
+from backend.models import RequestProfile
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.headers = {"HTTP_X_PROFILE_TOKEN": profiling.make_token()}
+
+    def test_profiled_request_is_stored(self):
+        response = self.client.get("/api/events/", **self.headers)
+        self.assertEqual(response.status_code, 401)
+        profile = RequestProfile.objects.get()
+        self.assertEqual((profile.path, profile.status_code), ("/api/events/", 401))
+        self.assertIn("cumulative", profiling.profile_summary(profile))
+
+    def test_busy_profiler_serves_the_request_unprofiled(self):
+        # What a second concurrent profiler gets on Python 3.12+
+        busy = mock.patch.object(
+            profiling.cProfile.Profile, "enable", side_effect=ValueError("Another profiling tool is already active"),
+        )
+        with busy:
+            response = self.client.get("/api/events/", **self.headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_feed_tokens_are_redacted(self):
+        self.client.get("/api/calendar/abc:def-secret/events/12.ics?token=other-secret&tz=UTC", **self.headers)
+        path = RequestProfile.objects.get().path
+        self.assertNotIn("secret", path)
+        self.assertEqual(path, "/api/calendar/REDACTED/events/12.ics?token=REDACTED&tz=UTC")
+
+    @override_settings(PROFILING_RETENTION_DAYS=7)
+    def test_old_profiles_are_pruned_with_their_files(self):
+        old = RequestProfile(view_name="old", method="GET", path="/", status_code=200, duration_ms=1)
+        old.file.save("old/1.prof", ContentFile(b"x"), save=False)
+        old.save()
+        RequestProfile.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=8))
+        storage, name = old.file.storage, old.file.name
+
+        self.client.get("/api/events/", **self.headers)
+        self.assertEqual(list(RequestProfile.objects.values_list("path", flat=True)), ["/api/events/"])
+        self.assertFalse(storage.exists(name))
@@ -0,0 +1,61 @@
+import json
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from backend import question_bank
+from backend.models import Event, Question, QuestionOption, Quiz
+from backend.question_bank import NDJSON, QuestionBankError, export_csv, import_question_bank
+
+
+def ndjson_question(n, correct=True):
+    return json.dumps({
+        "question_text": f"Question {n}",
+        "options": [{"option_text": "yes", "is_correct": correct}, {"option_text": "no"}],
+    }).encode() + b"\n"
+
+
+class QuestionBankImportTests(TransactionTestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            title="Quiz night", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.quiz = Quiz.objects.create(event=event, title="Round 1")
+        self.read_in_transaction = []
+
+    def stream(self, lines):
+        for line in lines:
+            self.read_in_transaction.append(connection.in_atomic_block)
+            yield line
+
+    def test_upload_is_read_before_the_transaction(self):
+        lines = [ndjson_question(n) for n in range(5)]
+        original = question_bank.IMPORT_CHUNK_SIZE
+        question_bank.IMPORT_CHUNK_SIZE = 2
+        try:
+            imported = import_question_bank(self.quiz, self.stream(lines), NDJSON)
+        finally:
+            question_bank.IMPORT_CHUNK_SIZE = original
+        self.assertEqual(imported, 5)
+        self.assertEqual(
+            list(Question.objects.filter(quiz=self.quiz).order_by("id").values_list("question_text", flat=True)),
+            [f"Question {n}" for n in range(5)],
+        )
+        self.assertEqual(QuestionOption.objects.filter(question__quiz=self.quiz).count(), 10)
+        self.assertEqual(self.read_in_transaction, [False] * 5)
+
+    def test_invalid_row_stores_nothing(self):
+        lines = [ndjson_question(0), ndjson_question(1, correct=False), b"not json\n"]
+        with self.assertRaises(QuestionBankError) as raised:
+            import_question_bank(self.quiz, self.stream(lines), NDJSON)
+        self.assertEqual([error["line"] for error in raised.exception.errors], [2, 3])
+        self.assertFalse(Question.objects.filter(quiz=self.quiz).exists())
+
+    def test_csv_export(self):
+        import_question_bank(self.quiz, [ndjson_question(0)], NDJSON)
+        self.assertEqual(
+            "".join(export_csv(self.quiz)),
+            "question_text,question_type,options,correct\r\nQuestion 0,multiple_choice,yes|no,0\r\n",
+        )
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from backend.models import Event, Question, QuestionOption, Quiz, User
+
+
+def contains_key(data, key):
+    if isinstance(data, dict):
+        return key in data or any(contains_key(value, key) for value in data.values())
+    if isinstance(data, list):
+        return any(contains_key(value, key) for value in data)
+    return False
+
+
+class EventQuizAnswerKeyTests(APITestCase):
+    """Attendees never receive is_correct, whichever endpoint embeds the quiz."""
+
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user("org@example.com", "Olga", "Organizer", "pw")
+        self.attendee = User.objects.create_user("att@example.com", "Ari", "Attendee", "pw")
+        self.event = Event.objects.create(
+            title="Quiz night", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.event.add_organizer(self.organizer)
+        self.event.add_attendee(self.attendee)
+        quiz = Quiz.objects.create(event=self.event, title="Round 1", visible=True)
+        question = Question.objects.create(quiz=quiz, question_text="2 + 2?", question_type="multiple_choice")
+        QuestionOption.objects.create(question=question, option_text="4", is_correct=True)
+        QuestionOption.objects.create(question=question, option_text="5", is_correct=False)
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_event_list(self):
+        data = self.get(self.attendee, "/api/events/")
+        self.assertTrue(contains_key(data["attending_events"], "options"))
+        self.assertFalse(contains_key(data, "is_correct"))
+        self.assertTrue(contains_key(self.get(self.organizer, "/api/events/"), "is_correct"))
+
+    def test_event_detail(self):
+        for url in (f"/api/events/{self.event.id}/", f"/api/events/{self.event.id}/?fields=title&expand=quizzes"):
+            data = self.get(self.attendee, url)
+            self.assertTrue(contains_key(data["quizzes"], "options"))
+            self.assertFalse(contains_key(data, "is_correct"))
+            self.assertTrue(contains_key(self.get(self.organizer, url), "is_correct"))
+
+    def test_event_detail_etag_depends_on_role(self):
+        url = f"/api/events/{self.event.id}/?fields=title&expand=quizzes"
+        self.client.force_authenticate(self.organizer)
+        etag = self.client.get(url)["ETag"]
+        self.client.force_authenticate(self.attendee)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(contains_key(response.json(), "is_correct"))
+
+    def test_event_batch(self):
+        url = f"/api/events/batch/?ids={self.event.id}&fields=title&expand=quizzes"
+        data = self.get(self.attendee, url)
+        self.assertTrue(contains_key(data["events"], "options"))
+        self.assertFalse(contains_key(data, "is_correct"))
+        self.assertTrue(contains_key(self.get(self.organizer, url), "is_correct"))
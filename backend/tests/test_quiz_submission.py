@@ -0,0 +1,82 @@
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.grading import GradingError, submit_quiz_response
+from backend.models import (
+    Event, EventLeaderboardEntry, Question, QuestionOption, Quiz, User, UserQuizResponse,
+)
+
+
+class QuizSubmissionTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("att@example.com", "Ari", "Attendee", "pw")
+        event = Event.objects.create(
+            title="Quiz night", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        event.add_attendee(self.user)
+        self.event = event
+        self.quiz = Quiz.objects.create(event=event, title="Round 1", visible=True)
+        question = Question.objects.create(quiz=self.quiz, question_text="2 + 2?", question_type="multiple_choice")
+        self.correct = QuestionOption.objects.create(question=question, option_text="4", is_correct=True)
+        QuestionOption.objects.create(question=question, option_text="5", is_correct=False)
+        self.answers = {str(question.id): self.correct.id}
+
+    def test_second_submission_is_rejected(self):
+        response = submit_quiz_response(self.quiz, self.user, self.answers)
+        self.assertEqual(response.score, 100)
+        with self.assertRaises(GradingError):
+            submit_quiz_response(self.quiz, self.user, self.answers)
+        self.assertEqual(UserQuizResponse.objects.filter(user=self.user, quiz=self.quiz).count(), 1)
+
+    def test_concurrent_submissions_count_once(self):
+        barrier = threading.Barrier(4)
+        outcomes = []
+
+        def submit():
+            try:
+                barrier.wait()
+                submit_quiz_response(self.quiz, self.user, self.answers)
+                outcomes.append("stored")
+            except GradingError:
+                outcomes.append("rejected")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["rejected", "rejected", "rejected", "stored"])
+        entry = EventLeaderboardEntry.objects.get(user=self.user)
+        self.assertEqual((entry.total_score, entry.quizzes_completed), (100, 1))
+
+    def post_answers(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f"/api/quizzes/{self.quiz.pk}/submit/", {"answers": self.answers}, format="json")
+
+    def test_hidden_quiz_cannot_be_submitted_by_attendees(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(visible=False)
+        self.assertEqual(self.post_answers(self.user).status_code, 404)
+        self.assertFalse(UserQuizResponse.objects.filter(quiz=self.quiz).exists())
+        self.assertFalse(EventLeaderboardEntry.objects.filter(user=self.user).exists())
+
+    def test_organizer_can_try_a_hidden_quiz(self):
+        organizer = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        self.event.add_organizer(organizer)
+        Quiz.objects.filter(pk=self.quiz.pk).update(visible=False)
+        self.assertEqual(self.post_answers(organizer).status_code, 201)
+
+    def test_visible_quiz_is_graded(self):
+        response = self.post_answers(self.user)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["score"], 100)
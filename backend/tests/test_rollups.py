@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
+import stripe
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.models import Event, EventSalesRollup, Payment, Ticket, User
+from backend.rollups import rebuild_rollups, record_ticket_created, record_ticket_paid, rollup_differences, sales_report
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+            ticket_price=25,
+        )
+        self.buyer = User.objects.create_user("buyer@example.com", "Bo", "Buyer", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def totals(self):
+        return sales_report(self.event.pk)["totals"]
+
+    def checkout(self):
+        session = mock.Mock(id="cs_test", url="https://checkout.stripe.test/cs_test")
+        with override_settings(FRONTEND_URL="https://app.test"), mock.patch.object(stripe, "api_key", "sk_test"), \
+                mock.patch.object(stripe.checkout.Session, "create", return_value=session):
+            response = self.client.post(f"/api/events/{self.event.pk}/checkout/")
+        self.assertEqual(response.status_code, 200)
+        return Ticket.objects.filter(event=self.event, user=self.buyer).latest("id")
+
+    def complete(self, ticket, payment_intent="pi_1"):
+        payload = stripe.Event.construct_from({
+            "type": "checkout.session.completed",
+            "data": {"object": {
+                "amount_total": 2500,
+                "payment_intent": payment_intent,
+                "metadata": {
+                    "event_id": str(self.event.pk), "user_id": str(self.buyer.pk), "ticket_id": str(ticket.pk),
+                },
+            }},
+        }, "sk_test")
+        with mock.patch.object(stripe.Webhook, "construct_event", return_value=payload), \
+                mock.patch("backend.services.send_ticket_confirmation_email"):
+            response = APIClient().post("/webhook/stripe/", data=b"{}", content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_abandoned_checkouts_are_not_registrations(self):
+        self.checkout()
+        ticket = self.checkout()  # Retried after giving up on the first one
+        self.assertEqual(self.totals(), {"registrations": 0, "paid_tickets": 0, "revenue": "0.00"})
+
+        self.complete(ticket)
+        self.assertEqual(self.totals(), {"registrations": 1, "paid_tickets": 1, "revenue": "25.00"})
+        self.assertEqual(rollup_differences(), [])
+
+    def test_free_tickets_are_registrations(self):
+        record_ticket_created(Ticket.objects.create(user=self.buyer, event=self.event, is_paid=True))
+        self.assertEqual(self.totals(), {"registrations": 1, "paid_tickets": 1, "revenue": "0.00"})
+        self.assertEqual(rollup_differences(), [])
+
+    def test_incremental_rollups_match_the_backfill(self):
+        record_ticket_created(Ticket.objects.create(user=self.buyer, event=self.event, is_paid=False))
+        for n in range(3):
+            ticket = Ticket.objects.create(user=self.buyer, event=self.event, is_paid=True)
+            payment = Payment.objects.create(ticket=ticket, amount=25, payment_method="credit_card", transaction_id=f"pi_{n}")
+            record_ticket_paid(ticket, payment.amount, payment.payment_date)
+        self.assertEqual(rollup_differences(), [])
+        self.assertEqual(self.totals(), {"registrations": 3, "paid_tickets": 3, "revenue": "75.00"})
+
+    def test_differences_are_found_and_rebuilt(self):
+        Ticket.objects.create(user=self.buyer, event=self.event, is_paid=True)
+        EventSalesRollup.objects.create(event=self.event, bucket=timezone.now() - timedelta(days=1), registrations=4)
+        self.assertEqual(len(rollup_differences()), 2)
+
+        rebuild_rollups([self.event.pk])
+        self.assertEqual(rollup_differences(), [])
+        self.assertEqual(self.totals()["registrations"], 1)
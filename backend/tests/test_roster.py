@@ -0,0 +1,52 @@
+import csv
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.models import Event, Payment, Ticket, User
+
+
+class RosterTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user("org@example.com", "Olu", "Organizer", "pw")
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+        self.event.add_organizer(self.organizer)
+        self.attendees = []
+        for first_name in ("=HYPERLINK(\"http://evil.test\")", "Bea", "@SUM(A1)"):
+            user = User.objects.create_user(f"{len(self.attendees)}@example.com", first_name, "-Attendee", "pw")
+            self.event.add_attendee(user)
+            self.attendees.append(user)
+        ticket = Ticket.objects.create(user=self.attendees[1], event=self.event, is_paid=True)
+        Payment.objects.create(ticket=ticket, amount=10, payment_method="+card", transaction_id="pi_1")
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+
+    def get_page(self, **params):
+        return self.client.get(f"/api/events/{self.event.pk}/attendees/", params)
+
+    def test_pages_follow_the_cursor(self):
+        first = self.get_page(limit=2)
+        self.assertEqual([row["user_id"] for row in first.data["results"]], [u.pk for u in self.attendees[:2]])
+        second = self.get_page(limit=2, cursor=first.data["next_cursor"])
+        self.assertEqual([row["user_id"] for row in second.data["results"]], [self.attendees[2].pk])
+        self.assertIsNone(second.data["next_cursor"])
+
+    def test_out_of_range_cursors_are_rejected(self):
+        for cursor in (str(2**63), "99999999999999999999999", "-1", "next"):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.get_page(cursor=cursor).status_code, 400)
+        self.assertEqual(self.get_page(cursor=str(2**63 - 1)).data["results"], [])
+
+    def test_export_quotes_formulas(self):
+        response = self.client.get(f"/api/events/{self.event.pk}/attendees/export/")
+        rows = list(csv.DictReader(line.decode() for line in response.streaming_content))
+        self.assertEqual(
+            [row["first_name"] for row in rows], ["'=HYPERLINK(\"http://evil.test\")", "Bea", "'@SUM(A1)"],
+        )
+        self.assertEqual({row["last_name"] for row in rows}, {"'-Attendee"})
+        self.assertEqual([row["payment_method"] for row in rows], ["", "'+card", ""])
+        self.assertEqual(rows[1]["amount"], "10.00")
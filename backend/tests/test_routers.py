@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from backend.models import Event, User
+from backend.routers import ReplicaRouter, ReplicaRoutingMiddleware, pin_to_primary
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("att@example.com", "Ari", "Attendee", "pw")
+        self.token = Token.objects.create(user=self.user)
+        self.event = Event.objects.create(
+            title="Launch", description="", date=timezone.now() + timedelta(days=7), location="Hall 1",
+        )
+
+    def read_alias(self, url, method="get"):
+        """Run a request through the middleware and return where a view's read would go."""
+        request = getattr(RequestFactory(), method)(url, HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        request.resolver_match = resolve(url)
+        router = ReplicaRouter()
+        aliases = []
+
+        def view(request):
+            aliases.append(router.db_for_read(Event))
+            return HttpResponse()
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(request)
+        return aliases[0]
+
+    def test_listed_view_reads_from_replica(self):
+        self.assertEqual(self.read_alias(f"/api/events/{self.event.pk}/"), "replica")
+
+    def test_unlisted_view_reads_from_primary(self):
+        self.assertEqual(self.read_alias(f"/api/events/{self.event.pk}/sales/"), "default")
+
+    def test_writes_read_from_primary(self):
+        self.assertEqual(self.read_alias(f"/api/events/{self.event.pk}/", method="post"), "default")
+
+    def test_pinned_user_reads_from_primary(self):
+        pin_to_primary(self.user.pk)
+        self.assertEqual(self.read_alias(f"/api/events/{self.event.pk}/"), "default")
+
+    def test_token_user_is_cached(self):
+        self.read_alias(f"/api/events/{self.event.pk}/")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.read_alias(f"/api/events/{self.event.pk}/"), "replica")
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from backend.models import Event
+from backend.slow_queries import explain, filtered_columns, full_scans, partial_searches, read_log
+
+
+class PlanParsingTests(SimpleTestCase):
+    def test_full_scans(self):
+        plan = ["SCAN backend_event", "SEARCH backend_ticket USING INDEX t_idx (event_id=?)", "SCAN TABLE auth AS a"]
+        self.assertEqual(full_scans(plan), ["backend_event", "auth"])
+        self.assertEqual(full_scans(["Seq Scan on backend_event  (cost=0.00..1.00 rows=1)"]), ["backend_event"])
+
+    def test_partial_searches(self):
+        plan = ["SEARCH backend_ticket USING COVERING INDEX t_idx (event_id=? AND user_id>?)"]
+        self.assertEqual(partial_searches(plan), [("backend_ticket", ["event_id", "user_id"])])
+
+    def test_filtered_columns(self):
+        sql = (
+            'SELECT * FROM "backend_ticket" WHERE ("backend_ticket"."event_id" = %s AND '
+            '"backend_ticket"."is_paid" AND "backend_ticket"."purchase_date" >= %s AND "other"."id" = %s) '
+            'ORDER BY "backend_ticket"."purchase_date" DESC'
+        )
+        self.assertEqual(
+            filtered_columns(sql, "backend_ticket"), (["event_id", "is_paid"], ["purchase_date"]),
+        )
+
+    def test_read_log_skips_blank_and_broken_lines(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write('{"sql": "SELECT 1", "ms": 120}\n\nnot json\n{"sql": "SELECT 2"}\n')
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual([entry["sql"] for entry in read_log(f.name)], ["SELECT 1", "SELECT 2"])
+
+
+class IndexAdvisorTests(TransactionTestCase):
+    def setUp(self):
+        for n in range(20):
+            Event.objects.create(
+                title=f"Event {n}", description="", date=timezone.now() + timedelta(days=n), location=f"Hall {n % 3}",
+            )
+
+    def write_log(self, *queries):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            for sql, params in queries:
+                f.write(json.dumps({"event": "slow_query", "view": "event-detail", "ms": 150, "sql": sql, "params": params}) + "\n")
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_explain_opens_the_connection(self):
+        connection.close()
+        plan = explain(connection, 'SELECT * FROM "backend_event" WHERE "backend_event"."location" = %s', ["Hall 1"])
+        self.assertEqual(full_scans(plan), ["backend_event"])
+
+    def test_proposes_an_index_for_a_full_scan(self):
+        path = self.write_log(
+            ('SELECT "backend_event"."id" FROM "backend_event" WHERE "backend_event"."location" = %s', ["Hall 1"]),
+            ('SELECT "backend_event"."id" FROM "backend_event" WHERE "backend_event"."id" = %s', [1]),
+            ('UPDATE "backend_event" SET "title" = %s', ["x"]),
+        )
+        # A fresh process has no open connection yet
+        connection.close()
+        out = StringIO()
+        call_command("index_advisor", log=path, repeats=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn("2 distinct statements, 1 fully served by indexes.", output)
+        self.assertIn("full scan of backend_event", output)
+        self.assertIn("propose index on backend.Event(location)", output)
+        self.assertIn("with the proposed indexes", output)
+        # The trial index was rolled back
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, "backend_event")
+        self.assertFalse(any(c["columns"] == ["location"] for c in constraints.values()))
+
+    def test_nothing_to_propose(self):
+        path = self.write_log(
+            ('SELECT "backend_event"."id" FROM "backend_event" WHERE "backend_event"."id" = %s', [1]),
+        )
+        out = StringIO()
+        call_command("index_advisor", log=path, repeats=1, stdout=out)
+        self.assertIn("No indexes to propose.", out.getvalue())
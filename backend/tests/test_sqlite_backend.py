@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from backend.sqlite.base import DatabaseWrapper
+
+
+class BusyTimeoutTests(SimpleTestCase):
+    def busy_timeout(self, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, "NAME": os.path.join(directory, "probe.sqlite3")}
+            settings_dict["OPTIONS"] = {**settings_dict["OPTIONS"], **options}
+            wrapper = DatabaseWrapper(settings_dict, alias="probe")
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute("PRAGMA busy_timeout")
+                    return cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+
+    def test_default(self):
+        self.assertEqual(self.busy_timeout(), 5000)
+
+    def test_follows_timeout_option(self):
+        self.assertEqual(self.busy_timeout(timeout=300), 300_000)
+
+    def test_explicit_pragma_wins(self):
+        self.assertEqual(self.busy_timeout(timeout=300, pragmas={"busy_timeout": 100}), 100)
@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from backend.models import Event, Material
+
+
+class SweepMaterialsTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        event = Event.objects.create(title="Launch", description="", date=timezone.now(), location="Hall 1")
+        self.kept = Material.objects.create(event=event, title="Slides", file=ContentFile(b"slides", "slides.pdf"))
+        upload_to = Material._meta.get_field("file").upload_to
+        two_days_ago = time.time() - 48 * 3600
+        os.utime(os.path.join(self.media_root, self.kept.file.name), (two_days_ago, two_days_ago))
+
+        self.old_orphans = [self.write(os.path.join(upload_to, "old.pdf"), two_days_ago),
+                            self.write(os.path.join(upload_to, "nested", "old.pdf"), two_days_ago)]
+        self.recent_orphan = self.write(os.path.join(upload_to, "uploading.pdf"))
+        self.elsewhere = self.write(os.path.join("request_profiles", "old.prof"), two_days_ago)
+
+    def write(self, name, mtime=None):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def sweep(self, *args):
+        out = io.StringIO()
+        call_command("sweep_materials", "--rate", "0", "--chunk-size", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def remaining(self):
+        return {
+            path: os.path.exists(path)
+            for path in [os.path.join(self.media_root, self.kept.file.name), *self.old_orphans,
+                         self.recent_orphan, self.elsewhere]
+        }
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.sweep("--dry-run")
+        self.assertIn("Would delete 2 orphaned files", output)
+        self.assertIn("nested/old.pdf", output)
+        self.assertTrue(all(self.remaining().values()))
+
+    def test_old_orphans_are_deleted(self):
+        output = self.sweep()
+        self.assertIn("Scanned 4 files: 1 referenced, 1 orphans within the grace period.", output)
+        self.assertIn("Deleted 2 orphaned files", output)
+        remaining = self.remaining()
+        self.assertEqual([path for path, exists in remaining.items() if not exists], self.old_orphans)
+
+    def test_grace_period(self):
+        self.sweep("--grace-hours", "72")
+        self.assertTrue(all(self.remaining().values()))
+        self.sweep("--grace-hours", "0")
+        self.assertFalse(os.path.exists(self.recent_orphan))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, self.kept.file.name)))
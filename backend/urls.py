@@ -18,17 +18,34 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from .views import (
+    EventCalendarView,
+    CalendarFeedLinkView,
+    EventBatchView,
     EventDetailView,
+    EventDeletionView,
     UserLoginView,
     UserRegisterView,
     EventListCreateView,
     MarkEventAsViewedView,
+    EventLeaderboardView,
+    OrganizerDashboardView,
+    EventSalesReportView,
     UserProfileView,
     QuizDetailView,
+    QuizSubmitView,
+    QuizAnalyticsView,
+    QuizImportView,
+    EventAttendeeRosterView,
+    EventAttendeeExportView,
+    EventAttendeeImportView,
+    QuizExportView,
     MaterialDetailView,
     UserSearchView,
     StripeCheckoutView,
     stripe_webhook,
+    metrics_view,
+    user_calendar_feed,
+    event_calendar_feed,
 )
 
 urlpatterns = [
@@ -38,10 +55,27 @@ urlpatterns = [
     path("api/profile/", UserProfileView.as_view(), name="user-profile"),
     path('api/users/search/', UserSearchView.as_view(), name='user-search'),
     path("api/events/", EventListCreateView.as_view(), name="events-list-create"),
+    path("api/events/batch/", EventBatchView.as_view(), name="events-batch"),
+    path("api/events/calendar/", EventCalendarView.as_view(), name="events-calendar"),
+    path("api/calendar/feed/", CalendarFeedLinkView.as_view(), name="calendar-feed-link"),
+    path("api/calendar/<str:token>/events.ics", user_calendar_feed, name="user-calendar-feed"),
+    path("api/calendar/<str:token>/events/<int:pk>.ics", event_calendar_feed, name="event-calendar-feed"),
     path("api/events/<int:pk>/mark-viewed/", MarkEventAsViewedView.as_view()),
     path("api/events/<int:pk>/", EventDetailView.as_view(), name="event-detail"),
+    path("api/events/<int:pk>/deletion/", EventDeletionView.as_view(), name="event-deletion"),
+    path("api/events/<int:pk>/leaderboard/", EventLeaderboardView.as_view(), name="event-leaderboard"),
+    path("api/events/<int:pk>/sales/", EventSalesReportView.as_view(), name="event-sales"),
+    path("api/events/<int:pk>/attendees/", EventAttendeeRosterView.as_view(), name="event-attendees"),
+    path("api/events/<int:pk>/attendees/export/", EventAttendeeExportView.as_view(), name="event-attendee-export"),
+    path("api/events/<int:pk>/attendees/import/", EventAttendeeImportView.as_view(), name="event-attendee-import"),
+    path("api/organizer/dashboard/", OrganizerDashboardView.as_view(), name="organizer-dashboard"),
     path('api/quizzes/<int:pk>/', QuizDetailView.as_view(), name='quiz-detail'),
+    path('api/quizzes/<int:pk>/submit/', QuizSubmitView.as_view(), name='quiz-submit'),
+    path('api/quizzes/<int:pk>/analytics/', QuizAnalyticsView.as_view(), name='quiz-analytics'),
+    path('api/quizzes/<int:pk>/import/', QuizImportView.as_view(), name='quiz-import'),
+    path('api/quizzes/<int:pk>/export/<str:file_format>/', QuizExportView.as_view(), name='quiz-export'),
     path('api/materials/<int:pk>/', MaterialDetailView.as_view(), name='material-detail'),
     path('api/events/<int:event_id>/checkout/', StripeCheckoutView.as_view()),
     path('webhook/stripe/', stripe_webhook, name='stripe-webhook'),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -3,12 +3,40 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework.permissions import IsAuthenticated
-from django.http import Http404, HttpResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from .serializers import UserSerializer, EventSerializer, QuizSerializer, QuestionSerializer, MaterialSerializer
-from .models import Event, EventNotification, Quiz, Question, QuestionOption, Material, Ticket, Payment, User
+from .models import DeletedEventPayment, Event, EventDeletion, EventMembership, EventNotification, Quiz, Question, QuestionOption, Material, Ticket, Payment, User
+from .grading import GradingError, submit_quiz_response
+from .analytics import get_quiz_analytics
+from .dashboard import get_organizer_dashboard
+from .rollups import record_ticket_created, record_ticket_paid, sales_report
+from .event_deletion import request_event_deletion
+from .event_calendar import EVENT_TYPES, MAX_EVENTS, MAX_WINDOW, ROLES, calendar_events
+from .calendar_feeds import feed_token, feed_version, render_calendar, user_feed_events, user_for_token
+from . import metrics
+from .leaderboard import entry_for, top_entries
+from .quiz_payloads import ATTENDEE, ORGANIZER, PAYLOAD_SERIALIZERS, get_quiz_payload, quiz_version
+from .fieldsets import event_queryset, fieldset_tag, parse_event_fieldset
+from .attendee_import import AttendeeImportError, import_attendees, parse_csv_emails, parse_json_emails
+from .roster import MAX_CURSOR, MAX_ROSTER_PAGE_SIZE, ROSTER_PAGE_SIZE, export_roster_csv, roster_page
+from .conditional import event_state_tag, match_fails, none_match_fails, quiz_etag, representation_etag
+from .question_bank import (
+    CSV,
+    FORMATS,
+    QuestionBankError,
+    detect_format,
+    export_csv,
+    export_ndjson,
+    import_question_bank,
+)
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import datetime
 import json
+import os
 
 from django.conf import settings
 import stripe
@@ -22,6 +50,21 @@ logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+MAX_BATCH_EVENTS = 50
+
+
+def parse_moment(value):
+    """Parse an ISO date or datetime query parameter into an aware datetime, or None."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime.datetime.combine(day, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
 
 class UserRegisterView(APIView):
     permission_classes = [AllowAny]  # Add this line
@@ -176,18 +219,29 @@ class EventListCreateView(APIView):
         - Events the user is organizing
         - Events the user is speaking at
         - Events the user is attending
+        ?fields= and ?expand= select a sparse fieldset.
         """
         user = request.user
-        
+        try:
+            fields, expand = parse_event_fieldset(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def events_where(role):
+            return event_queryset(Event.objects.for_member(user, role), user, fields, expand)
+
         # Get events for each role category
-        organized_events = Event.objects.filter(organizers=user)
-        speaking_events = Event.objects.filter(speakers=user)
-        attending_events = Event.objects.filter(attendees=user)
+        organized_events = events_where(EventMembership.ORGANIZER)
+        speaking_events = events_where(EventMembership.SPEAKER)
+        attending_events = events_where(EventMembership.ATTENDEE)
         
         # Serialize each event category
-        organized_serializer = EventSerializer(organized_events, many=True, context={"request": request})
-        speaking_serializer = EventSerializer(speaking_events, many=True, context={"request": request})
-        attending_serializer = EventSerializer(attending_events, many=True, context={"request": request})
+        context = {"request": request}
+        organized_serializer = EventSerializer(
+            organized_events, many=True, context=context, fields=fields, expand=expand, answer_keys=True
+        )
+        speaking_serializer = EventSerializer(speaking_events, many=True, context=context, fields=fields, expand=expand)
+        attending_serializer = EventSerializer(attending_events, many=True, context=context, fields=fields, expand=expand)
         
         # Return structured response with categorized events
         return Response({
@@ -370,13 +424,147 @@ class EventListCreateView(APIView):
             
             # Return the updated event data
             return Response(
-                EventSerializer(event, context={"request": request}).data,
+                EventSerializer(event, context={"request": request}, answer_keys=True).data,
                 status=status.HTTP_201_CREATED,
             )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def event_detail_data(event, request, fields, expand, role):
+    """
+    Serialize an event loaded with event_queryset() the way the detail
+    endpoint returns it to a user with `role` (ORGANIZER or ATTENDEE).
+    """
+    # Quizzes and materials are serialized below, from the same prefetch
+    serializer = EventSerializer(
+        event, context={"request": request}, fields=fields, expand=expand - {"quizzes", "materials"}
+    )
+    data = serializer.data
+
+    if "quizzes" in expand:
+        # Only organizers see the correct answers, as with QuizDetailView
+        data['quizzes'] = PAYLOAD_SERIALIZERS[role](event.quizzes.all(), many=True).data
+    if "materials" in expand:
+        data['materials'] = MaterialSerializer(event.materials.all(), many=True).data
+    return data
+
+
+class EventCalendarView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return the user's events between ?start= and ?end= (ISO dates or
+        datetimes), or in the next ?days= days (7 by default), optionally
+        filtered by ?role= and ?event_type= (comma-separated).
+        """
+        params = request.query_params
+        if params.get("start") or params.get("end"):
+            start = parse_moment(params.get("start", ""))
+            end = parse_moment(params.get("end", ""))
+            if start is None or end is None:
+                return Response({"error": "start and end must both be ISO dates or datetimes."},
+                              status=status.HTTP_400_BAD_REQUEST)
+        else:
+            try:
+                days = int(params.get("days", 7))
+            except ValueError:
+                return Response({"error": "days must be an integer."},
+                              status=status.HTTP_400_BAD_REQUEST)
+            # Checked before building the timedelta, which overflows on huge values
+            if not 0 < days <= MAX_WINDOW.days:
+                return Response({"error": f"days must be between 1 and {MAX_WINDOW.days}."},
+                              status=status.HTTP_400_BAD_REQUEST)
+            start = timezone.now()
+            end = start + datetime.timedelta(days=days)
+
+        if end <= start:
+            return Response({"error": "end must be after start."},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if end - start > MAX_WINDOW:
+            return Response({"error": f"The window cannot exceed {MAX_WINDOW.days} days."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        roles = [role for role in params.get("role", "").split(",") if role] or ROLES
+        event_types = [event_type for event_type in params.get("event_type", "").split(",") if event_type]
+        if set(roles) - set(ROLES) or set(event_types) - set(EVENT_TYPES):
+            return Response({"error": f"role must be among {', '.join(ROLES)} and "
+                                      f"event_type among {', '.join(EVENT_TYPES)}."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        events = calendar_events(request.user.id, start, end, roles, event_types)
+        return Response({
+            "start": start,
+            "end": end,
+            "events": events,
+            "truncated": len(events) == MAX_EVENTS,
+        }, status=status.HTTP_200_OK)
+
+
+class CalendarFeedLinkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return the ICS feed URL of the user's events, or of one event with ?event=."""
+        token = feed_token(request.user.id)
+        event_id = request.query_params.get("event")
+        if event_id is None:
+            url = reverse("user-calendar-feed", args=[token])
+        elif event_id.isdigit() and Event.objects.filter(pk=event_id).exists():
+            url = reverse("event-calendar-feed", args=[token, event_id])
+        else:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"url": request.build_absolute_uri(url)}, status=status.HTTP_200_OK)
+
+
+class EventBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return up to MAX_BATCH_EVENTS events by ?ids= (comma-separated) as the
+        detail endpoint would, keyed by id, loaded with one prefetch plan.
+        Ids that fail are reported under "errors" instead of failing the batch.
+        ?fields= and ?expand= apply to every event.
+        """
+        try:
+            fields, expand = parse_event_fieldset(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        raw_ids = [raw_id.strip() for raw_id in request.query_params.get("ids", "").split(",") if raw_id.strip()]
+        if not raw_ids:
+            return Response({"error": "ids is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > MAX_BATCH_EVENTS:
+            return Response({"error": f"At most {MAX_BATCH_EVENTS} ids can be fetched at once."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        errors = {}
+        event_ids = []
+        for raw_id in dict.fromkeys(raw_ids):
+            if raw_id.isdigit():
+                event_ids.append(int(raw_id))
+            else:
+                errors[raw_id] = "Invalid id."
+
+        # Any authenticated user may read event details, as with EventDetailView
+        events = event_queryset(Event.objects.filter(pk__in=event_ids), request.user, fields, expand).in_bulk()
+        organized = set(
+            EventMembership.objects.filter(user=request.user, role=EventMembership.ORGANIZER, event_id__in=list(events))
+            .values_list("event_id", flat=True)
+        ) if "quizzes" in expand else set()
+        found = {}
+        for event_id in event_ids:
+            if event_id in events:
+                role = ORGANIZER if event_id in organized else ATTENDEE
+                found[str(event_id)] = event_detail_data(events[event_id], request, fields, expand, role)
+            else:
+                errors[str(event_id)] = "Event not found."
+
+        return Response({"events": found, "errors": errors}, status=status.HTTP_200_OK)
+
+
 class EventDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -387,24 +575,33 @@ class EventDetailView(APIView):
             raise Http404
 
     def get(self, request, pk):
-        """Return details of a specific event with quizzes and materials."""
+        """
+        Return details of a specific event with quizzes and materials, or the
+        sparse fieldset selected with ?fields= and ?expand=.
+        """
+        try:
+            fields, expand = parse_event_fieldset(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Check the ETag before loading any relation
         event = self.get_object(pk)
-        serializer = EventSerializer(event, context={"request": request})
-        
-        # Get quizzes for this event
-        quizzes = Quiz.objects.filter(event=event)
-        quiz_serializer = QuizSerializer(quizzes, many=True)
-        
-        # Get materials for this event
-        materials = Material.objects.filter(event=event)
-        material_serializer = MaterialSerializer(materials, many=True)
-        
-        # Combine all data
-        response_data = serializer.data
-        response_data['quizzes'] = quiz_serializer.data
-        response_data['materials'] = material_serializer.data
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+
+        # The body has the user's unread flag and answer keys next to the event's state
+        unread = EventNotification.objects.filter(user=request.user, event=event, is_viewed=False).exists()
+        # Only embedded quizzes differ by role
+        role = ORGANIZER if "quizzes" in expand and event.is_organizer(request.user) else ATTENDEE
+        etag = representation_etag(
+            event_state_tag(event.id, event.updated_at), int(unread), role, fieldset_tag(fields, expand)
+        )
+        if none_match_fails(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        event = event_queryset(Event.objects.filter(pk=pk), request.user, fields, expand).first()
+        if event is None:
+            raise Http404
+        return Response(event_detail_data(event, request, fields, expand, role), status=status.HTTP_200_OK,
+                        headers={"ETag": etag})
 
     def put(self, request, pk):
         """Update an existing event, including quizzes and materials."""
@@ -416,7 +613,7 @@ class EventDetailView(APIView):
                 {"error": "Only organizers can edit this event."}, 
                 status=status.HTTP_403_FORBIDDEN
             )
-        
+
         # Make a mutable copy of the request data
         data = request.data.copy()
         
@@ -436,11 +633,25 @@ class EventDetailView(APIView):
         event_data = {k: v for k, v in data.items() if k not in ['quizzes', 'materials', 'files']}
         serializer = EventSerializer(event, data=event_data, partial=True, context={"request": request})
         
-        # Update basic event information
-        event_data = {k: v for k, v in data.items() if k not in ['quizzes', 'materials', 'files']}
-        serializer = EventSerializer(event, data=event_data, partial=True, context={"request": request})
-        
-        if serializer.is_valid():
+        # Validate before claiming the version, so that a rejected update
+        # leaves the client's ETag current
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # The claim and the changes commit together; an error response below
+        # rolls both back
+        with transaction.atomic():
+            # With If-Match, only update the version the organizer last fetched.
+            # Claiming it by moving updated_at makes a concurrent update fail too
+            if request.headers.get("If-Match") and (
+                match_fails(request, event_state_tag(event.id, event.updated_at))
+                or not Event.objects.filter(pk=event.pk, updated_at=event.updated_at).update(updated_at=timezone.now())
+            ):
+                return Response(
+                    {"error": "The event was changed since you last fetched it."},
+                    status=status.HTTP_412_PRECONDITION_FAILED
+                )
+
             updated_event = serializer.save()
             
             # Double-check to make sure the current user is still an organizer
@@ -454,6 +665,7 @@ class EventDetailView(APIView):
                     try:
                         quizzes_data = json.loads(data['quizzes'])
                     except json.JSONDecodeError:
+                        transaction.set_rollback(True)
                         return Response({"error": "Invalid quiz data format"}, 
                                       status=status.HTTP_400_BAD_REQUEST)
                 else:
@@ -525,6 +737,7 @@ class EventDetailView(APIView):
                     try:
                         materials_meta = json.loads(data['materials'])
                     except json.JSONDecodeError:
+                        transaction.set_rollback(True)
                         return Response({"error": "Invalid materials data format"}, 
                                        status=status.HTTP_400_BAD_REQUEST)
                 
@@ -563,6 +776,7 @@ class EventDetailView(APIView):
                     try:
                         quizzes_data = json.loads(data['quizzes'])
                     except json.JSONDecodeError:
+                        transaction.set_rollback(True)
                         return Response({"error": "Invalid quiz data format"}, 
                                       status=status.HTTP_400_BAD_REQUEST)
                 else:
@@ -634,6 +848,7 @@ class EventDetailView(APIView):
                     try:
                         materials_meta = json.loads(data['materials'])
                     except json.JSONDecodeError:
+                        transaction.set_rollback(True)
                         return Response({"error": "Invalid materials data format"}, 
                                        status=status.HTTP_400_BAD_REQUEST)
                 
@@ -665,12 +880,18 @@ class EventDetailView(APIView):
                         )
             
             # Return the updated event with all related data
+            unread = EventNotification.objects.filter(
+                user=request.user, event=updated_event, is_viewed=False
+            ).exists()
+            # The same ETag a GET of the full representation returns to an organizer
+            etag = representation_etag(
+                event_state_tag(updated_event.id, updated_event.updated_at), int(unread), ORGANIZER, "full"
+            )
             return Response(
-                EventSerializer(updated_event, context={"request": request}).data, 
-                status=status.HTTP_200_OK
+                EventSerializer(updated_event, context={"request": request}, answer_keys=True).data, 
+                status=status.HTTP_200_OK,
+                headers={"ETag": etag}
             )
-            
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
         """Delete an event and all associated quizzes and materials."""
@@ -683,9 +904,111 @@ class EventDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
             
-        # Delete will cascade to related objects due to on_delete=models.CASCADE
-        event.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        # The event is hidden now and its rows are purged in the background
+        deletion = request_event_deletion(event, request.user)
+        return Response(event_deletion_data(deletion), status=status.HTTP_202_ACCEPTED)
+
+
+def event_deletion_data(deletion):
+    return {
+        "event_id": deletion.event_id,
+        "title": deletion.title,
+        "stage": deletion.stage,
+        "rows_deleted": deletion.rows_deleted,
+        "files_deleted": deletion.files_deleted,
+        "requested_at": deletion.requested_at,
+        "finished_at": deletion.finished_at,
+    }
+
+
+class EventDeletionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Return the progress of an event deletion to the organizer who requested it."""
+        try:
+            deletion = EventDeletion.objects.get(event_id=pk, requested_by=request.user)
+        except EventDeletion.DoesNotExist:
+            raise Http404
+        return Response(event_deletion_data(deletion), status=status.HTTP_200_OK)
+
+
+class EventLeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Return the top quiz scorers of an event and the current user's rank."""
+        try:
+            event = Event.objects.get(pk=pk)
+        except Event.DoesNotExist:
+            raise Http404
+
+        if not (event.is_organizer(request.user) or event.is_attendee(request.user)):
+            return Response({"error": "You don't have access to this leaderboard."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+        except ValueError:
+            return Response({"error": "limit must be an integer."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        def serialize(entry):
+            return {
+                "rank": entry.rank,
+                "user": UserSerializer(entry.user).data,
+                "total_score": entry.total_score,
+                "quizzes_completed": entry.quizzes_completed,
+            }
+
+        me = entry_for(event.id, request.user.id)
+        return Response({
+            "top": [serialize(entry) for entry in top_entries(event.id, limit)],
+            "me": serialize(me) if me else None,
+        }, status=status.HTTP_200_OK)
+
+
+class OrganizerDashboardView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return sales, revenue, attendance and quiz completion for the user's organized events."""
+        return Response(get_organizer_dashboard(request.user.id), status=status.HTTP_200_OK)
+
+
+class EventSalesReportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Return registrations, paid tickets and revenue of an event per hour or
+        day (?granularity=hour|day), optionally between ?start= and ?end=.
+        """
+        try:
+            event = Event.objects.get(pk=pk)
+        except Event.DoesNotExist:
+            raise Http404
+
+        if not event.is_organizer(request.user):
+            return Response({"error": "Only organizers can view sales reports."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        granularity = request.query_params.get("granularity", "hour")
+        if granularity not in ("hour", "day"):
+            return Response({"error": "granularity must be 'hour' or 'day'."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for name in ("start", "end"):
+            value = request.query_params.get(name)
+            if not value:
+                continue
+            bounds[name] = parse_moment(value)
+            if bounds[name] is None:
+                return Response({"error": f"Invalid {name} date."},
+                              status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(sales_report(event.id, granularity, **bounds), status=status.HTTP_200_OK)
 
 
 class MarkEventAsViewedView(APIView):
@@ -710,7 +1033,7 @@ class QuizDetailView(APIView):
     
     def get_object(self, pk):
         try:
-            return Quiz.objects.get(pk=pk)
+            return Quiz.objects.select_related("event").get(pk=pk, event__deleted_at__isnull=True)
         except Quiz.DoesNotExist:
             raise Http404
     
@@ -720,12 +1043,19 @@ class QuizDetailView(APIView):
         
         # Check if user has access to this quiz
         event = quiz.event
-        if not (event.is_organizer(request.user) or event.is_attendee(request.user)):
+        if event.is_organizer(request.user):
+            role = ORGANIZER
+        elif event.is_attendee(request.user):
+            role = ATTENDEE  # Attendees never see the correct answers
+        else:
             return Response({"error": "You don't have access to this quiz."}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        serializer = QuizSerializer(quiz)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = quiz_etag(quiz.id, quiz_version(quiz.id), role)
+        if none_match_fails(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(get_quiz_payload(quiz.id, role), status=status.HTTP_200_OK, headers={"ETag": etag})
     
     def delete(self, request, pk):
         """Delete a quiz."""
@@ -739,12 +1069,244 @@ class QuizDetailView(APIView):
         quiz.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+
+class QuizSubmitView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """Grade a full answer set for a quiz and store the user's response."""
+        try:
+            quiz = Quiz.objects.select_related("event").get(pk=pk, event__deleted_at__isnull=True)
+        except Quiz.DoesNotExist:
+            raise Http404
+
+        event = quiz.event
+        is_organizer = event.is_organizer(request.user)
+        if not (is_organizer or event.is_attendee(request.user)):
+            return Response({"error": "You don't have access to this quiz."},
+                          status=status.HTTP_403_FORBIDDEN)
+        # Hidden quizzes don't exist for attendees; organizers may try them out
+        if not quiz.visible and not is_organizer:
+            raise Http404
+
+        answers = request.data.get("answers")
+        if answers is None:
+            return Response({"error": "Answers are required."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            response = submit_quiz_response(quiz, request.user, answers)
+        except GradingError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "response_id": response.id,
+            "score": response.score,
+            "correct": response.correct_count,
+            "total": response.total_questions,
+            "answers": [
+                {"question": question_id, "selected_option": option_id, "is_correct": is_correct}
+                for question_id, option_id, is_correct in response.graded_answers
+            ],
+        }, status=status.HTTP_201_CREATED)
+
+
+class QuizAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Return per-question statistics across all responses to a quiz."""
+        try:
+            quiz = Quiz.objects.select_related("event").get(pk=pk, event__deleted_at__isnull=True)
+        except Quiz.DoesNotExist:
+            raise Http404
+
+        if not quiz.event.is_organizer(request.user):
+            return Response({"error": "Only organizers can view quiz analytics."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        return Response(get_quiz_analytics(quiz.id), status=status.HTTP_200_OK)
+
+
+class QuizImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Append a CSV or NDJSON question bank to a quiz, either uploaded as
+        the multipart field "file" or sent as the raw request body.
+        """
+        try:
+            quiz = Quiz.objects.select_related("event").get(pk=pk, event__deleted_at__isnull=True)
+        except Quiz.DoesNotExist:
+            raise Http404
+
+        if not quiz.event.is_organizer(request.user):
+            return Response({"error": "Only organizers can import questions."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"error": "No file provided."},
+                              status=status.HTTP_400_BAD_REQUEST)
+            file_format = detect_format(upload.name, upload.content_type)
+            stream = upload
+        else:
+            file_format = detect_format(content_type=request.content_type)
+            stream = request.stream
+
+        file_format = request.query_params.get("file_format", file_format)
+        if file_format not in FORMATS or stream is None:
+            return Response({"error": "Send a .csv or .ndjson question bank."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            imported = import_question_bank(quiz, stream, file_format)
+        except UnicodeDecodeError:
+            return Response({"error": "Question banks must be UTF-8 encoded."},
+                          status=status.HTTP_400_BAD_REQUEST)
+        except QuestionBankError as e:
+            return Response({
+                "error": "The question bank contains invalid rows; nothing was imported.",
+                "invalid_rows": e.error_count,
+                "errors": e.errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"imported": imported}, status=status.HTTP_201_CREATED)
+
+
+class EventAttendeeRosterView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Return a page of an event's attendees with their ticket and payment.
+        Pass the returned next_cursor as ?cursor= for the next page; ?limit=
+        sets the page size.
+        """
+        try:
+            event = Event.objects.get(pk=pk)
+        except Event.DoesNotExist:
+            raise Http404
+
+        if not event.is_organizer(request.user):
+            return Response({"error": "Only organizers can view the attendees."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            after = int(request.query_params.get("cursor", 0))
+            limit = int(request.query_params.get("limit", ROSTER_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "cursor and limit must be integers."},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= MAX_ROSTER_PAGE_SIZE:
+            return Response({"error": f"limit must be between 1 and {MAX_ROSTER_PAGE_SIZE}."},
+                          status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= after <= MAX_CURSOR:
+            return Response({"error": "cursor is out of range."},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        rows = roster_page(event.id, after, limit)
+        return Response({
+            "results": rows,
+            "next_cursor": str(rows[-1]["user_id"]) if len(rows) == limit else None,
+        }, status=status.HTTP_200_OK)
+
+
+class EventAttendeeExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Stream the whole attendee roster of an event as CSV."""
+        try:
+            event = Event.objects.get(pk=pk)
+        except Event.DoesNotExist:
+            raise Http404
+
+        if not event.is_organizer(request.user):
+            return Response({"error": "Only organizers can export the attendees."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        response = StreamingHttpResponse(export_roster_csv(event.id), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="event-{event.id}-attendees.csv"'
+        return response
+
+
+class EventAttendeeImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Enroll existing users as attendees with free tickets, from a CSV with
+        an "email" column (uploaded as "file" or sent as the body) or a JSON
+        list of emails. Returns the status of every row.
+        """
+        try:
+            event = Event.objects.get(pk=pk)
+        except Event.DoesNotExist:
+            raise Http404
+
+        if not event.is_organizer(request.user):
+            return Response({"error": "Only organizers can import attendees."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            if request.content_type.startswith("multipart/form-data"):
+                upload = request.FILES.get("file")
+                if upload is None:
+                    return Response({"error": "No file provided."},
+                                  status=status.HTTP_400_BAD_REQUEST)
+                if detect_format(upload.name, upload.content_type) == CSV:
+                    rows = parse_csv_emails(upload)
+                else:
+                    rows = parse_json_emails(json.load(upload))
+            elif "csv" in request.content_type:
+                rows = parse_csv_emails(request.stream)
+            else:
+                rows = parse_json_emails(request.data)
+            report = import_attendees(event, rows)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return Response({"error": "Send a UTF-8 CSV or a JSON list of emails."},
+                          status=status.HTTP_400_BAD_REQUEST)
+        except AttendeeImportError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Imported attendees for event {event.id}: {report['counts']}")
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class QuizExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, file_format):
+        """Stream the questions of a quiz as CSV or NDJSON."""
+        try:
+            quiz = Quiz.objects.select_related("event").get(pk=pk, event__deleted_at__isnull=True)
+        except Quiz.DoesNotExist:
+            raise Http404
+
+        if not quiz.event.is_organizer(request.user):
+            return Response({"error": "Only organizers can export questions."},
+                          status=status.HTTP_403_FORBIDDEN)
+
+        if file_format not in FORMATS:
+            raise Http404
+
+        if file_format == CSV:
+            response = StreamingHttpResponse(export_csv(quiz), content_type="text/csv")
+        else:
+            response = StreamingHttpResponse(export_ndjson(quiz), content_type="application/x-ndjson")
+        response["Content-Disposition"] = f'attachment; filename="quiz-{quiz.id}.{file_format}"'
+        return response
+
+
 class MaterialDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self, pk):
         try:
-            return Material.objects.get(pk=pk)
+            return Material.objects.get(pk=pk, event__deleted_at__isnull=True)
         except Material.DoesNotExist:
             raise Http404
     
@@ -831,6 +1393,8 @@ class StripeCheckoutView(APIView):
                     is_paid=True
                 )
                 
+                record_ticket_created(ticket)
+
                 # Add user as attendee
                 event.add_attendee(request.user)
                 logger.info(f"Created free ticket {ticket.id} and added user as attendee")
@@ -946,7 +1510,25 @@ def stripe_webhook(request):
         user_id = session.get('metadata', {}).get('user_id')
         ticket_id = session.get('metadata', {}).get('ticket_id')
         
-        if event_id and user_id and ticket_id:
+        deletion = EventDeletion.objects.filter(event_id=event_id).first() if event_id else None
+        if event_id and user_id and ticket_id and deletion:
+            # The event was deleted after the checkout started, and its ticket
+            # may already be purged; the payment is kept for a refund rather
+            # than attached to rows that are going away
+            DeletedEventPayment.objects.get_or_create(
+                transaction_id=session.payment_intent,
+                defaults={
+                    "deletion": deletion, "user": User.objects.filter(pk=user_id).first(),
+                    "amount": session.amount_total / 100,
+                    "payment_date": timezone.now(), "payment_method": "credit_card",
+                },
+            )
+            logger.error(
+                f"Payment {session.payment_intent} of {session.amount_total / 100} by user {user_id} "
+                f"for ticket {ticket_id} is for deleted event {event_id} and must be refunded"
+            )
+            metrics.inc("stripe_payments_for_deleted_events_total")
+        elif event_id and user_id and ticket_id:
             try:
                 # Get the event, user and ticket
                 event_obj = Event.objects.get(pk=event_id)
@@ -954,6 +1536,7 @@ def stripe_webhook(request):
                 ticket = Ticket.objects.get(pk=ticket_id)
                 
                 # Mark ticket as paid
+                was_paid = ticket.is_paid
                 ticket.is_paid = True
                 ticket.save()
                 
@@ -961,16 +1544,19 @@ def stripe_webhook(request):
                 event_obj.add_attendee(user)
                 
                 # Create a payment record
-                Payment.objects.create(
+                payment = Payment.objects.create(
                     ticket=ticket,
                     amount=session.amount_total / 100,  # Convert from cents
                     payment_method='credit_card',
                     transaction_id=session.payment_intent
                 )
+                if not was_paid:
+                    record_ticket_paid(ticket, payment.amount, payment.payment_date)
                 
                 # Send confirmation email
                 send_ticket_confirmation_email(
                     user.email,
+                    user.first_name,
                     event_obj.title,
                     event_obj.date.strftime('%B %d, %Y at %I:%M %p'),
                     ticket.id
@@ -979,4 +1565,65 @@ def stripe_webhook(request):
             except (Event.DoesNotExist, User.DoesNotExist, Ticket.DoesNotExist) as e:
                 print(f"Error processing payment: {str(e)}")
     
-    return HttpResponse(status=200)
\ No newline at end of file
+    return HttpResponse(status=200)
+
+
+@require_GET
+def metrics_view(request):
+    """Serve the in-process metrics in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse("Set METRICS_TOKEN to serve /metrics.", status=403, content_type="text/plain")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def calendar_feed_state(request, token, pk=None):
+    """Resolve the user, events and version of a feed once per request."""
+    if not hasattr(request, "calendar_feed"):
+        user = user_for_token(token)
+        if user is None:
+            events = Event.objects.none()
+        elif pk is None:
+            events = user_feed_events(user.id)
+        else:
+            events = Event.objects.filter(pk=pk)
+        request.calendar_feed = (user, events, *feed_version(events))
+    return request.calendar_feed
+
+
+def calendar_feed_response(request, events, name):
+    response = StreamingHttpResponse(
+        render_calendar(events, name, request.get_host()), content_type="text/calendar; charset=utf-8"
+    )
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# The version is checked before anything is rendered: unchanged feeds get a 304
+
+@require_GET
+@condition(
+    etag_func=lambda request, token: calendar_feed_state(request, token)[2],
+    last_modified_func=lambda request, token: calendar_feed_state(request, token)[3],
+)
+def user_calendar_feed(request, token):
+    """Stream the ICS feed of every event the token's user organizes, speaks at or attends."""
+    user, events, _, _ = calendar_feed_state(request, token)
+    if user is None:
+        raise Http404
+    return calendar_feed_response(request, events, f"Events of {user}")
+
+
+@require_GET
+@condition(
+    etag_func=lambda request, token, pk: calendar_feed_state(request, token, pk)[2],
+    last_modified_func=lambda request, token, pk: calendar_feed_state(request, token, pk)[3],
+)
+def event_calendar_feed(request, token, pk):
+    """Stream the ICS feed of a single event."""
+    user, events, etag, _ = calendar_feed_state(request, token, pk)
+    if user is None or etag is None:
+        raise Http404
+    return calendar_feed_response(request, events, events[0].title)